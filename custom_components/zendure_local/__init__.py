@@ -1,24 +1,267 @@
 """Zendure Local integration for Home Assistant."""
 
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+import re
+from typing import TYPE_CHECKING, Any
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import config_validation as cv
+from homeassistant.const import CONF_RESOURCE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+    issue_registry as ir,
+)
+from homeassistant.helpers.importlib import async_import_module
 from homeassistant.helpers.typing import ConfigType
 
+from .const import (
+    CONF_FORECAST_ENTITY,
+    CONF_LAST_ADDRESS,
+    CONF_METRICS,
+    CONF_RECORD_TRACES,
+    CONF_RULES,
+    CONF_TRACE_FIELDS,
+    DEFAULT_RESOURCE,
+    DOMAIN,
+)
+from .coordinator import ZendureCoordinator
+from .issues import async_check_rest_resources, issue_id
+from .metrics import async_register_metrics_view
+from .polling import PollingOptions, only_live_options_changed
+from .sensor import hub_name, hub_unique_id, pack_device_id, pack_unique_id
+from .site import ZendureSiteSampler, is_site_entry
+from .websocket_api import SnapshotStream, async_register_websocket_commands
+
+if TYPE_CHECKING:
+    from .dispatcher import ZendureDispatcher
+    from .scheduler import ZendureScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
 CONFIG_SCHEMA = cv.empty_config_schema("zendure_local")
 
+# A site has a setpoint next to its sensors
+SITE_PLATFORMS = ["sensor", "number"]
+
+
+@dataclass
+class ZendureRuntimeData:
+    """Runtime objects of a config entry."""
+
+    coordinator: ZendureCoordinator
+    scheduler: ZendureScheduler | None = None
+    # Created by the first websocket subscription
+    stream: SnapshotStream | None = None
+    # Options the entry was set up with
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ZendureSiteRuntimeData:
+    """Runtime objects of a site config entry."""
+
+    sampler: ZendureSiteSampler
+    dispatcher: ZendureDispatcher
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Zendure Local integration."""
+    async_register_websocket_commands(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Zendure Local from a config entry."""
+    if is_site_entry(entry):
+        return await async_setup_site_entry(hass, entry)
+    resource = entry.data.get(CONF_RESOURCE, DEFAULT_RESOURCE)
+    _LOGGER.debug("Setting up ZendureLocal integration with resource: %s", resource)
+
+    @callback
+    def async_store_address(address: dict[str, str]) -> None:
+        """Remember the address of the hub, so startup needs no DNS lookup."""
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_LAST_ADDRESS: address}
+        )
+
+    coordinator = ZendureCoordinator(
+        hass,
+        resource,
+        entry.entry_id,
+        record_traces=entry.options.get(CONF_RECORD_TRACES, False),
+        trace_fields=entry.options.get(CONF_TRACE_FIELDS),
+        last_address=entry.data.get(CONF_LAST_ADDRESS),
+        address_listener=async_store_address,
+        polling=PollingOptions.from_options(entry.options),
+    )
+    entry.async_on_unload(coordinator.async_stop_recorder)
+    await coordinator.async_load_state()
+    await coordinator.async_config_entry_first_refresh()
+    async_backfill_unique_id(hass, entry, coordinator.data)
+
+    scheduler = None
+    if entry.options.get(CONF_FORECAST_ENTITY):
+        # The planner needs numpy, load it in the import executor and only for
+        # hubs with a forecast
+        scheduler_module = await async_import_module(hass, f"{__package__}.scheduler")
+        scheduler = scheduler_module.ZendureScheduler(
+            hass, coordinator, dict(entry.options)
+        )
+
+    entry.runtime_data = ZendureRuntimeData(
+        coordinator, scheduler, options=dict(entry.options)
+    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+
+    if entry.options.get(CONF_METRICS):
+        async_register_metrics_view(hass)
+
+    if entry.options.get(CONF_RULES):
+        from .rules import Rule, ZendureRuleMonitor
+
+        monitor = ZendureRuleMonitor(
+            hass,
+            coordinator,
+            entry.entry_id,
+            [Rule.from_dict(rule) for rule in entry.options[CONF_RULES]],
+        )
+        entry.async_on_unload(monitor.async_start())
+
+    entry.async_create_background_task(
+        hass,
+        async_check_rest_resources(hass, entry),
+        f"{DOMAIN} rest resource check {entry.title}",
+    )
+
+    # Start after the sensors exist so they show the first plan
+    if scheduler is not None:
+        scheduler.async_start()
+        entry.async_on_unload(scheduler.async_stop)
+    return True
+
+
+@callback
+def async_backfill_unique_id(
+    hass: HomeAssistant, entry: ConfigEntry, data: dict[str, Any] | None
+) -> None:
+    """Set the serial of the hub as unique id of an entry created without one.
+
+    Discovery and the config flow only recognize a configured hub by its
+    unique id.
+    """
+    serial = (data or {}).get("sn")
+    if entry.unique_id is not None or not serial:
+        return
+    # Leave a second entry of the same hub alone, the user removes one of them
+    if hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, str(serial)):
+        return
+    hass.config_entries.async_update_entry(entry, unique_id=str(serial))
+
+
+async def async_setup_site_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up a site of hubs and a grid meter."""
+    from .dispatcher import ZendureDispatcher
+
+    sampler = ZendureSiteSampler(hass, entry)
+    if not sampler.hub_coordinators():
+        # Retried until the hubs are set up
+        raise ConfigEntryNotReady(f"None of the hubs of {entry.title} is loaded")
+    # The sampler polls the hubs while the site is loaded, also run when the
+    # first refresh fails
+    entry.async_on_unload(sampler.async_release_hubs)
+    await sampler.async_config_entry_first_refresh()
+    dispatcher = ZendureDispatcher(hass, sampler)
+    entry.runtime_data = ZendureSiteRuntimeData(sampler, dispatcher)
+    await hass.config_entries.async_forward_entry_setups(entry, SITE_PLATFORMS)
+    entry.async_on_unload(dispatcher.async_start())
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if is_site_entry(entry):
+        return await hass.config_entries.async_unload_platforms(entry, SITE_PLATFORMS)
     return await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an entry from an older version."""
+    if entry.version > 1:
+        return False
+    if entry.minor_version < 2 and not is_site_entry(entry):
+        await async_migrate_hub_ids(hass, entry)
+    hass.config_entries.async_update_entry(entry, minor_version=2)
+    return True
+
+
+async def async_migrate_hub_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Key the entities and devices of a hub by entry instead of by name.
+
+    All hubs shared one device and hubs with the same name had the same
+    unique ids.
+    """
+    name = hub_name(entry)
+    old_pack_id = re.compile(rf"{re.escape(name)} Battery (\d+)_(.+)")
+
+    @callback
+    def migrate_unique_id(registry_entry: er.RegistryEntry) -> dict[str, str] | None:
+        unique_id = registry_entry.unique_id
+        if match := old_pack_id.fullmatch(unique_id):
+            return {"new_unique_id": pack_unique_id(entry, int(match[1]), match[2])}
+        if unique_id.startswith(f"{name}_"):
+            key = unique_id.removeprefix(f"{name}_")
+            return {"new_unique_id": hub_unique_id(entry, key)}
+        return None
+
+    await er.async_migrate_entries(hass, entry.entry_id, migrate_unique_id)
+
+    device_registry = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        identifier = None
+        for domain, old_identifier in device.identifiers:
+            if domain != DOMAIN:
+                continue
+            if old_identifier == "zendure_solarflow":
+                identifier = entry.entry_id
+            elif match := re.fullmatch(r"zendure_pack(\d+)", old_identifier):
+                identifier = pack_device_id(entry, int(match[1]))
+        if identifier is None:
+            continue
+        if device.config_entries == {entry.entry_id}:
+            device_registry.async_update_device(
+                device.id, new_identifiers={(DOMAIN, identifier)}
+            )
+        else:
+            # Shared with other hubs, the entities create a device of their own
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the repair issues of a removed config entry."""
+    ir.async_delete_issue(hass, DOMAIN, issue_id(entry))
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    runtime_data: ZendureRuntimeData = entry.runtime_data
+    # Storing the address of the hub updates the entry too
+    if entry.options == runtime_data.options:
+        return
+    if only_live_options_changed(runtime_data.options, dict(entry.options)):
+        _LOGGER.debug("Applying polling options of %s", entry.title)
+        runtime_data.coordinator.async_set_polling(
+            PollingOptions.from_options(entry.options)
+        )
+        runtime_data.options = dict(entry.options)
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
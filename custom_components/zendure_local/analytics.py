@@ -0,0 +1,201 @@
+"""Incremental battery health and cell imbalance analytics for Zendure Local."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import math
+from typing import Any
+
+from .battery import decode_temperature
+
+# Pack temperature at or above which time is counted as "high temperature"
+HIGH_TEMP_THRESHOLD = 45.0
+# Number of daily imbalance means kept for the trend, this bounds memory per pack
+HISTORY_DAYS = 30
+# Gaps between samples longer than this are not counted, e.g. after downtime
+MAX_SAMPLE_GAP = 300.0
+SECONDS_PER_DAY = 86400
+
+
+def pack_key(pack: dict[str, Any], index: int) -> str:
+    """Return a stable key for a pack, preferring its serial number."""
+    return pack.get("sn") or f"pack{index + 1}"
+
+
+@dataclass
+class RunningStats:
+    """Running mean and variance using Welford's algorithm."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a sample."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float | None:
+        """Return the sample variance, or None with fewer than two samples."""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stddev(self) -> float | None:
+        """Return the sample standard deviation."""
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RunningStats:
+        """Restore from as_dict output."""
+        return cls(int(data["count"]), float(data["mean"]), float(data["m2"]))
+
+
+@dataclass
+class PackHealth:
+    """Running health statistics of a single battery pack."""
+
+    spread: RunningStats = field(default_factory=RunningStats)
+    temperature: RunningStats = field(default_factory=RunningStats)
+    high_temp_seconds: float = 0.0
+    last_seen: float | None = None
+    day: int | None = None
+    day_spread: RunningStats = field(default_factory=RunningStats)
+    daily_spread: deque[tuple[int, float]] = field(
+        default_factory=lambda: deque(maxlen=HISTORY_DAYS)
+    )
+
+    def update(self, pack: dict[str, Any], now: float) -> None:
+        """Fold one pack sample into the statistics."""
+        day = int(now // SECONDS_PER_DAY)
+        if self.day is not None and day != self.day and self.day_spread.count:
+            self.daily_spread.append((self.day, self.day_spread.mean))
+            self.day_spread = RunningStats()
+        self.day = day
+
+        max_vol = pack.get("maxVol")
+        min_vol = pack.get("minVol")
+        if max_vol is not None and min_vol is not None:
+            # Cell voltages are reported in 0.01 V units, track in mV
+            spread = (int(max_vol) - int(min_vol)) * 10.0
+            self.spread.add(spread)
+            self.day_spread.add(spread)
+
+        max_temp = pack.get("maxTemp")
+        if max_temp is not None:
+            temperature = decode_temperature(max_temp)
+            self.temperature.add(temperature)
+            if self.last_seen is not None and temperature >= HIGH_TEMP_THRESHOLD:
+                elapsed = now - self.last_seen
+                if 0 < elapsed <= MAX_SAMPLE_GAP:
+                    self.high_temp_seconds += elapsed
+
+        self.last_seen = now
+
+    @property
+    def spread_trend(self) -> float | None:
+        """Return the least squares slope of the daily mean spread in mV/day."""
+        points = list(self.daily_spread)
+        if self.day is not None and self.day_spread.count:
+            points.append((self.day, self.day_spread.mean))
+        if len(points) < 2:
+            return None
+        n = len(points)
+        mean_x = sum(x for x, _ in points) / n
+        mean_y = sum(y for _, y in points) / n
+        sxx = sum((x - mean_x) ** 2 for x, _ in points)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+        return sxy / sxx if sxx else None
+
+    def indicators(self) -> dict[str, float | None]:
+        """Return the health indicators exposed as sensors."""
+        stddev = self.spread.stddev
+        trend = self.spread_trend
+        return {
+            "cell_imbalance_mean": (
+                round(self.spread.mean, 2) if self.spread.count else None
+            ),
+            "cell_imbalance_stddev": round(stddev, 2) if stddev is not None else None,
+            "cell_imbalance_trend": round(trend, 3) if trend is not None else None,
+            "temp_mean": (
+                round(self.temperature.mean, 1) if self.temperature.count else None
+            ),
+            "high_temp_time": round(self.high_temp_seconds / 3600, 2),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            "spread": self.spread.as_dict(),
+            "temperature": self.temperature.as_dict(),
+            "high_temp_seconds": self.high_temp_seconds,
+            "last_seen": self.last_seen,
+            "day": self.day,
+            "day_spread": self.day_spread.as_dict(),
+            "daily_spread": [list(point) for point in self.daily_spread],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PackHealth:
+        """Restore from as_dict output."""
+        return cls(
+            spread=RunningStats.from_dict(data["spread"]),
+            temperature=RunningStats.from_dict(data["temperature"]),
+            high_temp_seconds=float(data["high_temp_seconds"]),
+            last_seen=data.get("last_seen"),
+            day=data.get("day"),
+            day_spread=RunningStats.from_dict(data["day_spread"]),
+            daily_spread=deque(
+                ((int(day), float(mean)) for day, mean in data["daily_spread"]),
+                maxlen=HISTORY_DAYS,
+            ),
+        )
+
+
+class PackHealthTracker:
+    """Track health statistics for every pack of a hub, keyed by pack serial."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self.packs: dict[str, PackHealth] = {}
+
+    def update(self, pack_data: list[dict[str, Any]], now: float) -> None:
+        """Fold one poll of packData into the statistics."""
+        for index, pack in enumerate(pack_data):
+            key = pack_key(pack, index)
+            health = self.packs.get(key)
+            if health is None:
+                health = self.packs[key] = PackHealth()
+            health.update(pack, now)
+
+        # Forget packs that have been removed for longer than the history window
+        cutoff = now - HISTORY_DAYS * SECONDS_PER_DAY
+        for key in [
+            key
+            for key, health in self.packs.items()
+            if health.last_seen is not None and health.last_seen < cutoff
+        ]:
+            del self.packs[key]
+
+    def indicators(self, key: str) -> dict[str, float | None]:
+        """Return the health indicators of a pack, empty if unknown."""
+        health = self.packs.get(key)
+        return health.indicators() if health else {}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {key: health.as_dict() for key, health in self.packs.items()}
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Restore state saved with as_dict."""
+        self.packs = {key: PackHealth.from_dict(value) for key, value in data.items()}
@@ -0,0 +1,115 @@
+"""Local HTTP API client helpers for Zendure devices."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+REPORT_PATH = "/properties/report"
+WRITE_PATH = "/properties/write"
+WRITE_TIMEOUT = 10
+READ_TIMEOUT = 10
+
+
+class InvalidResource(ValueError):
+    """Raised for a resource that is not an http(s) or file URL."""
+
+
+def base_url(resource: str) -> str:
+    """Return scheme and host of a resource URL, e.g. http://SolarFlow800.lan."""
+    parts = urlsplit(resource)
+    return urlunsplit((parts.scheme, parts.netloc, "", "", ""))
+
+
+def normalize_resource(resource: str) -> str:
+    """Return a report URL for a URL, host name or IP address.
+
+    A bare host gets http:// and a URL without path the report path, file://
+    URLs of recorded traces are returned unchanged.
+    """
+    resource = resource.strip()
+    if "://" not in resource:
+        resource = f"http://{resource}"
+    parts = urlsplit(resource)
+    if parts.scheme == "file":
+        if not parts.path:
+            raise InvalidResource(resource)
+        return resource
+    try:
+        valid = (
+            parts.scheme in ("http", "https")
+            and bool(parts.hostname)
+            and parts.port != 0
+        )
+    except ValueError:
+        # Port out of range or not a number
+        valid = False
+    if not valid:
+        raise InvalidResource(resource)
+    if parts.path in ("", "/"):
+        parts = parts._replace(path=REPORT_PATH)
+    return urlunsplit(parts)
+
+
+def is_report(data: Any) -> bool:
+    """Return whether a response body looks like the report of a hub."""
+    return (
+        isinstance(data, dict)
+        and isinstance(data.get("properties"), dict)
+        and bool(data.get("sn"))
+    )
+
+
+async def async_read_report(
+    session: aiohttp.ClientSession, url: str, timeout: float = READ_TIMEOUT
+) -> dict[str, Any] | None:
+    """GET the report of a device, None if the URL does not serve a report."""
+    try:
+        async with session.get(
+            url, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            if resp.status != 200:
+                return None
+            data = await resp.json(content_type=None)
+    except (aiohttp.ClientError, TimeoutError, ValueError):
+        return None
+    return data if is_report(data) else None
+
+
+def write_url(resource: str) -> str:
+    """Return the /properties/write URL of the device behind a report URL."""
+    return f"{base_url(resource)}{WRITE_PATH}"
+
+
+async def async_write_properties(
+    session: aiohttp.ClientSession,
+    url: str,
+    serial: str,
+    properties: dict[str, Any],
+    headers: dict[str, str] | None = None,
+    timeout: float = WRITE_TIMEOUT,
+) -> bool:
+    """POST properties to a device, return whether the device accepted them."""
+    payload = {"sn": serial, "properties": properties}
+    try:
+        async with session.post(
+            url,
+            json=payload,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as resp:
+            if resp.status != 200:
+                _LOGGER.error(
+                    "Failed to POST to Zendure: %s %s", resp.status, await resp.text()
+                )
+                return False
+    except (aiohttp.ClientError, TimeoutError) as ex:
+        _LOGGER.error("Error writing Zendure properties %s: %s", properties, ex)
+        return False
+    _LOGGER.debug("POST to Zendure succeeded for %s", properties)
+    return True
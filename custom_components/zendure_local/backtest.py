@@ -0,0 +1,305 @@
+"""Offline backtesting of charge strategies over recorded report traces.
+
+A trace is a JSON lines file (optionally gzipped) with one
+/properties/report response per line. Lines may carry a "loadPower" field
+with the house load in W, or a "meter" object with a P1 meter report; without
+either the hub output is used as the load.
+
+Strategies are functions returning the requested pack power (W at the AC
+side, positive charges) for every sample. The battery model enforces the
+limits reported by the hub, so the whole simulation is vectorized with numpy:
+
+    python -m custom_components.zendure_local.backtest trace.jsonl.gz \\
+        --prices prices.json --strategy cheapest_hours
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from homeassistant.util import dt as dt_util
+
+from .analytics import MAX_SAMPLE_GAP
+from .battery import BatteryLimits
+from .forecast import PriceSlot, parse_forecast
+from .planner import CHARGE_EFFICIENCY, DISCHARGE_EFFICIENCY
+from .recorder import iter_reports
+from .scheduler import plan_windows
+
+
+@dataclass
+class Trace:
+    """Recorded samples of a hub as arrays."""
+
+    # Unix time of every sample in seconds
+    time: np.ndarray
+    solar: np.ndarray
+    load: np.ndarray
+    # First report of the trace, used for the battery limits and start SOC
+    first_report: dict[str, Any]
+
+    @property
+    def hours(self) -> np.ndarray:
+        """Return how long every sample holds, gaps count as no time."""
+        if len(self.time) < 2:
+            return np.zeros(len(self.time))
+        step = np.diff(self.time)
+        step = np.append(step, np.median(step))
+        return np.where(step <= MAX_SAMPLE_GAP, step, 0.0) / 3600
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """Totals of a backtest run."""
+
+    cost: float
+    grid_import_kwh: float
+    grid_export_kwh: float
+    cycles: float
+    final_soc: float
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the result rounded for display."""
+        return {key: round(value, 3) for key, value in asdict(self).items()}
+
+
+# (trace, price slots, limits) -> requested pack power per sample in W
+Strategy = Callable[[Trace, Sequence[PriceSlot], BatteryLimits], np.ndarray]
+
+
+def report_load(report: dict[str, Any]) -> float:
+    """Return the house load of a trace line in W."""
+    properties = report.get("properties", {})
+    output = float(properties.get("outputHomePower", 0))
+    if "loadPower" in report:
+        return float(report["loadPower"])
+    if "meter" in report:
+        # The meter sees the load minus what the hub delivers
+        grid_charge = float(properties.get("gridInputPower", 0))
+        return float(report["meter"]["total_power"]) + output - grid_charge
+    return output
+
+
+def trace_from_reports(reports: Iterable[dict[str, Any]]) -> Trace:
+    """Collect reports into a trace, skipping reports without a timestamp."""
+    times: list[float] = []
+    solar: list[float] = []
+    load: list[float] = []
+    first: dict[str, Any] = {}
+    for report in reports:
+        timestamp = report.get("timestamp")
+        if timestamp is None:
+            continue
+        if not first:
+            first = report
+        times.append(float(timestamp))
+        solar.append(float(report.get("properties", {}).get("solarInputPower", 0)))
+        load.append(report_load(report))
+    return Trace(np.array(times), np.array(solar), np.array(load), first)
+
+
+def load_trace(path: str | Path) -> Trace:
+    """Load a JSON lines trace file."""
+    return trace_from_reports(iter_reports(path))
+
+
+def price_series(times: np.ndarray, slots: Sequence[PriceSlot]) -> np.ndarray:
+    """Return the price of every sample, the nearest slot outside the forecast."""
+    if not slots:
+        return np.zeros(len(times))
+    starts = np.array([slot.start.timestamp() for slot in slots])
+    prices = np.array([slot.price for slot in slots])
+    index = np.clip(np.searchsorted(starts, times, side="right") - 1, 0, len(slots) - 1)
+    return prices[index]
+
+
+def bounded_cumsum(
+    deltas: np.ndarray, start: float, lower: float, upper: float
+) -> np.ndarray:
+    """Return the running sum of deltas, clipped to [lower, upper] at every step.
+
+    Every step is the map s -> clip(s + delta, lower, upper), and a
+    composition of such maps is again a shifted clip. This makes the
+    saturating sum an associative prefix scan, evaluated in log2(n)
+    vectorized passes instead of a Python loop over the samples.
+    """
+    shift = np.asarray(deltas, dtype=float).copy()
+    low = np.full(len(shift), float(lower))
+    high = np.full(len(shift), float(upper))
+    step = 1
+    while step < len(shift):
+        later = shift[step:]
+        new_low = np.clip(low[:-step] + later, low[step:], high[step:])
+        new_high = np.clip(high[:-step] + later, low[step:], high[step:])
+        new_shift = shift[:-step] + later
+        shift[step:], low[step:], high[step:] = new_shift, new_low, new_high
+        step *= 2
+    return np.clip(start + shift, low, high)
+
+
+def simulate(
+    trace: Trace,
+    request: np.ndarray,
+    limits: BatteryLimits,
+    prices: np.ndarray,
+    start_soc: float | None = None,
+    feed_in_factor: float = 1.0,
+) -> BacktestResult:
+    """Run requested pack powers through the battery model."""
+    hours = trace.hours
+    if start_soc is None:
+        start_soc = float(
+            trace.first_report.get("properties", {}).get("electricLevel", 0)
+        )
+    # Hub output (solar plus packs) and charging from the grid are limited,
+    # solar above the output limit goes into the packs
+    power = np.clip(
+        request,
+        trace.solar - limits.max_discharge_power,
+        trace.solar + limits.max_charge_power,
+    )
+    to_wh = limits.capacity_wh / 100
+    stored = bounded_cumsum(
+        np.where(power > 0, power * CHARGE_EFFICIENCY, power / DISCHARGE_EFFICIENCY)
+        * hours,
+        start_soc * to_wh,
+        limits.min_soc * to_wh,
+        limits.max_soc * to_wh,
+    )
+    delta = np.diff(stored, prepend=start_soc * to_wh)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        power = np.where(
+            hours > 0,
+            np.where(delta > 0, delta / CHARGE_EFFICIENCY, delta * DISCHARGE_EFFICIENCY)
+            / hours,
+            0.0,
+        )
+    # Solar beyond the output limit is curtailed once the packs are full
+    output = np.minimum(trace.solar - power, limits.max_discharge_power)
+    grid_wh = (trace.load - output) * hours
+    cost = np.where(grid_wh > 0, grid_wh, grid_wh * feed_in_factor) * prices / 1000
+    return BacktestResult(
+        cost=float(cost.sum()),
+        grid_import_kwh=float(np.maximum(grid_wh, 0).sum() / 1000),
+        grid_export_kwh=float(np.maximum(-grid_wh, 0).sum() / 1000),
+        cycles=float(np.maximum(-delta, 0).sum() / limits.capacity_wh),
+        final_soc=float(stored[-1] / to_wh) if len(stored) else start_soc,
+    )
+
+
+def run_backtest(
+    trace: Trace,
+    strategy: Strategy,
+    slots: Sequence[PriceSlot],
+    limits: BatteryLimits | None = None,
+    feed_in_factor: float = 1.0,
+) -> BacktestResult:
+    """Backtest a strategy, with the limits of the first report by default."""
+    if limits is None:
+        limits = BatteryLimits.from_report(trace.first_report)
+        if limits is None:
+            raise ValueError("The first report of the trace has no battery limits")
+    request = strategy(trace, slots, limits)
+    return simulate(
+        trace,
+        request,
+        limits,
+        price_series(trace.time, slots),
+        feed_in_factor=feed_in_factor,
+    )
+
+
+def idle(trace: Trace, slots: Sequence[PriceSlot], limits: BatteryLimits) -> np.ndarray:
+    """Never use the battery, the baseline to compare strategies against."""
+    return np.zeros(len(trace.time))
+
+
+def zero_export(
+    trace: Trace, slots: Sequence[PriceSlot], limits: BatteryLimits
+) -> np.ndarray:
+    """Store solar surplus and cover the remaining load from the battery."""
+    return trace.solar - trace.load
+
+
+def cheapest_hours(
+    charge_hours: float = 5,
+    discharge_hours: float = 5,
+    contiguous: bool = True,
+    charge_power: float | None = None,
+    discharge_power: float | None = None,
+) -> Strategy:
+    """Return the cheapest hours strategy of the scheduler, planned per day."""
+
+    def strategy(
+        trace: Trace, slots: Sequence[PriceSlot], limits: BatteryLimits
+    ) -> np.ndarray:
+        request = np.zeros(len(trace.time))
+        days: dict[Any, list[PriceSlot]] = {}
+        for slot in slots:
+            days.setdefault(dt_util.as_local(slot.start).date(), []).append(slot)
+        for day_slots in days.values():
+            plan = plan_windows(
+                day_slots,
+                day_slots[0].start,
+                charge_hours,
+                discharge_hours,
+                contiguous,
+            )
+            for windows, power in (
+                (plan.charge, charge_power or limits.max_charge_power),
+                (plan.discharge, -(discharge_power or limits.max_discharge_power)),
+            ):
+                for start, end in windows:
+                    first, last = np.searchsorted(
+                        trace.time, (start.timestamp(), end.timestamp())
+                    )
+                    request[first:last] = power
+        return request
+
+    return strategy
+
+
+STRATEGIES: dict[str, Callable[[argparse.Namespace], Strategy]] = {
+    "idle": lambda args: idle,
+    "zero_export": lambda args: zero_export,
+    "cheapest_hours": lambda args: cheapest_hours(
+        args.charge_hours, args.discharge_hours, not args.non_contiguous
+    ),
+}
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Backtest a strategy from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="JSON lines trace, optionally gzipped")
+    parser.add_argument("--prices", help="JSON list of price forecast items")
+    parser.add_argument("--time-key", default="datetime")
+    parser.add_argument("--value-key", default="electricity_price")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="zero_export")
+    parser.add_argument("--charge-hours", type=float, default=5)
+    parser.add_argument("--discharge-hours", type=float, default=5)
+    parser.add_argument("--non-contiguous", action="store_true")
+    parser.add_argument("--feed-in-factor", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    slots: list[PriceSlot] = []
+    if args.prices:
+        items = json.loads(Path(args.prices).read_text(encoding="utf-8"))
+        slots = parse_forecast(items, args.time_key, args.value_key)
+    trace = load_trace(args.trace)
+    for name in ("idle", args.strategy):
+        result = run_backtest(
+            trace, STRATEGIES[name](args), slots, feed_in_factor=args.feed_in_factor
+        )
+        print(name, json.dumps(result.as_dict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Battery pack decoding and cross-pack aggregation for Zendure Local."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# Temperatures are reported in tenths of a Kelvin
+KELVIN_X10_OFFSET = 2731
+# Nominal energy of an AB2000 pack, used when no capacity is known
+DEFAULT_PACK_ENERGY_WH = 1920.0
+
+
+def decode_temperature(raw: int) -> float:
+    """Convert a Kelvin * 10 reading to degrees Celsius."""
+    return (int(raw) - KELVIN_X10_OFFSET) / 10.0
+
+
+def decode_batcur(raw: int) -> float:
+    """Convert a raw batcur reading to amps.
+
+    batcur is a 32-bit integer with the upper 16 bits sign-extended, the
+    actual value is ((int16_t)batcur) / 10.0.
+    """
+    signed_current = int(raw) & 0xFFFF
+    if signed_current > 32767:
+        signed_current -= 65536
+    return signed_current / 10.0
+
+
+def compute_pack_aggregates(
+    pack_data: list[dict[str, Any]],
+) -> dict[str, float | int | None]:
+    """Compute hub level aggregates over all packs in a single pass.
+
+    Packs missing a field are skipped for that aggregate only, so one
+    partially reported pack does not blank out every aggregate.
+    """
+    soc_min = soc_max = None
+    soc_total = 0
+    soc_count = 0
+    power_total = None
+    temp_max_raw = None
+    spread_max = None
+
+    for pack in pack_data:
+        soc = pack.get("socLevel")
+        if soc is not None:
+            soc = int(soc)
+            soc_min = soc if soc_min is None else min(soc_min, soc)
+            soc_max = soc if soc_max is None else max(soc_max, soc)
+            soc_total += soc
+            soc_count += 1
+
+        power = pack.get("power")
+        if power is not None:
+            power_total = int(power) + (power_total or 0)
+
+        max_temp = pack.get("maxTemp")
+        if max_temp is not None:
+            max_temp = int(max_temp)
+            if temp_max_raw is None or max_temp > temp_max_raw:
+                temp_max_raw = max_temp
+
+        max_vol = pack.get("maxVol")
+        min_vol = pack.get("minVol")
+        if max_vol is not None and min_vol is not None:
+            spread = int(max_vol) - int(min_vol)
+            if spread_max is None or spread > spread_max:
+                spread_max = spread
+
+    return {
+        "packSocMin": soc_min,
+        "packSocMax": soc_max,
+        "packSocMean": round(soc_total / soc_count, 1) if soc_count else None,
+        "packPowerTotal": power_total,
+        "packTempMax": (
+            decode_temperature(temp_max_raw) if temp_max_raw is not None else None
+        ),
+        # Cell voltages are reported in 0.01 V units
+        "packCellSpreadMax": spread_max * 10 if spread_max is not None else None,
+    }
+
+
+@dataclass(frozen=True)
+class BatteryLimits:
+    """Usable battery range and power limits of a hub."""
+
+    capacity_wh: float
+    # SOC range in percent
+    min_soc: float
+    max_soc: float
+    # AC charge and output limits in W
+    max_charge_power: float
+    max_discharge_power: float
+
+    @classmethod
+    def from_report(
+        cls, data: dict[str, Any], capacity_wh: float | None = None
+    ) -> BatteryLimits | None:
+        """Build the limits from a /properties/report response.
+
+        minSoc and socSet are reported in 0.1 % units. Without a measured
+        capacity the nominal pack energy times packNum is used.
+        """
+        properties = data.get("properties", {})
+        try:
+            min_soc = int(properties["minSoc"]) / 10
+            max_soc = int(properties["socSet"]) / 10
+            max_charge = float(properties["chargeMaxLimit"])
+            max_discharge = float(properties["inverseMaxPower"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if capacity_wh is None:
+            packs = properties.get("packNum") or len(data.get("packData", [])) or 1
+            capacity_wh = int(packs) * DEFAULT_PACK_ENERGY_WH
+        return cls(capacity_wh, min_soc, max_soc, max_charge, max_discharge)
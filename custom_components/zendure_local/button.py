@@ -0,0 +1,81 @@
+"""Zendure Local action buttons for Home Assistant.
+
+The buttons are not set up as a platform yet. They live apart from the
+sensor platform so it does not load the button component.
+"""
+
+import logging
+
+from homeassistant.components.button import ButtonEntity
+
+from .coordinator import ZendureCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# To add the buttons to a hub, forward the button platform and create them in
+# its async_setup_entry:
+#
+# device_info = DeviceInfo(
+#     identifiers={(DOMAIN, entry.entry_id)},
+#     name=hub_name(entry),
+#     manufacturer="Zendure",
+#     model="Solarflow Hub",
+# )
+# buttons = [
+#     ZendureActionButton(coordinator, action, device_info)
+#     for action in ZENDURE_ACTIONS
+# ]
+# async_add_entities(buttons, update_before_add=False)
+
+ZENDURE_ACTIONS = [
+    {
+        "key": "snel_laden",
+        "name": "Snel Laden",
+        "properties": {"acMode": 1, "inputLimit": 2400},
+    },
+    {
+        "key": "stop_met_laden",
+        "name": "Stop met Laden",
+        "properties": {"acMode": 1, "inputLimit": 0},
+    },
+    {
+        "key": "snel_ontladen",
+        "name": "Snel Ontladen",
+        "properties": {"acMode": 2, "outputLimit": 2400},
+    },
+    {
+        "key": "stop_met_ontladen",
+        "name": "Stop met Ontladen",
+        "properties": {"acMode": 2, "outputLimit": 0},
+    },
+    {
+        "key": "stop_met_alles",
+        "name": "Stop met Alles",
+        "properties": {"outputLimit": 0, "inputLimit": 0},
+    },
+]
+
+
+class ZendureActionButton(ButtonEntity):
+    """Button entity for Zendure action."""
+
+    def __init__(self, coordinator: ZendureCoordinator, action, device_info):
+        """Initialize ZendureActionButton."""
+        self._coordinator = coordinator
+        self._action = action
+        self._attr_name = f"Zendure {action['name']}"
+        self._attr_unique_id = f"zendure_{action['key']}_button"
+        self._attr_device_info = device_info
+
+    async def async_press(self) -> None:
+        """Write the properties of the action to the device.
+
+        The write goes through the coordinator, so it reaches the configured
+        hub and is queued while the hub is unreachable.
+        """
+        if not await self._coordinator.async_write_properties(
+            self._action["properties"]
+        ):
+            _LOGGER.info(
+                "%s is written when the hub is reachable again", self._action["key"]
+            )
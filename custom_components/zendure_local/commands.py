@@ -0,0 +1,71 @@
+"""Property writes queued while a device is unreachable."""
+
+from __future__ import annotations
+
+from typing import Any
+
+# Queued properties older than this many seconds are dropped, e.g. an acMode
+# of a schedule window that has passed
+COMMAND_TTL = 900.0
+
+
+class PendingCommands:
+    """Properties to write to a device once it is reachable again.
+
+    Commands are merged per property, a later value replaces an earlier one,
+    so the queue always holds the final desired state and is written with a
+    single request however many commands were issued while offline.
+    """
+
+    def __init__(self, ttl: float = COMMAND_TTL) -> None:
+        """Initialize an empty queue."""
+        self.ttl = ttl
+        # property -> (value, time it was queued as a UTC timestamp)
+        self._properties: dict[str, tuple[Any, float]] = {}
+
+    def __bool__(self) -> bool:
+        """Return whether properties are waiting to be written."""
+        return bool(self._properties)
+
+    def __len__(self) -> int:
+        """Return the number of properties waiting to be written."""
+        return len(self._properties)
+
+    def add(self, properties: dict[str, Any], now: float) -> None:
+        """Queue properties, replacing queued values of the same properties."""
+        for key, value in properties.items():
+            self._properties[key] = (value, now)
+
+    def expire(self, now: float) -> list[str]:
+        """Drop properties queued longer than the TTL ago, return their names."""
+        expired = [
+            key
+            for key, (_, queued_at) in self._properties.items()
+            if now - queued_at >= self.ttl
+        ]
+        for key in expired:
+            del self._properties[key]
+        return expired
+
+    def properties(self) -> dict[str, Any]:
+        """Return the merged properties to write."""
+        return {key: value for key, (value, _) in self._properties.items()}
+
+    def discard(self, written: dict[str, Any]) -> None:
+        """Remove written properties that were not queued again since."""
+        for key, value in written.items():
+            if key in self._properties and self._properties[key][0] == value:
+                del self._properties[key]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {
+            key: {"value": value, "queued_at": queued_at}
+            for key, (value, queued_at) in self._properties.items()
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Restore a queue saved with as_dict."""
+        self._properties = {
+            key: (item["value"], float(item["queued_at"])) for key, item in data.items()
+        }
@@ -2,21 +2,117 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_NAME, CONF_RESOURCE
+from homeassistant.core import callback
+from homeassistant.helpers import selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DEFAULT_NAME, DEFAULT_RESOURCE, DOMAIN
+from .api import READ_TIMEOUT, InvalidResource, async_read_report, normalize_resource
+from .const import (
+    CONF_CHARGE_HOURS,
+    CONF_CHARGE_POWER,
+    CONF_COMPACT,
+    CONF_CONTIGUOUS,
+    CONF_DISCHARGE_HOURS,
+    CONF_DISCHARGE_POWER,
+    CONF_FEED_IN_FACTOR,
+    CONF_FORECAST_ATTRIBUTE,
+    CONF_FORECAST_ENTITY,
+    CONF_FORECAST_TIME_KEY,
+    CONF_FORECAST_VALUE_KEY,
+    CONF_HUB,
+    CONF_HUBS,
+    CONF_MAX_INTERVAL,
+    CONF_METER_ENTITY,
+    CONF_METRICS,
+    CONF_MIN_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_RECORD_TRACES,
+    CONF_RECORDER_PROFILE,
+    CONF_REQUEST_TIMEOUT,
+    CONF_RULES,
+    CONF_SCAN,
+    CONF_SENSOR_GROUPS,
+    CONF_SITE,
+    CONF_SOLAR_ATTRIBUTE,
+    CONF_SOLAR_ENTITY,
+    CONF_SOLAR_TIME_KEY,
+    CONF_SOLAR_VALUE_KEY,
+    CONF_STRATEGY,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_TRACE_FIELDS,
+    DEFAULT_CHARGE_HOURS,
+    DEFAULT_CHARGE_POWER,
+    DEFAULT_CONTIGUOUS,
+    DEFAULT_DISCHARGE_HOURS,
+    DEFAULT_DISCHARGE_POWER,
+    DEFAULT_FEED_IN_FACTOR,
+    DEFAULT_FORECAST_ATTRIBUTE,
+    DEFAULT_FORECAST_TIME_KEY,
+    DEFAULT_FORECAST_VALUE_KEY,
+    DEFAULT_NAME,
+    DEFAULT_RECORDER_PROFILE,
+    DEFAULT_RESOURCE,
+    DEFAULT_SOLAR_ATTRIBUTE,
+    DEFAULT_SOLAR_TIME_KEY,
+    DEFAULT_SOLAR_VALUE_KEY,
+    DEFAULT_STRATEGY,
+    DOMAIN,
+    RECORDER_TIERS,
+    RULE_ABOVE,
+    RULE_KINDS,
+    SENSOR_GROUPS,
+    STRATEGY_CHEAPEST_HOURS,
+    STRATEGY_OPTIMAL,
+)
+from .discovery import (
+    DiscoveredHub,
+    async_local_networks,
+    async_probe,
+    async_sweep,
+)
+from .polling import LIVE_OPTIONS, PollingOptions, sensor_groups
+from .replay import ReplaySource, is_replay_resource
+from .sensor import decoded_fields, snapshot_fields
+from .site import is_site_entry
+
+if TYPE_CHECKING:
+    from homeassistant.components.zeroconf import ZeroconfServiceInfo
 
 
 class ZendureLocalConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Zendure Local."""
 
     VERSION = 1
-    MINOR_VERSION = 1
+    MINOR_VERSION = 2
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._name = DEFAULT_NAME
+        self._hub: DiscoveredHub | None = None
+        self._hubs: dict[str, DiscoveredHub] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow."""
+        return ZendureLocalOptionsFlow()
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(cls, config_entry: ConfigEntry) -> bool:
+        """Return whether the entry has options, sites have none."""
+        return not is_site_entry(config_entry)
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -25,18 +121,455 @@ class ZendureLocalConfigFlow(ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            # Check for existing entries with the same resource to prevent duplicates
-            self._async_abort_entries_match({CONF_RESOURCE: user_input[CONF_RESOURCE]})
-
-            return self.async_create_entry(title=user_input[CONF_NAME], data=user_input)
+            self._name = user_input[CONF_NAME]
+            if user_input.get(CONF_SCAN):
+                return await self.async_step_scan()
+            if user_input.get(CONF_SITE):
+                return await self.async_step_site()
+            try:
+                resource = normalize_resource(user_input[CONF_RESOURCE])
+            except InvalidResource:
+                errors[CONF_RESOURCE] = "invalid_url"
+            else:
+                # Check for existing entries with the same resource to prevent duplicates
+                self._async_abort_entries_match({CONF_RESOURCE: resource})
+                if is_replay_resource(resource):
+                    if await self._async_trace_exists(resource):
+                        return self._async_create_hub_entry(resource)
+                    errors[CONF_RESOURCE] = "cannot_connect"
+                else:
+                    report = await async_read_report(
+                        async_get_clientsession(self.hass), resource
+                    )
+                    if report is None:
+                        errors[CONF_RESOURCE] = "cannot_connect"
+                    else:
+                        await self.async_set_unique_id(str(report["sn"]))
+                        self._abort_if_unique_id_configured(
+                            updates={CONF_RESOURCE: resource}
+                        )
+                        return self._async_create_hub_entry(resource)
 
         return self.async_show_form(
             step_id="user",
+            data_schema=self.add_suggested_values_to_schema(
+                vol.Schema(
+                    {
+                        vol.Required(CONF_NAME, default=DEFAULT_NAME): str,
+                        vol.Required(CONF_RESOURCE, default=DEFAULT_RESOURCE): str,
+                        vol.Optional(CONF_SCAN, default=False): bool,
+                        vol.Optional(CONF_SITE, default=False): bool,
+                    }
+                ),
+                user_input or {},
+            ),
+            errors=errors,
+        )
+
+    async def async_step_scan(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Sweep the local network for hubs that are not configured yet."""
+        networks = await async_local_networks(self.hass)
+        hubs = await async_sweep(async_get_clientsession(self.hass), networks)
+        configured = self._async_current_ids(include_ignore=True)
+        self._hubs = {hub.serial: hub for hub in hubs if hub.serial not in configured}
+        if not self._hubs:
+            return self.async_abort(reason="no_hubs_found")
+        return await self.async_step_pick()
+
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Let the user pick one of the hubs found by the sweep."""
+        if user_input is not None:
+            hub = self._hubs[user_input[CONF_HUB]]
+            await self.async_set_unique_id(hub.serial)
+            self._abort_if_unique_id_configured(updates={CONF_RESOURCE: hub.resource})
+            return self._async_create_hub_entry(hub.resource)
+
+        return self.async_show_form(
+            step_id="pick",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_NAME, default=DEFAULT_NAME): str,
-                    vol.Required(CONF_RESOURCE, default=DEFAULT_RESOURCE): str,
+                    vol.Required(CONF_HUB): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=serial, label=hub.label)
+                                for serial, hub in self._hubs.items()
+                            ]
+                        )
+                    )
+                }
+            ),
+        )
+
+    async def async_step_site(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Combine configured hubs and a grid meter into a site."""
+        hubs = {
+            entry.entry_id: entry.title
+            for entry in self._async_current_entries(include_ignore=False)
+            if not is_site_entry(entry)
+        }
+        if not hubs:
+            return self.async_abort(reason="no_hubs_configured")
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            selected = [hub for hub in user_input[CONF_HUBS] if hub in hubs]
+            if not selected:
+                errors[CONF_HUBS] = "no_hubs_selected"
+            else:
+                data = {CONF_NAME: self._name, CONF_HUBS: selected}
+                if user_input.get(CONF_METER_ENTITY):
+                    data[CONF_METER_ENTITY] = user_input[CONF_METER_ENTITY]
+                return self.async_create_entry(title=self._name, data=data)
+
+        return self.async_show_form(
+            step_id="site",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_HUBS, default=list(hubs)
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=entry_id, label=title)
+                                for entry_id, title in hubs.items()
+                            ],
+                            multiple=True,
+                        )
+                    ),
+                    vol.Optional(CONF_METER_ENTITY): selector.EntitySelector(
+                        selector.EntitySelectorConfig(
+                            domain="sensor", device_class="power"
+                        )
+                    ),
                 }
             ),
             errors=errors,
         )
+
+    async def async_step_zeroconf(
+        self, discovery_info: ZeroconfServiceInfo
+    ) -> ConfigFlowResult:
+        """Handle a hub announced over mDNS."""
+        hub = await async_probe(
+            async_get_clientsession(self.hass), discovery_info.host, READ_TIMEOUT
+        )
+        if hub is None:
+            return self.async_abort(reason="not_a_hub")
+        await self.async_set_unique_id(hub.serial)
+        # Follow the hub to its new address
+        self._abort_if_unique_id_configured(updates={CONF_RESOURCE: hub.resource})
+        self._hub = hub
+        self.context["title_placeholders"] = {"name": hub.label}
+        return await self.async_step_zeroconf_confirm()
+
+    async def async_step_zeroconf_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Confirm adding a discovered hub."""
+        assert self._hub is not None
+        if user_input is not None:
+            self._name = user_input[CONF_NAME]
+            return self._async_create_hub_entry(self._hub.resource)
+
+        return self.async_show_form(
+            step_id="zeroconf_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_NAME, default=self._hub.product or DEFAULT_NAME
+                    ): str
+                }
+            ),
+            description_placeholders={"hub": self._hub.label},
+        )
+
+    @callback
+    def _async_create_hub_entry(self, resource: str) -> ConfigFlowResult:
+        return self.async_create_entry(
+            title=self._name, data={CONF_NAME: self._name, CONF_RESOURCE: resource}
+        )
+
+    async def _async_trace_exists(self, resource: str) -> bool:
+        path = ReplaySource.from_resource(resource).path
+        return await self.hass.async_add_executor_job(path.is_file)
+
+
+def options_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the options schema with the current options as defaults."""
+    forecast_entity = options.get(CONF_FORECAST_ENTITY)
+    solar_entity = options.get(CONF_SOLAR_ENTITY)
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_STRATEGY, default=options.get(CONF_STRATEGY, DEFAULT_STRATEGY)
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[STRATEGY_CHEAPEST_HOURS, STRATEGY_OPTIMAL],
+                    translation_key=CONF_STRATEGY,
+                )
+            ),
+            vol.Optional(
+                CONF_FORECAST_ENTITY,
+                description={"suggested_value": forecast_entity},
+            ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
+            vol.Required(
+                CONF_FORECAST_ATTRIBUTE,
+                default=options.get(
+                    CONF_FORECAST_ATTRIBUTE, DEFAULT_FORECAST_ATTRIBUTE
+                ),
+            ): str,
+            vol.Required(
+                CONF_FORECAST_TIME_KEY,
+                default=options.get(CONF_FORECAST_TIME_KEY, DEFAULT_FORECAST_TIME_KEY),
+            ): str,
+            vol.Required(
+                CONF_FORECAST_VALUE_KEY,
+                default=options.get(
+                    CONF_FORECAST_VALUE_KEY, DEFAULT_FORECAST_VALUE_KEY
+                ),
+            ): str,
+            vol.Required(
+                CONF_CHARGE_HOURS,
+                default=options.get(CONF_CHARGE_HOURS, DEFAULT_CHARGE_HOURS),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=24)),
+            vol.Required(
+                CONF_DISCHARGE_HOURS,
+                default=options.get(CONF_DISCHARGE_HOURS, DEFAULT_DISCHARGE_HOURS),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=24)),
+            vol.Required(
+                CONF_CHARGE_POWER,
+                default=options.get(CONF_CHARGE_POWER, DEFAULT_CHARGE_POWER),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
+            vol.Required(
+                CONF_DISCHARGE_POWER,
+                default=options.get(CONF_DISCHARGE_POWER, DEFAULT_DISCHARGE_POWER),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
+            vol.Required(
+                CONF_CONTIGUOUS,
+                default=options.get(CONF_CONTIGUOUS, DEFAULT_CONTIGUOUS),
+            ): bool,
+            vol.Optional(
+                CONF_SOLAR_ENTITY,
+                description={"suggested_value": solar_entity},
+            ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
+            vol.Required(
+                CONF_SOLAR_ATTRIBUTE,
+                default=options.get(CONF_SOLAR_ATTRIBUTE, DEFAULT_SOLAR_ATTRIBUTE),
+            ): str,
+            vol.Required(
+                CONF_SOLAR_TIME_KEY,
+                default=options.get(CONF_SOLAR_TIME_KEY, DEFAULT_SOLAR_TIME_KEY),
+            ): str,
+            vol.Required(
+                CONF_SOLAR_VALUE_KEY,
+                default=options.get(CONF_SOLAR_VALUE_KEY, DEFAULT_SOLAR_VALUE_KEY),
+            ): str,
+            vol.Required(
+                CONF_FEED_IN_FACTOR,
+                default=options.get(CONF_FEED_IN_FACTOR, DEFAULT_FEED_IN_FACTOR),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+            vol.Required(
+                CONF_RECORD_TRACES,
+                default=options.get(CONF_RECORD_TRACES, False),
+            ): bool,
+            vol.Optional(
+                CONF_TRACE_FIELDS,
+                default=options.get(CONF_TRACE_FIELDS, []),
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=decoded_fields(),
+                    multiple=True,
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Required(
+                CONF_METRICS,
+                default=options.get(CONF_METRICS, False),
+            ): bool,
+            vol.Required(
+                CONF_COMPACT,
+                default=options.get(CONF_COMPACT, False),
+            ): bool,
+            vol.Required(
+                CONF_RECORDER_PROFILE,
+                default=options.get(CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE),
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=list(RECORDER_TIERS),
+                    translation_key=CONF_RECORDER_PROFILE,
+                )
+            ),
+        }
+    )
+
+
+def polling_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the schema of the polling options."""
+    polling = PollingOptions.from_options(options)
+    return vol.Schema(
+        {
+            vol.Required(CONF_MIN_INTERVAL, default=polling.min_interval): vol.All(
+                vol.Coerce(float), vol.Range(min=5, max=3600)
+            ),
+            vol.Required(CONF_MAX_INTERVAL, default=polling.max_interval): vol.All(
+                vol.Coerce(float), vol.Range(min=5, max=3600)
+            ),
+            vol.Required(CONF_REQUEST_TIMEOUT, default=polling.timeout): vol.All(
+                vol.Coerce(float), vol.Range(min=1, max=60)
+            ),
+            vol.Required(CONF_POWER_DEADBAND, default=polling.power_deadband): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=1000)
+            ),
+            vol.Required(
+                CONF_TEMPERATURE_DEADBAND, default=polling.temperature_deadband
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+            vol.Required(
+                CONF_SENSOR_GROUPS, default=sorted(sensor_groups(options))
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=list(SENSOR_GROUPS),
+                    multiple=True,
+                    translation_key=CONF_SENSOR_GROUPS,
+                )
+            ),
+        }
+    )
+
+
+def rule_schema() -> vol.Schema:
+    """Return the schema of a new rule."""
+    return vol.Schema(
+        {
+            vol.Required("name"): str,
+            vol.Required("field"): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=snapshot_fields(),
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+            vol.Required("kind", default=RULE_ABOVE): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=list(RULE_KINDS), translation_key="rule_kind"
+                )
+            ),
+            vol.Required("threshold"): vol.Coerce(float),
+            vol.Required("hysteresis", default=0.0): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+        }
+    )
+
+
+class ZendureLocalOptionsFlow(OptionsFlow):
+    """Handle Zendure Local options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Choose between the settings and the rules."""
+        return self.async_show_menu(
+            step_id="init",
+            menu_options=["settings", "polling", "add_rule", "remove_rule"],
+        )
+
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the scheduler options."""
+        if user_input is not None:
+            polling = {
+                key: value
+                for key, value in self.config_entry.options.items()
+                if key in (*LIVE_OPTIONS, CONF_SENSOR_GROUPS)
+            }
+            return self.async_create_entry(
+                data=polling | user_input | {CONF_RULES: self._rules()}
+            )
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=options_schema(dict(self.config_entry.options)),
+        )
+
+    async def async_step_polling(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the polling interval, timeouts, deadbands and sensor groups."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors[CONF_MAX_INTERVAL] = "interval_bounds"
+            else:
+                return self.async_create_entry(
+                    data=self.config_entry.options | user_input
+                )
+
+        return self.async_show_form(
+            step_id="polling",
+            data_schema=self.add_suggested_values_to_schema(
+                polling_schema(dict(self.config_entry.options)), user_input or {}
+            ),
+            errors=errors,
+        )
+
+    async def async_step_add_rule(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Add a threshold or rate of change rule."""
+        errors: dict[str, str] = {}
+        rules = self._rules()
+        if user_input is not None:
+            if any(rule["name"] == user_input["name"] for rule in rules):
+                errors["name"] = "rule_exists"
+            else:
+                # Only loaded when rules are used, like in async_setup_entry
+                from .rules import Rule
+
+                rule = Rule.from_dict(user_input)
+                return self.async_create_entry(
+                    data=self.config_entry.options
+                    | {CONF_RULES: [*rules, rule.as_dict()]}
+                )
+
+        return self.async_show_form(
+            step_id="add_rule",
+            data_schema=self.add_suggested_values_to_schema(
+                rule_schema(), user_input or {}
+            ),
+            errors=errors,
+        )
+
+    async def async_step_remove_rule(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Remove rules."""
+        rules = self._rules()
+        if not rules:
+            return self.async_abort(reason="no_rules")
+        if user_input is not None:
+            removed = set(user_input["rules"])
+            return self.async_create_entry(
+                data=self.config_entry.options
+                | {CONF_RULES: [rule for rule in rules if rule["name"] not in removed]}
+            )
+
+        return self.async_show_form(
+            step_id="remove_rule",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("rules"): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[rule["name"] for rule in rules], multiple=True
+                        )
+                    )
+                }
+            ),
+        )
+
+    def _rules(self) -> list[dict[str, Any]]:
+        return list(self.config_entry.options.get(CONF_RULES, []))
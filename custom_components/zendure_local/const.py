@@ -7,3 +7,119 @@ DEFAULT_NAME = "Zendure Local"
 DEFAULT_HOST = "http://SolarFlow800.lan"
 DEFAULT_RESOURCE = f"{DEFAULT_HOST}/properties/report"
 SCAN_INTERVAL = timedelta(seconds=60)
+DEFAULT_REQUEST_TIMEOUT = 10
+
+# Polling options, applied to the running coordinator
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_POWER_DEADBAND = "power_deadband"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+
+# Groups of sensors created next to the hub sensors
+CONF_SENSOR_GROUPS = "sensor_groups"
+GROUP_ESTIMATES = "estimates"
+GROUP_STATUS = "status"
+GROUP_AGGREGATES = "aggregates"
+GROUP_PACKS = "packs"
+GROUP_PACK_INDICATORS = "pack_indicators"
+SENSOR_GROUPS = (
+    GROUP_ESTIMATES,
+    GROUP_STATUS,
+    GROUP_AGGREGATES,
+    GROUP_PACKS,
+    GROUP_PACK_INDICATORS,
+)
+
+# Host name and last resolved address of the hub, stored in the entry data
+CONF_LAST_ADDRESS = "last_address"
+
+# Config flow: sweep the local network instead of entering a URL
+CONF_SCAN = "scan"
+CONF_HUB = "hub"
+
+# acMode values of /properties/write
+AC_MODE_CHARGE = 1
+AC_MODE_DISCHARGE = 2
+
+# Site entries sample several hubs and a grid meter together
+CONF_SITE = "site"
+CONF_HUBS = "hubs"
+CONF_METER_ENTITY = "meter_entity"
+
+# Opt-in capture of raw reports to trace files
+CONF_RECORD_TRACES = "record_traces"
+
+# Opt-in OpenMetrics export of the hub at /api/zendure_local/metrics
+CONF_METRICS = "metrics"
+
+# Fields whose every decoded value is logged at debug level
+CONF_TRACE_FIELDS = "trace_fields"
+
+# Recorder budget: sensors are grouped in tiers, a profile enables the tiers
+# up to and including its own and keeps statistics only for those
+CONF_RECORDER_PROFILE = "recorder_profile"
+TIER_CORE = "core"
+TIER_EXTENDED = "extended"
+TIER_DIAGNOSTIC = "diagnostic"
+RECORDER_TIERS = (TIER_CORE, TIER_EXTENDED, TIER_DIAGNOSTIC)
+DEFAULT_RECORDER_PROFILE = TIER_EXTENDED
+# Profile the registered sensors were last enabled and disabled for, entry data
+CONF_APPLIED_PROFILE = "applied_profile"
+
+# Compact mode: a few primary sensors plus one snapshot sensor per hub
+CONF_COMPACT = "compact"
+# Sensor options the registered sensors of the entry were last pruned for,
+# stored in the entry data
+CONF_APPLIED_SENSORS = "applied_sensors"
+
+# Threshold and rate of change rules, fired as events on the bus
+CONF_RULES = "rules"
+EVENT_ZENDURE_LOCAL = "zendure_local_event"
+RULE_ABOVE = "above"
+RULE_BELOW = "below"
+RULE_RISING = "rising"
+RULE_FALLING = "falling"
+RULE_KINDS = (RULE_ABOVE, RULE_BELOW, RULE_RISING, RULE_FALLING)
+# Rule fields with this prefix are evaluated for every battery pack
+PACK_FIELD_PREFIX = "pack."
+
+# Persisted coordinator state (pack analytics)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 300
+
+# Cheapest hours scheduler options
+CONF_FORECAST_ENTITY = "forecast_entity"
+CONF_FORECAST_ATTRIBUTE = "forecast_attribute"
+CONF_FORECAST_TIME_KEY = "forecast_time_key"
+CONF_FORECAST_VALUE_KEY = "forecast_value_key"
+CONF_CHARGE_HOURS = "charge_hours"
+CONF_DISCHARGE_HOURS = "discharge_hours"
+CONF_CHARGE_POWER = "charge_power"
+CONF_DISCHARGE_POWER = "discharge_power"
+CONF_CONTIGUOUS = "contiguous"
+DEFAULT_FORECAST_ATTRIBUTE = "forecast"
+DEFAULT_FORECAST_TIME_KEY = "datetime"
+DEFAULT_FORECAST_VALUE_KEY = "electricity_price"
+DEFAULT_CHARGE_HOURS = 5
+DEFAULT_DISCHARGE_HOURS = 5
+DEFAULT_CHARGE_POWER = 800
+DEFAULT_DISCHARGE_POWER = 800
+DEFAULT_CONTIGUOUS = True
+
+# SOC planner options
+CONF_STRATEGY = "strategy"
+CONF_SOLAR_ENTITY = "solar_entity"
+CONF_SOLAR_ATTRIBUTE = "solar_attribute"
+CONF_SOLAR_TIME_KEY = "solar_time_key"
+CONF_SOLAR_VALUE_KEY = "solar_value_key"
+CONF_FEED_IN_FACTOR = "feed_in_factor"
+STRATEGY_CHEAPEST_HOURS = "cheapest_hours"
+STRATEGY_OPTIMAL = "optimal"
+DEFAULT_STRATEGY = STRATEGY_CHEAPEST_HOURS
+# Defaults match the Solcast detailedForecast attribute, pv_estimate is in kW
+DEFAULT_SOLAR_ATTRIBUTE = "detailedForecast"
+DEFAULT_SOLAR_TIME_KEY = "period_start"
+DEFAULT_SOLAR_VALUE_KEY = "pv_estimate"
+SOLAR_VALUE_SCALE = 1000
+DEFAULT_FEED_IN_FACTOR = 1.0
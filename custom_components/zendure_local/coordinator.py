@@ -0,0 +1,404 @@
+"""Data update coordinator for the Zendure Local integration."""
+
+from collections.abc import Callable
+from datetime import timedelta
+import logging
+from pathlib import Path
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .analytics import PackHealthTracker, pack_key
+from .api import async_write_properties, write_url
+from .battery import BatteryLimits, compute_pack_aggregates
+from .commands import PendingCommands
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .decode_log import DecodeErrorLog
+from .estimators import CoulombEstimator, RuntimeEstimator
+from .polling import PollingOptions, is_active
+from .recorder import TraceRecorder
+from .replay import ReplaySource, is_replay_resource
+from .resolver import PinnedHost
+
+_LOGGER = logging.getLogger(__name__)
+
+# Queued writes must survive a restart, they are saved almost immediately
+COMMANDS_SAVE_DELAY = 1
+
+
+def report_key(data: dict) -> tuple | None:
+    """Return what identifies a report, None if it cannot be identified."""
+    key = (data.get("timestamp"), data.get("messageId"))
+    return None if key == (None, None) else key
+
+
+class ZendureCoordinator(DataUpdateCoordinator):
+    """Data coordinator for Zendure Local sensors."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        resource: str,
+        entry_id: str | None = None,
+        record_traces: bool = False,
+        trace_fields: list[str] | None = None,
+        last_address: dict[str, str] | None = None,
+        address_listener: Callable[[dict[str, str]], None] | None = None,
+        polling: PollingOptions | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.polling = polling or PollingOptions()
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=self.polling.min_interval),
+            # Skipped duplicate reports return the same data, which is not
+            # passed on to the entities
+            always_update=False,
+        )
+        self.resource = resource
+        # The address of the host is pinned, address_listener stores a new one
+        self.host = PinnedHost(resource, last_address)
+        self._address_listener = address_listener
+        # A file:// resource replays a recorded trace instead of polling HTTP
+        self.replay: ReplaySource | None = None
+        if is_replay_resource(resource):
+            self.replay = ReplaySource.from_resource(resource)
+            self.update_interval = self._replay_interval(self.replay)
+        # Polled by the sampler of a site instead of its own timer, see site.
+        # The interval the polling options ask for then goes to the sampler
+        self.site_owned = False
+        self.site_interval: timedelta | None = None
+        self.pack_aggregates: dict[str, float | int | None] = {}
+        self.pack_health = PackHealthTracker()
+        self.pack_coulomb = CoulombEstimator()
+        self.runtime = RuntimeEstimator()
+        self.hub_estimates: dict[str, int | None] = {}
+        # Derived per-pack values keyed by pack, rebuilt once per poll
+        self.pack_indicators: dict[str, dict[str, float | None]] = {}
+        self.record_traces = record_traces
+        # Created on the first report, traces are stored per device serial
+        self.recorder: TraceRecorder | None = None
+        self.fetch_latency: float | None = None
+        # UTC timestamp of the last successful fetch, see site
+        self.fetched_at: float | None = None
+        # Seconds between the device timestamp of the report and the last poll
+        self.data_age: float | None = None
+        self.duplicate_reports = 0
+        # Poll counters and timing, exported as metrics
+        self.polls = 0
+        self.poll_failures = 0
+        self.decode_duration: float | None = None
+        self._poll_listeners: list[Callable[[], None]] = []
+        # Shared by every entity reading the report, see decode_log
+        self.decode_errors = DecodeErrorLog(trace_fields or ())
+        # Report and its decoded snapshot, see sensor.decode_snapshot
+        self.snapshot_cache: tuple[dict, dict] | None = None
+        # Writes the device did not receive, sent in one request after it
+        # answers a poll again
+        self.pending_commands = PendingCommands()
+        # Analytics are only persisted for coordinators bound to a config entry
+        self._store: Store | None = (
+            Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}") if entry_id else None
+        )
+        # Saved separately and quickly, the analytics are saved every few minutes
+        self._commands_store: Store | None = (
+            Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.commands")
+            if entry_id
+            else None
+        )
+
+    def _replay_interval(self, replay: ReplaySource) -> timedelta:
+        return timedelta(seconds=self.polling.min_interval) / replay.speed
+
+    def _initial_interval(self) -> timedelta:
+        """Return the interval polling starts with."""
+        if self.replay is not None:
+            return self._replay_interval(self.replay)
+        return timedelta(seconds=self.polling.min_interval)
+
+    @callback
+    def async_set_polling(self, polling: PollingOptions) -> None:
+        """Apply new polling options, starting from the shortest interval."""
+        self.polling = polling
+        if self.site_owned:
+            self.site_interval = self._initial_interval()
+            return
+        self.update_interval = self._initial_interval()
+        if self._unsub_refresh is not None:
+            # Reschedule the pending poll with the new interval
+            self._schedule_refresh()
+
+    @callback
+    def async_set_site_owned(self, owned: bool) -> None:
+        """Hand the schedule of the hub to the sampler of a site, or take it back.
+
+        The sampler refreshes the hub together with the other hubs of the
+        site. A timer of its own would fire next to the one of the sampler
+        and poll the hub twice in most intervals, so it is suspended.
+        """
+        if owned == self.site_owned:
+            return
+        self.site_owned = owned
+        if owned:
+            self.site_interval = self._initial_interval()
+            self.update_interval = None
+            self._async_unsub_refresh()
+        else:
+            self.update_interval = self._initial_interval()
+            if self._listeners:
+                self._schedule_refresh()
+
+    async def async_load_state(self) -> None:
+        """Restore persisted pack analytics and queued writes."""
+        if self._store is None or self._commands_store is None:
+            return
+        stored = await self._store.async_load()
+        if stored:
+            self.pack_health.load(stored.get("pack_health", {}))
+            self.pack_coulomb.load(stored.get("pack_coulomb", {}))
+        commands = await self._commands_store.async_load()
+        if commands:
+            self.pending_commands.load(commands)
+
+    def _state_to_store(self) -> dict:
+        """Return the state to persist."""
+        return {
+            "pack_health": self.pack_health.as_dict(),
+            "pack_coulomb": self.pack_coulomb.as_dict(),
+        }
+
+    async def _async_update_data(self) -> dict:
+        """Fetch data and refresh the derived pack statistics."""
+        data = await self._async_fetch_data()
+        self.polls += 1
+        if data:
+            self.fetched_at = dt_util.utcnow().timestamp()
+            if self.pending_commands:
+                await self._async_write_pending(data)
+        else:
+            self.poll_failures += 1
+        self.data_age = None
+        if data and data.get("timestamp") is not None:
+            self.data_age = round(dt_util.utcnow().timestamp() - data["timestamp"])
+        key = report_key(data)
+        if self.replay is None:
+            active = is_active(self.data, data, self.polling.power_deadband)
+            if self.site_owned:
+                self.site_interval = self.polling.next_interval(
+                    self.site_interval, active
+                )
+            else:
+                self.update_interval = self.polling.next_interval(
+                    self.update_interval, active
+                )
+        if key is not None and self.data and key == report_key(self.data):
+            # Polled faster than the hub refreshes its report, nothing changed
+            self.duplicate_reports += 1
+            for update_callback in list(self._poll_listeners):
+                update_callback()
+            return self.data
+        if data and self.record_traces:
+            self._record(data)
+        started = time.monotonic()
+        self.decode_errors.new_report()
+        pack_data = (data.get("packData") or []) if data else []
+        self.pack_aggregates = compute_pack_aggregates(pack_data) if data else {}
+        if pack_data:
+            now = dt_util.utcnow().timestamp()
+            properties = data.get("properties", {})
+            self.pack_health.update(pack_data, now)
+            self.pack_coulomb.update(
+                pack_data,
+                now,
+                # minSoc and socSet are reported in 0.1 % units
+                empty_soc=int(properties.get("minSoc", 0)) // 10,
+                full_soc=int(properties.get("socSet", 1000)) // 10,
+            )
+            self.pack_indicators = {
+                key: {
+                    **self.pack_health.indicators(key),
+                    **self.pack_coulomb.indicators(key),
+                }
+                for key in (
+                    pack_key(pack, index) for index, pack in enumerate(pack_data)
+                )
+            }
+            self._update_runtime_estimates(properties, pack_data, now)
+            if self._store is not None:
+                self._store.async_delay_save(self._state_to_store, STORAGE_SAVE_DELAY)
+        self.decode_duration = time.monotonic() - started
+        return data
+
+    @callback
+    def async_add_poll_listener(
+        self, update_callback: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for polls that returned an unchanged report."""
+        self._poll_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._poll_listeners.remove(update_callback)
+
+        return remove_listener
+
+    def _record(self, data: dict) -> None:
+        """Queue the raw report for the trace recorder."""
+        if self.recorder is None:
+            serial = data.get("sn") or "unknown"
+            self.recorder = TraceRecorder(
+                Path(self.hass.config.path(DOMAIN, "traces", serial))
+            )
+            self.recorder.start()
+        self.recorder.record(data, dt_util.now(), self.fetch_latency or 0.0)
+
+    async def async_stop_recorder(self) -> None:
+        """Write out and stop the trace recorder."""
+        if self.recorder is not None:
+            await self.hass.async_add_executor_job(self.recorder.stop)
+            self.recorder = None
+
+    def _update_runtime_estimates(
+        self, properties: dict, pack_data: list[dict], now: float
+    ) -> None:
+        """Update the time to empty and time to full estimates."""
+        try:
+            # packInputPower is power drawn from the packs, outputPackPower is
+            # power into the packs
+            self.runtime.update(
+                int(properties["packInputPower"]) - int(properties["outputPackPower"]),
+                now,
+            )
+            window = self.pack_coulomb.energy_window(
+                pack_data,
+                floor_soc=int(properties.get("minSoc", 0)) / 10,
+                ceil_soc=int(properties.get("socSet", 1000)) / 10,
+            )
+        except (KeyError, ValueError, TypeError) as ex:
+            _LOGGER.debug("Cannot estimate remaining time: %s", ex)
+            window = None
+        self.hub_estimates = self.runtime.estimate(*window) if window else {}
+
+    def battery_limits(self) -> BatteryLimits | None:
+        """Return the battery limits of the hub from the last report."""
+        if not self.data:
+            return None
+        capacity = self.pack_coulomb.capacity_wh(self.data.get("packData") or [])
+        return BatteryLimits.from_report(self.data, capacity)
+
+    async def async_write_properties(self, properties: dict) -> bool:
+        """Write properties to the device, return whether it accepted them.
+
+        Properties the device does not receive are queued and written after
+        it answers a poll again. While writes are queued new ones are only
+        added to the queue, an unreachable device gets no extra requests.
+        """
+        if self.replay is not None:
+            _LOGGER.debug("Replaying a trace, not writing %s", properties)
+            return True
+        serial = (self.data or {}).get("sn")
+        if (
+            not self.pending_commands
+            and serial
+            and await self._async_post(serial, properties)
+        ):
+            return True
+        _LOGGER.info("Cannot reach the device now, queueing %s", properties)
+        self.pending_commands.add(properties, dt_util.utcnow().timestamp())
+        self._save_commands()
+        return False
+
+    async def _async_post(self, serial: str, properties: dict) -> bool:
+        """POST properties to the device, return whether it accepted them."""
+        if self.host.needs_resolve():
+            await self._async_resolve_host()
+        url, headers = self.host.request(write_url(self.resource))
+        accepted = await async_write_properties(
+            async_get_clientsession(self.hass),
+            url,
+            serial,
+            properties,
+            headers,
+            self.polling.timeout,
+        )
+        if not accepted:
+            self.host.failed()
+        return accepted
+
+    async def _async_write_pending(self, data: dict) -> None:
+        """Write the queued properties in one request, dropping stale ones."""
+        expired = self.pending_commands.expire(dt_util.utcnow().timestamp())
+        if expired:
+            _LOGGER.warning("Dropped queued writes of %s, they are stale", expired)
+        properties = self.pending_commands.properties()
+        serial = data.get("sn")
+        if properties and serial and await self._async_post(serial, properties):
+            _LOGGER.info("Wrote queued properties %s", properties)
+            self.pending_commands.discard(properties)
+        self._save_commands()
+
+    def _save_commands(self) -> None:
+        if self._commands_store is not None:
+            self._commands_store.async_delay_save(
+                self.pending_commands.as_dict, COMMANDS_SAVE_DELAY
+            )
+
+    async def _async_resolve_host(self) -> None:
+        """Resolve the host name of the device and store a new address."""
+        if await self.host.async_resolve() and self._address_listener is not None:
+            self._address_listener(self.host.as_dict())
+
+    async def _async_fetch_data(self) -> dict:
+        """Fetch data from Zendure device."""
+        if self.replay is not None:
+            return await self._async_replay_data(self.replay)
+        # Imported on first use, replaying a trace and the analysis tools do
+        # without it and Home Assistant itself has already loaded it
+        import requests
+
+        if self.host.needs_resolve():
+            await self._async_resolve_host()
+        url, headers = self.host.request(self.resource)
+        try:
+            _LOGGER.debug("Fetching data from %s", url)
+            started = time.monotonic()
+            response = await self.hass.async_add_executor_job(
+                lambda: requests.get(url, headers=headers, timeout=self.polling.timeout)
+            )
+            self.fetch_latency = time.monotonic() - started
+            # Example response:
+            # {"timestamp":1750179973,"messageId":142,"sn":"REDACTED","version":2,"product":"solarFlow800","properties":{"heatState":0,"packInputPower":676,"outputPackPower":0,"outputHomePower":799,"remainOutTime":324,"packState":2,"electricLevel":97,"gridInputPower":0,"solarInputPower":123,"solarPower1":64,"solarPower2":59,"pass":0,"reverseState":0,"socStatus":0,"hyperTmp":3211,"dcStatus":2,"pvStatus":1,"acStatus":1,"dataReady":1,"gridState":1,"BatVolt":4923,"socLimit":0,"writeRsp":0,"acMode":2,"inputLimit":400,"outputLimit":800,"socSet":1000,"minSoc":50,"gridStandard":4,"gridReverse":1,"inverseMaxPower":800,"lampSwitch":1,"IOTState":2,"factoryModeState":0,"OTAState":0,"LCNState":0,"oldMode":0,"VoltWakeup":0,"ts":1750179970,"bindstate":0,"tsZone":14,"chargeMaxLimit":800,"smartMode":1,"packNum":2,"rssi":-82,"is_error":0},"packData":[{"sn":"REDACTED","packType":70,"socLevel":97,"state":2,"power":742,"maxTemp":3091,"totalVol":4980,"batcur":65387,"maxVol":332,"minVol":331,"softVersion":4113,"heatState":0},{"sn":"REDACTED","packType":70,"socLevel":97,"state":2,"power":139,"maxTemp":3051,"totalVol":4970,"batcur":65508,"maxVol":332,"minVol":331,"softVersion":4113,"heatState":0}]}a
+
+            if response.status_code == 200:
+                data = response.json()
+                _LOGGER.debug("Successfully fetched data: %s", data)
+                return data
+
+            _LOGGER.warning("HTTP error %s when fetching data", response.status_code)
+            return {}
+
+        except requests.exceptions.RequestException as ex:
+            _LOGGER.error("Error fetching Zendure data: %s", ex)
+            # The device may have moved to another address
+            self.host.failed()
+            return {}
+        except (ValueError, KeyError) as ex:
+            _LOGGER.error("Error parsing Zendure data: %s", ex)
+            return {}
+
+    async def _async_replay_data(self, replay: ReplaySource) -> dict:
+        """Read the next report of a recorded trace."""
+        started = time.monotonic()
+        try:
+            data = await self.hass.async_add_executor_job(replay.read)
+        except (OSError, ValueError) as ex:
+            _LOGGER.error("Error replaying Zendure trace %s: %s", replay.path, ex)
+            return {}
+        self.fetch_latency = time.monotonic() - started
+        return data
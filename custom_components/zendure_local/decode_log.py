@@ -0,0 +1,98 @@
+"""Deduplicated, rate-limited reporting of values that fail to decode."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+import logging
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# At most this many failing fields are logged as warnings per window, more
+# are only counted until the window has passed
+MAX_WARNINGS = 5
+WARNING_WINDOW = 600.0
+
+# Raised by value functions on missing or malformed fields, e.g. an IndexError
+# for data["packData"][0] when a firmware reports no packs
+DECODE_ERRORS = (KeyError, IndexError, ValueError, TypeError)
+
+
+def field_name(field: str, pack: int | None) -> str:
+    """Return a field as it appears in the log."""
+    return field if pack is None else f"{field} of pack {pack + 1}"
+
+
+class DecodeErrorLog:
+    """Count decode failures per field and log every failure episode once.
+
+    A field that stops decoding, e.g. maxTemp when a firmware reports an empty
+    packData, is logged when it starts failing and when it decodes again. In
+    between only its counter goes up, however many entities read it. Fields
+    in trace_fields additionally log every decoded value at debug level.
+    """
+
+    def __init__(
+        self,
+        trace_fields: Iterable[str] = (),
+        max_warnings: int = MAX_WARNINGS,
+        window: float = WARNING_WINDOW,
+    ) -> None:
+        """Initialize the log."""
+        self.trace_fields = frozenset(trace_fields)
+        self.max_warnings = max_warnings
+        self.window = window
+        # Failed reports per field, a pack field counts once per pack
+        self.errors: dict[str, int] = {}
+        # Failure episodes that were not logged because of the rate limit
+        self.suppressed = 0
+        self._report = 0
+        # (field, pack) -> report of the last failure, while failing
+        self._failing: dict[tuple[str, int | None], int] = {}
+        self._warned_at: deque[float] = deque()
+
+    def new_report(self) -> None:
+        """Start counting the failures of a new report."""
+        self._report += 1
+
+    def failed(self, field: str, error: Exception, pack: int | None = None) -> None:
+        """Record that a field of the current report could not be decoded."""
+        key = (field, pack)
+        last = self._failing.get(key)
+        if last == self._report:
+            # Already counted for this report by another reader
+            return
+        self._failing[key] = self._report
+        self.errors[field] = self.errors.get(field, 0) + 1
+        if last is None:
+            self._warn(field_name(field, pack), error)
+
+    def decoded(self, field: str, value: Any, pack: int | None = None) -> None:
+        """Record that a field decoded, ending its failure episode."""
+        if self._failing:
+            key = (field, pack)
+            if key in self._failing:
+                del self._failing[key]
+                _LOGGER.info("%s decodes again", field_name(field, pack))
+        if field in self.trace_fields:
+            _LOGGER.debug("Decoded %s: %s", field_name(field, pack), value)
+
+    @property
+    def failing(self) -> list[str]:
+        """Return the fields that currently fail to decode."""
+        return sorted({field_name(field, pack) for field, pack in self._failing})
+
+    def _warn(self, name: str, error: Exception) -> None:
+        now = time.monotonic()
+        while self._warned_at and now - self._warned_at[0] >= self.window:
+            self._warned_at.popleft()
+        if len(self._warned_at) >= self.max_warnings:
+            self.suppressed += 1
+            _LOGGER.debug("Cannot decode %s: %r", name, error)
+            return
+        self._warned_at.append(now)
+        _LOGGER.warning(
+            "Cannot decode %s: %r, not logged again until it decodes", name, error
+        )
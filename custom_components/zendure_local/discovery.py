@@ -0,0 +1,105 @@
+"""Discovery of Zendure hubs on the local network."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from ipaddress import IPv4Address, IPv4Network, ip_interface
+import logging
+from typing import Any
+
+import aiohttp
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .api import REPORT_PATH, async_read_report
+
+_LOGGER = logging.getLogger(__name__)
+
+ZEROCONF_TYPE = "_zendure._tcp.local."
+# A hub answers within a few hundred milliseconds, anything slower is not
+# worth waiting for while sweeping a subnet
+SWEEP_TIMEOUT = 1.5
+SWEEP_CONCURRENCY = 64
+# Larger networks are only swept in the /24 around the own address
+SWEEP_PREFIX = 24
+
+
+@dataclass(frozen=True)
+class DiscoveredHub:
+    """A hub that answered on its report URL."""
+
+    host: str
+    product: str | None
+    serial: str
+
+    @property
+    def resource(self) -> str:
+        """Return the report URL of the hub."""
+        return f"http://{self.host}{REPORT_PATH}"
+
+    @property
+    def label(self) -> str:
+        """Return how the hub is shown in the config flow."""
+        return f"{self.product or 'Zendure'} {self.serial} ({self.host})"
+
+    @classmethod
+    def from_report(cls, host: str, report: dict[str, Any]) -> DiscoveredHub:
+        """Create a hub from its report."""
+        return cls(host, report.get("product"), str(report["sn"]))
+
+
+async def async_probe(
+    session: aiohttp.ClientSession, host: str, timeout: float = SWEEP_TIMEOUT
+) -> DiscoveredHub | None:
+    """Return the hub at a host, None if the host does not serve a report."""
+    report = await async_read_report(session, f"http://{host}{REPORT_PATH}", timeout)
+    return DiscoveredHub.from_report(host, report) if report else None
+
+
+def sweep_networks(addresses: Iterable[tuple[str, int]]) -> list[IPv4Network]:
+    """Return the networks to sweep for local IPv4 addresses and prefixes."""
+    networks: list[IPv4Network] = []
+    for address, prefix in addresses:
+        interface = ip_interface(f"{address}/{max(prefix, SWEEP_PREFIX)}")
+        if (
+            not isinstance(interface.ip, IPv4Address)
+            or interface.ip.is_loopback
+            or interface.ip.is_link_local
+        ):
+            continue
+        if interface.network not in networks:
+            networks.append(interface.network)
+    return networks
+
+
+async def async_local_networks(hass: HomeAssistant) -> list[IPv4Network]:
+    """Return the local networks of the enabled adapters."""
+    adapters = await network.async_get_adapters(hass)
+    return sweep_networks(
+        (ipv4["address"], ipv4["network_prefix"])
+        for adapter in adapters
+        if adapter["enabled"]
+        for ipv4 in adapter["ipv4"]
+    )
+
+
+async def async_sweep(
+    session: aiohttp.ClientSession,
+    networks: Iterable[IPv4Network],
+    timeout: float = SWEEP_TIMEOUT,
+    concurrency: int = SWEEP_CONCURRENCY,
+) -> list[DiscoveredHub]:
+    """Probe every host of the networks concurrently, return the hubs found."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host: str) -> DiscoveredHub | None:
+        async with semaphore:
+            return await async_probe(session, host, timeout)
+
+    hosts = [str(host) for net in networks for host in net.hosts()]
+    _LOGGER.debug("Probing %d hosts for Zendure hubs", len(hosts))
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    return [hub for hub in results if hub is not None]
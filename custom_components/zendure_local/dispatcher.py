@@ -0,0 +1,229 @@
+"""Split a site power setpoint across the hubs of the site."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .battery import BatteryLimits
+from .const import AC_MODE_CHARGE, AC_MODE_DISCHARGE
+from .site import ZendureSiteSampler
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hubs are only rewritten when their share moved at least this many W
+DISPATCH_THRESHOLD = 25
+# Output is derated linearly from the first to zero at the second temperature
+DERATE_TEMPERATURE = 40.0
+CUTOFF_TEMPERATURE = 50.0
+# Packs are not charged below this temperature
+MIN_CHARGE_TEMPERATURE = 0.0
+
+
+@dataclass(frozen=True)
+class HubCapacity:
+    """What a hub can contribute to a site setpoint.
+
+    Power is positive for discharging into the house and negative for
+    charging. The weights are the SOC headroom in the direction of the
+    setpoint, so fuller hubs discharge more and emptier hubs charge more.
+    """
+
+    max_discharge: float
+    max_charge: float
+    discharge_weight: float
+    charge_weight: float
+
+    @classmethod
+    def from_report(
+        cls,
+        data: dict[str, Any] | None,
+        temperature: float | None = None,
+    ) -> HubCapacity | None:
+        """Return the capacity of a hub from its report and hottest pack."""
+        if not data:
+            return None
+        limits = BatteryLimits.from_report(data)
+        try:
+            soc = float(data["properties"]["electricLevel"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if limits is None:
+            return None
+        derate = 1.0
+        if temperature is not None and temperature > DERATE_TEMPERATURE:
+            derate = max(
+                (CUTOFF_TEMPERATURE - temperature)
+                / (CUTOFF_TEMPERATURE - DERATE_TEMPERATURE),
+                0.0,
+            )
+        cold = temperature is not None and temperature < MIN_CHARGE_TEMPERATURE
+        discharge_weight = max(soc - limits.min_soc, 0.0)
+        charge_weight = 0.0 if cold else max(limits.max_soc - soc, 0.0)
+        return cls(
+            max_discharge=limits.max_discharge_power * derate,
+            max_charge=limits.max_charge_power * derate,
+            discharge_weight=discharge_weight,
+            charge_weight=charge_weight,
+        )
+
+
+def allocate(setpoint: float, hubs: dict[str, HubCapacity]) -> dict[str, int]:
+    """Split a setpoint in W across hubs, by SOC headroom within their ceilings.
+
+    A hub that reaches its ceiling keeps it, the rest is shared again by the
+    other hubs. More than all hubs together can deliver is capped.
+    """
+    discharging = setpoint >= 0
+    ceilings = {
+        key: hub.max_discharge if discharging else hub.max_charge
+        for key, hub in hubs.items()
+    }
+    weights = {
+        key: hub.discharge_weight if discharging else hub.charge_weight
+        for key, hub in hubs.items()
+    }
+    shares = dict.fromkeys(hubs, 0.0)
+    remaining = min(abs(setpoint), sum(ceilings.values()))
+    open_hubs = {key for key in hubs if ceilings[key] > 0 and weights[key] > 0}
+    while remaining > 0.5 and open_hubs:
+        total_weight = sum(weights[key] for key in open_hubs)
+        capped = {
+            key
+            for key in open_hubs
+            if shares[key] + remaining * weights[key] / total_weight >= ceilings[key]
+        }
+        if not capped:
+            for key in open_hubs:
+                shares[key] += remaining * weights[key] / total_weight
+            break
+        for key in capped:
+            remaining -= ceilings[key] - shares[key]
+            shares[key] = ceilings[key]
+        open_hubs -= capped
+    sign = 1 if discharging else -1
+    return {key: sign * round(share) for key, share in shares.items()}
+
+
+def dispatch_properties(previous: int | None, power: int) -> dict[str, int]:
+    """Return the properties that move a hub from one allocation to another."""
+    properties: dict[str, int] = {}
+    if power > 0:
+        properties.update(acMode=AC_MODE_DISCHARGE, outputLimit=power)
+        if previous is None or previous < 0:
+            properties["inputLimit"] = 0
+    elif power < 0:
+        properties.update(acMode=AC_MODE_CHARGE, inputLimit=-power)
+        if previous is None or previous > 0:
+            properties["outputLimit"] = 0
+    else:
+        if previous is None or previous > 0:
+            properties["outputLimit"] = 0
+        if previous is None or previous < 0:
+            properties["inputLimit"] = 0
+    return properties
+
+
+def needs_write(previous: int | None, power: int, threshold: float) -> bool:
+    """Return whether a new allocation is worth writing to a hub."""
+    if previous is None:
+        return True
+    if previous == power:
+        return False
+    # Stopping or reversing is always written
+    if power == 0 or (previous > 0) != (power > 0):
+        return True
+    return abs(power - previous) >= threshold
+
+
+class ZendureDispatcher:
+    """Keep the hubs of a site delivering the site setpoint.
+
+    The setpoint is split again after every site sample, as the SOC of the
+    hubs changes. Writes go to all hubs concurrently and only to hubs whose
+    share moved at least the threshold.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        sampler: ZendureSiteSampler,
+        threshold: float = DISPATCH_THRESHOLD,
+    ) -> None:
+        """Initialize the dispatcher of a site."""
+        self.hass = hass
+        self.sampler = sampler
+        self.threshold = threshold
+        self.setpoint: float | None = None
+        # Last allocation each hub accepted, by entry id
+        self.allocations: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Dispatch the setpoint again after every site sample."""
+        return self.sampler.async_add_listener(self._async_sampled)
+
+    @callback
+    def _async_sampled(self) -> None:
+        if self.setpoint is not None:
+            self.hass.async_create_task(
+                self.async_dispatch(), f"{self.sampler.name} dispatch"
+            )
+
+    async def async_set_setpoint(self, setpoint: float) -> None:
+        """Set the power the site delivers to the house, negative to charge."""
+        self.setpoint = setpoint
+        await self.async_dispatch()
+
+    def capacities(self) -> dict[str, HubCapacity]:
+        """Return the capacity of every hub of the site with a report."""
+        capacities = {}
+        for entry_id, coordinator in self.sampler.hub_coordinators().items():
+            capacity = HubCapacity.from_report(
+                coordinator.data, coordinator.pack_aggregates.get("packTempMax")
+            )
+            if capacity is not None:
+                capacities[entry_id] = capacity
+        return capacities
+
+    async def async_dispatch(self) -> None:
+        """Write the share of the setpoint to every hub that needs it."""
+        if self.setpoint is None:
+            return
+        async with self._lock:
+            coordinators = self.sampler.hub_coordinators()
+            shares = allocate(self.setpoint, self.capacities())
+            # A hub that lost its report or left the site keeps delivering its
+            # last share next to the full setpoint of the others, stop it
+            for entry_id in self.allocations.keys() - shares.keys():
+                if entry_id in coordinators:
+                    shares[entry_id] = 0
+                else:
+                    del self.allocations[entry_id]
+            writes = {
+                entry_id: power
+                for entry_id, power in shares.items()
+                if needs_write(self.allocations.get(entry_id), power, self.threshold)
+            }
+            if not writes:
+                return
+            _LOGGER.debug("Dispatching %s W as %s", self.setpoint, writes)
+            results = await asyncio.gather(
+                *(
+                    coordinators[entry_id].async_write_properties(
+                        dispatch_properties(self.allocations.get(entry_id), power)
+                    )
+                    for entry_id, power in writes.items()
+                )
+            )
+            for (entry_id, power), accepted in zip(writes.items(), results):
+                if accepted:
+                    self.allocations[entry_id] = power
+                else:
+                    # Written in full again on the next dispatch
+                    self.allocations.pop(entry_id, None)
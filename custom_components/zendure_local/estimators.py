@@ -0,0 +1,302 @@
+"""Incremental per-pack estimators for Zendure Local."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+import math
+from typing import Any
+
+from .analytics import MAX_SAMPLE_GAP, pack_key
+from .battery import decode_batcur
+
+# Used until a capacity has been measured between a full and an empty event,
+# this is the nominal capacity of an AB2000 pack (1920 Wh at 51.2 V)
+DEFAULT_PACK_CAPACITY_AH = 37.5
+NOMINAL_PACK_VOLTAGE = 51.2
+# A full or empty event is only used for a capacity estimate if the reported
+# SOC moved at least this much in between, small swings are dominated by the
+# integer resolution of socLevel
+MIN_CAPACITY_SOC_SWING = 50
+# Weight of a new capacity measurement against the previous estimate
+CAPACITY_SMOOTHING = 0.5
+# Time constant of the smoothed pack power used for runtime estimates
+POWER_TIME_CONSTANT = 300.0
+# Below this smoothed power the battery is considered idle
+MIN_RUNTIME_POWER = 10.0
+# remainOutTime reports 999 h 0 m when the hub has no estimate
+REMAIN_OUT_TIME_UNKNOWN = 999 * 60
+
+
+def decode_remain_out_time(raw: int) -> int | None:
+    """Return remainOutTime in minutes, or None if the hub has no estimate."""
+    minutes = int(raw)
+    return None if minutes == REMAIN_OUT_TIME_UNKNOWN else minutes
+
+
+def format_remain_out_time(raw: int) -> str:
+    """Return remainOutTime as hours and minutes, like the app shows it."""
+    minutes = decode_remain_out_time(raw)
+    if minutes is None:
+        return "Unknown"
+    return f"{minutes // 60} h {minutes % 60} m"
+
+
+@dataclass
+class PackCoulombCounter:
+    """Charge and energy throughput of a single pack from integrated batcur."""
+
+    last_seen: float | None = None
+    last_current: float | None = None
+    last_voltage: float | None = None
+    # Net charge since the counter started, positive is charging
+    net_ah: float = 0.0
+    charged_ah: float = 0.0
+    discharged_ah: float = 0.0
+    charged_wh: float = 0.0
+    discharged_wh: float = 0.0
+    capacity_ah: float | None = None
+    # Last full or empty event: kind, net_ah and reported SOC at that moment
+    event_kind: str | None = None
+    event_ah: float | None = None
+    event_soc: int | None = None
+    # Anchor for the estimated SOC, the last event or the first sample
+    anchor_ah: float | None = None
+    anchor_soc: float | None = None
+
+    def update(
+        self, pack: dict[str, Any], now: float, empty_soc: int, full_soc: int
+    ) -> None:
+        """Integrate one pack sample, this is O(1) per call."""
+        batcur = pack.get("batcur")
+        total_vol = pack.get("totalVol")
+        if batcur is None or total_vol is None:
+            return
+        current = decode_batcur(batcur)
+        # totalVol is reported in 0.01 V units
+        voltage = int(total_vol) / 100.0
+
+        if self.last_seen is not None and self.last_current is not None:
+            elapsed = now - self.last_seen
+            if 0 < elapsed <= MAX_SAMPLE_GAP:
+                # Trapezoidal integration between the two samples
+                amp_hours = (current + self.last_current) / 2 * elapsed / 3600
+                watt_hours = (
+                    (current * voltage + self.last_current * self.last_voltage)
+                    / 2
+                    * elapsed
+                    / 3600
+                )
+                self.net_ah += amp_hours
+                if amp_hours >= 0:
+                    self.charged_ah += amp_hours
+                    self.charged_wh += watt_hours
+                else:
+                    self.discharged_ah -= amp_hours
+                    self.discharged_wh -= watt_hours
+
+        self.last_seen = now
+        self.last_current = current
+        self.last_voltage = voltage
+
+        soc = pack.get("socLevel")
+        if soc is None:
+            return
+        soc = int(soc)
+        if self.anchor_ah is None:
+            self.anchor_ah = self.net_ah
+            self.anchor_soc = float(soc)
+        if soc >= full_soc:
+            self._event("full", soc)
+        elif soc <= empty_soc:
+            self._event("empty", soc)
+
+    def _event(self, kind: str, soc: int) -> None:
+        """Record a full or empty event and update the capacity estimate."""
+        if self.event_kind == kind:
+            # Still at the same end, keep the anchor at the latest sample
+            self.event_ah = self.anchor_ah = self.net_ah
+            return
+        if (
+            self.event_kind is not None
+            and self.event_ah is not None
+            and self.event_soc is not None
+            and abs(soc - self.event_soc) >= MIN_CAPACITY_SOC_SWING
+        ):
+            measured = abs(self.net_ah - self.event_ah) / (
+                abs(soc - self.event_soc) / 100
+            )
+            self.capacity_ah = (
+                measured
+                if self.capacity_ah is None
+                else self.capacity_ah
+                + CAPACITY_SMOOTHING * (measured - self.capacity_ah)
+            )
+        self.event_kind = kind
+        self.event_ah = self.anchor_ah = self.net_ah
+        self.event_soc = soc
+        self.anchor_soc = float(soc)
+
+    def energy_wh(self, soc: float) -> float | None:
+        """Return the energy between 0 % and the given SOC at the last voltage."""
+        if self.last_voltage is None:
+            return None
+        capacity = self.capacity_ah or DEFAULT_PACK_CAPACITY_AH
+        return capacity * soc / 100 * self.last_voltage
+
+    @property
+    def capacity_wh(self) -> float | None:
+        """Return the measured capacity at the nominal voltage, None if unmeasured.
+
+        Not taken at the last voltage like energy_wh, the capacity must only
+        change when a new capacity is measured.
+        """
+        if self.capacity_ah is None:
+            return None
+        return self.capacity_ah * NOMINAL_PACK_VOLTAGE
+
+    @property
+    def estimated_soc(self) -> float | None:
+        """Return the SOC estimated from integrated charge since the anchor."""
+        if self.anchor_ah is None or self.anchor_soc is None:
+            return None
+        capacity = self.capacity_ah or DEFAULT_PACK_CAPACITY_AH
+        soc = self.anchor_soc + (self.net_ah - self.anchor_ah) / capacity * 100
+        return min(100.0, max(0.0, soc))
+
+    def indicators(self) -> dict[str, float | None]:
+        """Return the estimates exposed as sensors."""
+        estimated_soc = self.estimated_soc
+        return {
+            "charge_throughput": round(self.charged_ah + self.discharged_ah, 3),
+            "energy_charged": round(self.charged_wh, 2),
+            "energy_discharged": round(self.discharged_wh, 2),
+            "estimated_capacity": (
+                round(self.capacity_ah, 2) if self.capacity_ah is not None else None
+            ),
+            "estimated_soc": (
+                round(estimated_soc, 1) if estimated_soc is not None else None
+            ),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PackCoulombCounter:
+        """Restore from as_dict output, ignoring unknown keys."""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+class CoulombEstimator:
+    """Coulomb counting for every pack of a hub, keyed by pack serial."""
+
+    def __init__(self) -> None:
+        """Initialize the estimator."""
+        self.packs: dict[str, PackCoulombCounter] = {}
+
+    def update(
+        self,
+        pack_data: list[dict[str, Any]],
+        now: float,
+        empty_soc: int = 0,
+        full_soc: int = 100,
+    ) -> None:
+        """Integrate one poll of packData."""
+        for index, pack in enumerate(pack_data):
+            key = pack_key(pack, index)
+            counter = self.packs.get(key)
+            if counter is None:
+                counter = self.packs[key] = PackCoulombCounter()
+            counter.update(pack, now, empty_soc, full_soc)
+
+    def energy_window(
+        self, pack_data: list[dict[str, Any]], floor_soc: float, ceil_soc: float
+    ) -> tuple[float, float] | None:
+        """Return the energy above floor_soc and below ceil_soc over all packs.
+
+        The coulomb counted SOC is used when available, the reported
+        socLevel otherwise.
+        """
+        above = below = 0.0
+        for index, pack in enumerate(pack_data):
+            counter = self.packs.get(pack_key(pack, index))
+            if counter is None:
+                return None
+            soc = counter.estimated_soc
+            if soc is None:
+                soc = pack.get("socLevel")
+            if soc is None:
+                return None
+            stored = counter.energy_wh(soc)
+            floor = counter.energy_wh(floor_soc)
+            ceil = counter.energy_wh(ceil_soc)
+            if stored is None or floor is None or ceil is None:
+                return None
+            above += max(0.0, stored - floor)
+            below += max(0.0, ceil - stored)
+        return above, below
+
+    def capacity_wh(self, pack_data: list[dict[str, Any]]) -> float | None:
+        """Return the measured capacity of all packs, None until all are measured.
+
+        The capacity is stable between full and empty events, so the planner
+        can keep its plan from one poll to the next.
+        """
+        total = 0.0
+        for index, pack in enumerate(pack_data):
+            counter = self.packs.get(pack_key(pack, index))
+            capacity = counter.capacity_wh if counter else None
+            if capacity is None:
+                return None
+            total += capacity
+        return total or None
+
+    def indicators(self, key: str) -> dict[str, float | None]:
+        """Return the estimates of a pack, empty if unknown."""
+        counter = self.packs.get(key)
+        return counter.indicators() if counter else {}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable representation."""
+        return {key: counter.as_dict() for key, counter in self.packs.items()}
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Restore state saved with as_dict."""
+        self.packs = {
+            key: PackCoulombCounter.from_dict(value) for key, value in data.items()
+        }
+
+
+class RuntimeEstimator:
+    """Estimate time to empty and time to full from smoothed pack power."""
+
+    def __init__(self, time_constant: float = POWER_TIME_CONSTANT) -> None:
+        """Initialize the estimator."""
+        self.time_constant = time_constant
+        # Smoothed net pack power in W, positive is discharging
+        self.power: float | None = None
+        self.last_seen: float | None = None
+
+    def update(self, discharge_power: float, now: float) -> None:
+        """Fold one net discharge power reading into the smoothed power."""
+        if self.power is None or self.last_seen is None:
+            self.power = discharge_power
+        else:
+            elapsed = max(0.0, now - self.last_seen)
+            alpha = 1 - math.exp(-elapsed / self.time_constant)
+            self.power += alpha * (discharge_power - self.power)
+        self.last_seen = now
+
+    def estimate(self, energy_above_min: float, energy_below_max: float) -> dict:
+        """Return estimated minutes to empty and to full, None when idle."""
+        to_empty = to_full = None
+        if self.power is not None and self.power > MIN_RUNTIME_POWER:
+            to_empty = round(energy_above_min / self.power * 60)
+        elif self.power is not None and self.power < -MIN_RUNTIME_POWER:
+            to_full = round(energy_below_max / -self.power * 60)
+        return {
+            "estimatedDischargeTime": to_empty,
+            "estimatedChargeTime": to_full,
+        }
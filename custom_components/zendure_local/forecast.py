@@ -0,0 +1,76 @@
+"""Price and solar forecast parsing for Zendure Local."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+
+@dataclass(frozen=True)
+class PriceSlot:
+    """A forecast value, e.g. a price, for a time slot."""
+
+    start: datetime
+    end: datetime
+    price: float
+
+
+def parse_forecast(
+    items: Sequence[dict[str, Any]], time_key: str, value_key: str
+) -> list[PriceSlot]:
+    """Parse a forecast attribute into sorted slots.
+
+    Each slot ends where the next one starts, the last one gets the length
+    of the one before it (or an hour if there is only one).
+    """
+    points: list[tuple[datetime, float]] = []
+    for item in items:
+        try:
+            start = item[time_key]
+            if not isinstance(start, datetime):
+                start = dt_util.parse_datetime(str(start))
+            price = float(item[value_key])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if start is None:
+            continue
+        points.append((dt_util.as_utc(start), price))
+    points.sort(key=lambda point: point[0])
+
+    slots: list[PriceSlot] = []
+    for index, (start, price) in enumerate(points):
+        if index + 1 < len(points):
+            end = points[index + 1][0]
+        elif index:
+            end = start + (start - points[index - 1][0])
+        else:
+            end = start + timedelta(hours=1)
+        slots.append(PriceSlot(start, end, price))
+    return slots
+
+
+def resample(slots: Sequence[PriceSlot], values: Sequence[PriceSlot]) -> list[float]:
+    """Return the time weighted mean of values over each slot.
+
+    Both sequences must be sorted, so this is a single O(n + m) merge. Parts
+    of a slot without a value count as 0, e.g. no solar forecast.
+    """
+    result: list[float] = []
+    first = 0
+    for slot in slots:
+        while first < len(values) and values[first].end <= slot.start:
+            first += 1
+        total = 0.0
+        index = first
+        while index < len(values) and values[index].start < slot.end:
+            value = values[index]
+            overlap = min(slot.end, value.end) - max(slot.start, value.start)
+            total += value.price * overlap.total_seconds()
+            index += 1
+        length = (slot.end - slot.start).total_seconds()
+        result.append(total / length if length > 0 else 0.0)
+    return result
@@ -0,0 +1,113 @@
+"""Repair issues for hubs that are also polled from the YAML configuration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+from urllib.parse import urlsplit
+
+from homeassistant.config import async_hass_config_yaml
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_RESOURCE
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DEFAULT_RESOURCE, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Platforms of the rest integration configured below sensor: and binary_sensor:
+REST_PLATFORM_DOMAINS = ("sensor", "binary_sensor")
+# Key in hass.data[DOMAIN] of the task reading the resources, once per start
+REST_RESOURCES = "rest_resources"
+
+
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def rest_resources(config: dict[str, Any]) -> list[str]:
+    """Return the resources polled by the rest integration."""
+    items = _as_list(config.get("rest"))
+    for domain in REST_PLATFORM_DOMAINS:
+        items += [
+            item
+            for item in _as_list(config.get(domain))
+            if isinstance(item, dict) and item.get("platform") == "rest"
+        ]
+    return [
+        item["resource"]
+        for item in items
+        if isinstance(item, dict) and isinstance(item.get("resource"), str)
+    ]
+
+
+def same_hub(resource: str, other: str) -> bool:
+    """Return whether two resources are served by the same hub."""
+    first, second = urlsplit(resource), urlsplit(other)
+    if not first.hostname or first.scheme not in ("http", "https"):
+        return False
+    return (first.hostname, first.port) == (second.hostname, second.port)
+
+
+def issue_id(entry: ConfigEntry) -> str:
+    """Return the id of the duplicate rest resource issue of an entry."""
+    return f"duplicate_rest_resource_{entry.entry_id}"
+
+
+async def _async_read_rest_resources(hass: HomeAssistant) -> list[str] | None:
+    try:
+        config = await async_hass_config_yaml(hass)
+    except (HomeAssistantError, OSError) as err:
+        _LOGGER.debug("Not checking for duplicate rest resources: %s", err)
+        return None
+    return rest_resources(config)
+
+
+async def async_rest_resources(hass: HomeAssistant) -> list[str] | None:
+    """Return the rest resources of the YAML configuration, None if unreadable.
+
+    The configuration is parsed once per start, all hub entries await the same
+    parse instead of each reading the configuration and its includes again.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+    if REST_RESOURCES not in data:
+        data[REST_RESOURCES] = hass.async_create_task(
+            _async_read_rest_resources(hass), f"{DOMAIN} read rest resources"
+        )
+    # Unloading one entry cancels its check, not the parse the others await
+    return await asyncio.shield(data[REST_RESOURCES])
+
+
+async def async_check_rest_resources(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Raise a repair issue while a rest resource polls the hub of the entry.
+
+    The shipped zendure.yaml used to poll the hub with its own rest sensors,
+    next to the integration this doubles the requests to the hub.
+    """
+    resource = entry.data.get(CONF_RESOURCE, DEFAULT_RESOURCE)
+    resources = await async_rest_resources(hass)
+    if resources is None:
+        return
+    duplicates = [other for other in resources if same_hub(other, resource)]
+    if not duplicates:
+        ir.async_delete_issue(hass, DOMAIN, issue_id(entry))
+        return
+    _LOGGER.warning(
+        "The hub of %s is also polled by the rest resource %s",
+        entry.title,
+        duplicates[0],
+    )
+    ir.async_create_issue(
+        hass,
+        DOMAIN,
+        issue_id(entry),
+        is_fixable=False,
+        severity=ir.IssueSeverity.WARNING,
+        translation_key="duplicate_rest_resource",
+        translation_placeholders={"name": entry.title, "resource": duplicates[0]},
+    )
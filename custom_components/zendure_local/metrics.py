@@ -0,0 +1,210 @@
+"""OpenMetrics exporter for the reports of all hubs."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from http import HTTPStatus
+import math
+from typing import Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONF_METRICS, DOMAIN
+from .coordinator import ZendureCoordinator
+from .sensor import decode_snapshot
+from .site import is_site_entry
+
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+# Key in hass.data[DOMAIN] set once the view is registered
+METRICS_VIEW = "metrics_view"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Metric families: name -> (type, help)
+FAMILIES = {
+    "zendure_hub": ("gauge", "Decoded hub value by field"),
+    "zendure_pack": ("gauge", "Decoded battery pack value by field"),
+    "zendure_hub_state": ("gauge", "Decoded textual hub value by field, always 1"),
+    "zendure_pack_state": (
+        "gauge",
+        "Decoded textual battery pack value by field, always 1",
+    ),
+    "zendure_up": ("gauge", "Whether the last poll of the hub succeeded"),
+    "zendure_polls": ("counter", "Polls of the hub"),
+    "zendure_poll_failures": ("counter", "Polls without a report"),
+    "zendure_duplicate_reports": ("counter", "Polls that returned an unchanged report"),
+    "zendure_decode_errors": ("counter", "Values of a field that failed to decode"),
+    "zendure_fetch_latency_seconds": ("gauge", "Duration of the last report fetch"),
+    "zendure_decode_duration_seconds": (
+        "gauge",
+        "Duration of decoding the last new report",
+    ),
+    "zendure_data_age_seconds": (
+        "gauge",
+        "Local time minus the device timestamp at the last poll",
+    ),
+    "zendure_pending_writes": (
+        "gauge",
+        "Properties queued until the hub is reachable again",
+    ),
+}
+
+# Samples of one hub by family
+HubSamples = dict[str, list[str]]
+
+
+def escape_label(value: Any) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: Any) -> str | None:
+    """Return a sample value, None for values that are not numbers."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        # OpenMetrics spells these NaN, +Inf and -Inf, repr gives nan and inf
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    if isinstance(value, int):
+        return str(value)
+    return None
+
+
+def _sample(name: str, labels: dict[str, Any], value: Any) -> str | None:
+    formatted = format_value(value)
+    if formatted is None:
+        return None
+    label_text = ",".join(f'{key}="{escape_label(val)}"' for key, val in labels.items())
+    return f"{name}{{{label_text}}} {formatted}"
+
+
+def hub_samples(title: str, coordinator: ZendureCoordinator) -> HubSamples:
+    """Return the samples of one hub by family."""
+    data = coordinator.data or {}
+    hub_labels = {"hub": title, "sn": data.get("sn", "")}
+    samples: HubSamples = {family: [] for family in FAMILIES}
+
+    def add(family: str, value: Any, labels: dict[str, Any] | None = None) -> None:
+        sample_name = f"{family}_total" if FAMILIES[family][0] == "counter" else family
+        line = _sample(sample_name, hub_labels | (labels or {}), value)
+        if line is not None:
+            samples[family].append(line)
+
+    def add_field(family: str, labels: dict[str, Any], value: Any) -> None:
+        if isinstance(value, str):
+            add(f"{family}_state", 1, labels | {"value": value})
+        else:
+            add(family, value, labels)
+
+    snapshot = decode_snapshot(coordinator)
+    for field, value in snapshot.get("hub", {}).items():
+        add_field("zendure_hub", {"field": field}, value)
+    for index, pack in enumerate(snapshot.get("packs", [])):
+        pack_label = pack.get("sn") or str(index)
+        for field, value in pack.items():
+            if field != "sn":
+                add_field("zendure_pack", {"pack": pack_label, "field": field}, value)
+    add("zendure_up", coordinator.last_update_success and bool(data))
+    add("zendure_polls", coordinator.polls)
+    add("zendure_poll_failures", coordinator.poll_failures)
+    add("zendure_duplicate_reports", coordinator.duplicate_reports)
+    for field, errors in coordinator.decode_errors.errors.items():
+        add("zendure_decode_errors", errors, {"field": field})
+    add("zendure_fetch_latency_seconds", coordinator.fetch_latency)
+    add("zendure_decode_duration_seconds", coordinator.decode_duration)
+    add("zendure_data_age_seconds", coordinator.data_age)
+    add("zendure_pending_writes", len(coordinator.pending_commands))
+    return samples
+
+
+def render(hubs: Iterable[HubSamples]) -> str:
+    """Render the samples of all hubs, grouped by family."""
+    hubs = list(hubs)
+    lines: list[str] = []
+    for family, (metric_type, help_text) in FAMILIES.items():
+        lines.append(f"# TYPE {family} {metric_type}")
+        lines.append(f"# HELP {family} {help_text}")
+        for samples in hubs:
+            lines.extend(samples[family])
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class ZendureMetricsView(HomeAssistantView):
+    """Serve the reports of all hubs in the OpenMetrics text format.
+
+    The samples of a hub are rendered once per poll and the full text once
+    per change of any hub, scrapes in between return the cached text.
+    """
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+
+    def __init__(self) -> None:
+        """Initialize the view."""
+        self._samples: dict[str, tuple[ZendureCoordinator, int, HubSamples]] = {}
+        self._text: tuple[tuple, str] | None = None
+
+    def metrics(self, entries: list[ConfigEntry]) -> str:
+        """Return the metrics text for the loaded entries."""
+        # A reloaded entry has a new coordinator that counts polls from zero
+        key = tuple(
+            (
+                entry.entry_id,
+                entry.runtime_data.coordinator,
+                entry.runtime_data.coordinator.polls,
+            )
+            for entry in entries
+        )
+        if self._text is not None and self._text[0] == key:
+            return self._text[1]
+        hubs = []
+        for entry, (entry_id, coordinator, polls) in zip(entries, key):
+            cached = self._samples.get(entry_id)
+            if cached is None or cached[:2] != (coordinator, polls):
+                cached = (coordinator, polls, hub_samples(entry.title, coordinator))
+                self._samples[entry_id] = cached
+            hubs.append(cached[2])
+        # Forget hubs that were removed
+        for entry_id in set(self._samples) - {entry.entry_id for entry in entries}:
+            del self._samples[entry_id]
+        self._text = (key, render(hubs))
+        return self._text[1]
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics of all loaded hubs."""
+        hass: HomeAssistant = request.app["hass"]
+        entries = [
+            entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED
+            and not is_site_entry(entry)
+            and entry.options.get(CONF_METRICS, False)
+        ]
+        return web.Response(
+            body=self.metrics(entries).encode(),
+            status=HTTPStatus.OK,
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+
+@callback
+def async_register_metrics_view(hass: HomeAssistant) -> None:
+    """Register the metrics view for the first hub that exports metrics.
+
+    Views cannot be removed, after the option is switched off the view stays
+    until a restart but no longer serves the hub.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+    # The http integration is not set up without a frontend, e.g. in scripts
+    if data.get(METRICS_VIEW) or hass.http is None:
+        return
+    hass.http.register_view(ZendureMetricsView())
+    data[METRICS_VIEW] = True
@@ -0,0 +1,74 @@
+"""Zendure Local number platform for Home Assistant."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.components.number import (
+    NumberDeviceClass,
+    NumberMode,
+    RestoreNumber,
+)
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import DOMAIN
+from .site import is_site_entry
+
+if TYPE_CHECKING:
+    from .dispatcher import ZendureDispatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+# Range of the setpoint per hub of the site
+MAX_HUB_POWER = 2400
+
+
+async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities) -> None:
+    """Set up the setpoint of a site, hubs have no number entities."""
+    if not is_site_entry(entry):
+        return
+    async_add_entities([ZendureSiteSetpoint(entry.runtime_data.dispatcher, entry)])
+
+
+class ZendureSiteSetpoint(RestoreNumber):
+    """Power the hubs of a site deliver to the house, negative to charge."""
+
+    _attr_has_entity_name = True
+    _attr_translation_key = "site_setpoint"
+    _attr_device_class = NumberDeviceClass.POWER
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _attr_native_step = 10
+    _attr_mode = NumberMode.BOX
+    _attr_icon = "mdi:home-lightning-bolt-outline"
+
+    def __init__(self, dispatcher: ZendureDispatcher, entry) -> None:
+        """Initialize the setpoint of a site."""
+        self._dispatcher = dispatcher
+        hubs = len(dispatcher.sampler.hub_entry_ids)
+        self._attr_native_min_value = -MAX_HUB_POWER * hubs
+        self._attr_native_max_value = MAX_HUB_POWER * hubs
+        self._attr_native_value = None
+        self._attr_unique_id = f"{entry.entry_id}_setpoint"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"site_{entry.entry_id}")},
+            name=entry.title,
+            manufacturer="Zendure",
+            model="Site",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the setpoint, it is dispatched with the next site sample."""
+        await super().async_added_to_hass()
+        last = await self.async_get_last_number_data()
+        if last is not None and last.native_value is not None:
+            self._attr_native_value = last.native_value
+            self._dispatcher.setpoint = last.native_value
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Dispatch a new setpoint to the hubs."""
+        self._attr_native_value = value
+        self.async_write_ha_state()
+        await self._dispatcher.async_set_setpoint(value)
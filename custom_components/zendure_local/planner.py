@@ -0,0 +1,197 @@
+"""SOC constrained dynamic programming charge planner for Zendure Local."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .battery import BatteryLimits
+from .forecast import PriceSlot
+
+# Share of the energy kept when charging and when discharging the packs
+CHARGE_EFFICIENCY = 0.95
+DISCHARGE_EFFICIENCY = 0.95
+# SOC resolution of the planner in percent
+SOC_STEP = 1.0
+# Forecast slots beyond this are not planned
+PLAN_HORIZON = timedelta(hours=48)
+# Planned grid power below this is treated as idle, in W
+MIN_PLAN_POWER = 25
+# Cost per Wh of battery throughput so that among equally priced plans the
+# one cycling the battery least wins, too small to change any real choice
+THROUGHPUT_TIE_BREAK = 1e-9
+
+# Per slot planner input: start, end, price and mean solar power in W
+SlotInput = tuple[datetime, datetime, float, float]
+
+
+@dataclass(frozen=True)
+class PlannedSlot:
+    """Planned setpoint for one forecast slot."""
+
+    start: datetime
+    end: datetime
+    # Grid power of the hub in W, positive charges from the grid and
+    # negative is output to the house
+    power: int
+    # Planned SOC at the end of the slot in percent
+    soc: float
+
+    def as_dict(self) -> dict[str, str | int | float]:
+        """Return the slot as a state attribute item."""
+        return {"start": self.start.isoformat(), "power": self.power, "soc": self.soc}
+
+
+class SocPlanner:
+    """Minimize the energy cost over a price forecast within the battery limits.
+
+    SOC is discretized in SOC_STEP levels between minSoc and socSet. A
+    backward pass computes, for every slot, the cost-to-go of each level as a
+    numpy minimum over all level transitions; the forward pass then follows
+    the cheapest transitions from the current SOC.
+
+    The value functions are cached per slot. Because slot t only depends on
+    the slots after it, a forecast update only recomputes the slots up to
+    the last changed one, and slots that passed are simply dropped. A full
+    solve happens when the limits or the end of the horizon change, which is
+    also when the terminal price (the mean price the energy left at the end
+    of the horizon is valued at) is refreshed.
+    """
+
+    def __init__(self, feed_in_factor: float = 1.0) -> None:
+        """Initialize the planner."""
+        # Share of the price received for energy fed into the grid
+        self.feed_in_factor = feed_in_factor
+        self.levels = np.empty(0)
+        # Number of slots recomputed by the last solve
+        self.solved_slots = 0
+        self._limits: BatteryLimits | None = None
+        self._inputs: list[SlotInput] = []
+        # Cost-to-go at the start of each slot, one more than there are slots
+        self._values: list[np.ndarray] = []
+        self._policy: list[np.ndarray] = []
+        self._ac_wh = np.empty((0, 0))
+
+    def plan(
+        self,
+        slots: Sequence[PriceSlot],
+        solar_power: Sequence[float] | None,
+        limits: BatteryLimits,
+        soc: float,
+        now: datetime,
+    ) -> list[PlannedSlot]:
+        """Return the plan for the slots that have not ended yet.
+
+        solar_power is the mean solar power in W per slot, if known.
+        """
+        horizon = now + PLAN_HORIZON
+        inputs = [
+            (slot.start, slot.end, slot.price, solar_power[index] if solar_power else 0)
+            for index, slot in enumerate(slots)
+            if slot.end > now and slot.start < horizon
+        ]
+        if not inputs or limits.max_soc <= limits.min_soc:
+            return []
+        self.solve(inputs, limits)
+        return self._forward(soc)
+
+    def solve(self, inputs: list[SlotInput], limits: BatteryLimits) -> None:
+        """Update the cached value functions for new inputs."""
+        offset = next(
+            (
+                index
+                for index, cached in enumerate(self._inputs)
+                if cached[0] == inputs[0][0]
+            ),
+            None,
+        )
+        if (
+            limits != self._limits
+            or offset is None
+            or len(self._inputs) - offset != len(inputs)
+            or self._inputs[-1][1] != inputs[-1][1]
+        ):
+            self._reset(inputs, limits)
+            changed = len(inputs)
+        else:
+            cached = self._inputs[offset:]
+            self._values = self._values[offset:]
+            self._policy = self._policy[offset:]
+            changed = next(
+                (
+                    index + 1
+                    for index in range(len(inputs) - 1, -1, -1)
+                    if inputs[index] != cached[index]
+                ),
+                0,
+            )
+        self._inputs = list(inputs)
+        for index in range(changed - 1, -1, -1):
+            self._values[index], self._policy[index] = self._backward(
+                inputs[index], self._values[index + 1]
+            )
+        self.solved_slots = changed
+
+    def _reset(self, inputs: list[SlotInput], limits: BatteryLimits) -> None:
+        """Prepare a full solve for new limits or a new horizon."""
+        self._limits = limits
+        self.levels = np.arange(limits.min_soc, limits.max_soc + SOC_STEP / 2, SOC_STEP)
+        stored_wh = self.levels * limits.capacity_wh / 100
+        # Energy into (positive) or out of the packs for every transition,
+        # rows are the level at the start and columns at the end of a slot
+        delta = stored_wh[None, :] - stored_wh[:, None]
+        self._ac_wh = np.where(
+            delta > 0, delta / CHARGE_EFFICIENCY, delta * DISCHARGE_EFFICIENCY
+        )
+        terminal_price = float(np.mean([price for _, _, price, _ in inputs]))
+        usable_kwh = (stored_wh - stored_wh[0]) / 1000 * DISCHARGE_EFFICIENCY
+        self._values = [np.empty(0)] * len(inputs) + [-usable_kwh * terminal_price]
+        self._policy = [np.empty(0, dtype=int)] * len(inputs)
+
+    def _grid_wh(
+        self, ac_wh: np.ndarray, solar_w: float, hours: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the grid energy of transitions and whether they are feasible."""
+        assert self._limits is not None
+        max_output = self._limits.max_discharge_power * hours
+        grid = ac_wh - solar_w * hours
+        feasible = (grid <= self._limits.max_charge_power * hours) & (
+            ac_wh >= -max_output
+        )
+        # Solar beyond the output limit is curtailed
+        return np.maximum(grid, -max_output), feasible
+
+    def _backward(
+        self, slot: SlotInput, next_values: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the cost-to-go and best next level for every level."""
+        start, end, price, solar_w = slot
+        hours = (end - start).total_seconds() / 3600
+        grid, feasible = self._grid_wh(self._ac_wh, solar_w, hours)
+        cost = np.where(grid > 0, grid, grid * self.feed_in_factor) / 1000 * price
+        cost += THROUGHPUT_TIE_BREAK * np.abs(self._ac_wh)
+        total = np.where(feasible, cost + next_values[None, :], np.inf)
+        policy = np.argmin(total, axis=1)
+        return total[np.arange(len(policy)), policy], policy
+
+    def _forward(self, soc: float) -> list[PlannedSlot]:
+        """Follow the cheapest transitions from the current SOC."""
+        level = int(np.argmin(np.abs(self.levels - soc)))
+        planned: list[PlannedSlot] = []
+        for (start, end, _, solar_w), policy in zip(self._inputs, self._policy):
+            next_level = int(policy[level])
+            hours = (end - start).total_seconds() / 3600
+            grid, _ = self._grid_wh(
+                np.array(self._ac_wh[level, next_level]), solar_w, hours
+            )
+            power = round(float(grid) / hours)
+            if abs(power) < MIN_PLAN_POWER:
+                power = 0
+            planned.append(
+                PlannedSlot(start, end, power, float(self.levels[next_level]))
+            )
+            level = next_level
+        return planned
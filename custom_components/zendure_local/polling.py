@@ -0,0 +1,127 @@
+"""Per-device polling, timeout and deadband options."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .const import (
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SENSOR_GROUPS,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_REQUEST_TIMEOUT,
+    SCAN_INTERVAL,
+    SENSOR_GROUPS,
+)
+
+# Options the running coordinator and entities pick up without a reload
+LIVE_OPTIONS = (
+    CONF_MIN_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_REQUEST_TIMEOUT,
+    CONF_POWER_DEADBAND,
+    CONF_TEMPERATURE_DEADBAND,
+)
+
+
+@dataclass(frozen=True)
+class PollingOptions:
+    """How often a hub is polled and which changes its sensors report.
+
+    While a power flow of the hub changes by at least the power deadband it
+    is polled every min_interval seconds. Every quiet report doubles the
+    interval up to max_interval. The defaults keep a fixed interval.
+    """
+
+    min_interval: float = SCAN_INTERVAL.total_seconds()
+    max_interval: float = SCAN_INTERVAL.total_seconds()
+    timeout: float = DEFAULT_REQUEST_TIMEOUT
+    power_deadband: float = 0.0
+    temperature_deadband: float = 0.0
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any]) -> PollingOptions:
+        """Create the polling options of a config entry."""
+        default = cls()
+        return cls(
+            min_interval=options.get(CONF_MIN_INTERVAL, default.min_interval),
+            max_interval=options.get(CONF_MAX_INTERVAL, default.max_interval),
+            timeout=options.get(CONF_REQUEST_TIMEOUT, default.timeout),
+            power_deadband=options.get(CONF_POWER_DEADBAND, default.power_deadband),
+            temperature_deadband=options.get(
+                CONF_TEMPERATURE_DEADBAND, default.temperature_deadband
+            ),
+        )
+
+    def deadband(self, device_class: str | None) -> float:
+        """Return the deadband of sensors of a device class."""
+        if device_class == SensorDeviceClass.POWER:
+            return self.power_deadband
+        if device_class == SensorDeviceClass.TEMPERATURE:
+            return self.temperature_deadband
+        return 0.0
+
+    def next_interval(self, current: timedelta | None, active: bool) -> timedelta:
+        """Return the interval until the next poll after a report."""
+        if active or current is None:
+            return timedelta(seconds=self.min_interval)
+        seconds = min(
+            max(current.total_seconds() * 2, self.min_interval), self.max_interval
+        )
+        return timedelta(seconds=seconds)
+
+
+def sensor_groups(options: dict[str, Any]) -> frozenset[str]:
+    """Return the sensor groups to create, all of them by default."""
+    return frozenset(options.get(CONF_SENSOR_GROUPS, SENSOR_GROUPS))
+
+
+def only_live_options_changed(old: dict[str, Any], new: dict[str, Any]) -> bool:
+    """Return whether two sets of options differ only in live options."""
+
+    def rest(options: dict[str, Any]) -> dict[str, Any]:
+        return {
+            key: value
+            for key, value in options.items()
+            if key not in (*LIVE_OPTIONS, CONF_SENSOR_GROUPS)
+        } | {CONF_SENSOR_GROUPS: sensor_groups(options)}
+
+    return rest(old) == rest(new)
+
+
+def within_deadband(old: Any, new: Any, deadband: float) -> bool:
+    """Return whether a new sensor value is not worth reporting."""
+    if deadband <= 0 or isinstance(old, bool) or isinstance(new, bool):
+        return False
+    if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+        return False
+    return abs(new - old) < deadband
+
+
+def power_flows(data: dict | None) -> dict[str, float]:
+    """Return the power flows of a report, e.g. solarInputPower."""
+    properties = (data or {}).get("properties") or {}
+    return {
+        key: value
+        for key, value in properties.items()
+        if key.endswith("Power")
+        and isinstance(value, (int, float))
+        and not isinstance(value, bool)
+    }
+
+
+def is_active(old: dict | None, new: dict | None, deadband: float) -> bool:
+    """Return whether a power flow changed by at least the deadband."""
+    before, after = power_flows(old), power_flows(new)
+    if before.keys() != after.keys():
+        return True
+    return any(
+        after[key] != before[key] and abs(after[key] - before[key]) >= deadband
+        for key in after
+    )
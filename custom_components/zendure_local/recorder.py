@@ -0,0 +1,147 @@
+"""Raw report capture to rotating gzip JSON lines trace files."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime
+import gzip
+import json
+import logging
+from pathlib import Path
+import queue
+import threading
+from typing import IO, Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# A trace file is rotated once it is this large (compressed)
+MAX_TRACE_BYTES = 16 * 1024 * 1024
+# Number of trace files kept per device, the oldest are removed
+KEEP_TRACE_FILES = 30
+# Reports waiting for the writer, more are dropped rather than buffered
+MAX_PENDING = 1000
+TRACE_SUFFIX = ".jsonl.gz"
+
+_STOP = object()
+
+
+class TraceRecorder:
+    """Append raw reports to rotating, compressed trace files of one device.
+
+    Reports are queued by the event loop and written by a background thread,
+    so the loop never waits on disk I/O. Every line is the report with its
+    local receive time and fetch latency added. The file is flushed whenever
+    the queue runs empty, which ends a deflate block, so a crash loses at
+    most the reports still queued.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = MAX_TRACE_BYTES,
+        keep: int = KEEP_TRACE_FILES,
+    ) -> None:
+        """Initialize the recorder."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.recorded = 0
+        self.dropped = 0
+        self._queue: queue.Queue[Any] = queue.Queue(MAX_PENDING)
+        self._thread: threading.Thread | None = None
+        self._file: IO[str] | None = None
+        self._path: Path | None = None
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self._thread = threading.Thread(
+            target=self._run, name=f"zendure_local trace {self.directory.name}"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write the queued reports and stop, this blocks until done."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def record(
+        self, report: dict[str, Any], received: datetime, latency: float
+    ) -> None:
+        """Queue a report, never blocking the caller."""
+        line = {"received": received.isoformat(), "latency": round(latency, 4)}
+        line.update(report)
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        """Write queued reports until stopped."""
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                self._write(item)
+                if self._queue.empty():
+                    self._flush()
+        except OSError as ex:
+            _LOGGER.error("Stopped recording Zendure trace: %s", ex)
+        finally:
+            self._close()
+
+    def _write(self, line: dict[str, Any]) -> None:
+        if self._file is None:
+            self._open(line.get("received", ""))
+        assert self._file is not None
+        self._file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self.recorded += 1
+
+    def _flush(self) -> None:
+        if self._file is None or self._path is None:
+            return
+        self._file.flush()
+        if self._path.stat().st_size >= self.max_bytes:
+            self._close()
+
+    def _open(self, received: str) -> None:
+        """Start a new trace file named after its first receive time."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            stamp = datetime.fromisoformat(received).strftime("%Y%m%d-%H%M%S")
+        except ValueError:
+            stamp = "trace"
+        self._path = self.directory / f"{stamp}{TRACE_SUFFIX}"
+        # Appending adds a gzip member, readers see one continuous stream. The
+        # file stays open across records and is closed in _close
+        self._file = gzip.open(self._path, "at", encoding="utf-8")  # noqa: SIM115
+        self._prune()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _prune(self) -> None:
+        """Remove the oldest trace files beyond the number kept."""
+        files = sorted(self.directory.glob(f"*{TRACE_SUFFIX}"))
+        for path in files[: max(0, len(files) - self.keep)]:
+            path.unlink(missing_ok=True)
+
+
+def iter_reports(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Yield the reports of a JSON lines trace one at a time."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        except EOFError:
+            # The trace that is still being recorded has no gzip trailer yet
+            return
@@ -0,0 +1,100 @@
+"""Replay recorded reports as a coordinator data source."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+import time
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .recorder import iter_reports
+
+REPLAY_SCHEME = "file"
+# Fields the trace recorder adds to every report
+RECORDER_FIELDS = ("received", "latency")
+
+
+def is_replay_resource(resource: str) -> bool:
+    """Return whether a resource points at a recorded trace."""
+    return urlsplit(resource).scheme == REPLAY_SCHEME
+
+
+class ReplaySource:
+    """Stream recorded reports lazily, following the trace at a given speed.
+
+    The device timestamp of the first report is mapped to the moment of the
+    first read, after that a virtual clock runs speed times faster than real
+    time. Every read returns the last report at or before the virtual clock,
+    reading the file only as far as needed. At the end of the trace the last
+    report keeps being returned, or the trace starts over with loop set.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        speed: float = 1.0,
+        loop: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the replay source."""
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.replayed = 0
+        self._clock = clock
+        self._reports: Iterator[dict[str, Any]] | None = None
+        self._pending: dict[str, Any] | None = None
+        self._current: dict[str, Any] | None = None
+        self._started: float | None = None
+        self._first_timestamp: float | None = None
+
+    @classmethod
+    def from_resource(cls, resource: str) -> ReplaySource:
+        """Create a source from file:///path/trace.jsonl.gz?speed=10&loop=1."""
+        parts = urlsplit(resource)
+        query = parse_qs(parts.query)
+        speed = float(query.get("speed", ["1"])[0])
+        loop = query.get("loop", ["0"])[0] not in ("0", "false", "")
+        return cls(Path(unquote(parts.path)), speed, loop)
+
+    def read(self) -> dict[str, Any]:
+        """Return the report at the current virtual time, this reads the file."""
+        now = self._clock()
+        if self._started is None:
+            self._started = now
+        if self._reports is None:
+            self._reports = iter_reports(self.path)
+            self._pending = self._next()
+            if self._pending is None:
+                raise ValueError(f"No reports in {self.path}")
+            self._first_timestamp = float(self._pending["timestamp"])
+        assert self._first_timestamp is not None
+
+        virtual = self._first_timestamp + (now - self._started) * self.speed
+        while self._pending is not None and (
+            self._current is None or float(self._pending["timestamp"]) <= virtual
+        ):
+            self._current = self._pending
+            self.replayed += 1
+            self._pending = self._next()
+
+        if self._pending is None and self.loop:
+            # Start over on the next read
+            self._reports = None
+            self._started = None
+        assert self._current is not None
+        return dict(self._current)
+
+    def _next(self) -> dict[str, Any] | None:
+        """Return the next report with a timestamp, without recorder fields."""
+        assert self._reports is not None
+        for report in self._reports:
+            if report.get("timestamp") is None:
+                continue
+            for field in RECORDER_FIELDS:
+                report.pop(field, None)
+            return report
+        return None
@@ -0,0 +1,125 @@
+"""Host name resolution with the address of a device pinned."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from ipaddress import ip_address
+import logging
+import socket
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+_LOGGER = logging.getLogger(__name__)
+
+# A pinned address is resolved again after this many seconds, or earlier
+# after a failed request
+ADDRESS_TTL = 3600.0
+RESOLVE_TIMEOUT = 5.0
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class PinnedHost:
+    """Resolve the host of a device once and send requests to its address.
+
+    Requests go to the pinned address with the host name in the Host header,
+    so polling does not wait for a DNS lookup through the router every time.
+    The host name is resolved again when the TTL expired or after a request
+    failed. When that lookup fails the last address is kept, a flaky DNS
+    server does not take the device offline. Only plain http URLs with a host
+    name are pinned, https needs the host name for the certificate.
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        stored: dict[str, str] | None = None,
+        ttl: float = ADDRESS_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize with the last known address of the host, see as_dict."""
+        parts = urlsplit(resource)
+        hostname = parts.hostname
+        self.hostname = (
+            hostname
+            if parts.scheme == "http" and hostname and not _is_ip_address(hostname)
+            else None
+        )
+        self.port = parts.port or 80
+        # An address stored for another host name is of no use
+        self.address = (
+            (stored.get("address") or None)
+            if stored and self.hostname and stored.get("host") == self.hostname
+            else None
+        )
+        self.ttl = ttl
+        self.resolves = 0
+        self._clock = clock
+        # A stored address counts as freshly resolved, startup needs no DNS
+        self._resolved_at: float | None = clock() if self.address else None
+        self._stale = False
+
+    def as_dict(self) -> dict[str, str]:
+        """Return the host name and its address to store."""
+        return {"host": self.hostname or "", "address": self.address or ""}
+
+    def needs_resolve(self) -> bool:
+        """Return whether the host name should be resolved before a request."""
+        if self.hostname is None:
+            return False
+        return (
+            self._stale
+            or self._resolved_at is None
+            or self._clock() - self._resolved_at >= self.ttl
+        )
+
+    def failed(self) -> None:
+        """Resolve the host name again before the next request."""
+        if self.address is not None:
+            self._stale = True
+
+    async def async_resolve(self) -> bool:
+        """Resolve the host name, return whether the address changed."""
+        assert self.hostname is not None
+        self.resolves += 1
+        self._resolved_at = self._clock()
+        self._stale = False
+        loop = asyncio.get_running_loop()
+        try:
+            async with asyncio.timeout(RESOLVE_TIMEOUT):
+                infos = await loop.getaddrinfo(
+                    self.hostname,
+                    self.port,
+                    family=socket.AF_INET,
+                    type=socket.SOCK_STREAM,
+                )
+        except (OSError, TimeoutError) as ex:
+            _LOGGER.debug(
+                "Cannot resolve %s, keeping %s: %s", self.hostname, self.address, ex
+            )
+            return False
+        if not infos:
+            return False
+        address = infos[0][4][0]
+        if address == self.address:
+            return False
+        _LOGGER.debug("Pinned %s to %s", self.hostname, address)
+        self.address = address
+        return True
+
+    def request(self, url: str) -> tuple[str, dict[str, str]]:
+        """Return the URL to request and the headers to send for a device URL."""
+        if self.hostname is None or self.address is None:
+            return url, {}
+        parts = urlsplit(url)
+        if parts.hostname != self.hostname:
+            return url, {}
+        netloc = self.address if parts.port is None else f"{self.address}:{parts.port}"
+        return urlunsplit(parts._replace(netloc=netloc)), {"Host": parts.netloc}
@@ -0,0 +1,180 @@
+"""Threshold and rate of change rules evaluated once per report."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    EVENT_ZENDURE_LOCAL,
+    PACK_FIELD_PREFIX,
+    RULE_BELOW,
+    RULE_FALLING,
+    RULE_RISING,
+)
+from .coordinator import ZendureCoordinator
+from .sensor import decode_snapshot
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A condition on a snapshot field that fires an event when it changes.
+
+    For above and below the threshold is a value, for rising and falling a
+    change per minute. The condition clears once the value is the hysteresis
+    past the threshold in the other direction. Fields starting with "pack."
+    are evaluated for every pack.
+    """
+
+    name: str
+    field: str
+    kind: str
+    threshold: float
+    hysteresis: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Rule:
+        """Create a rule from its stored options."""
+        return cls(
+            name=data["name"],
+            field=data["field"],
+            kind=data["kind"],
+            threshold=float(data["threshold"]),
+            hysteresis=float(data.get("hysteresis", 0.0)),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the rule as stored in the options."""
+        return asdict(self)
+
+
+class RuleEngine:
+    """Track the state of rules over successive snapshots.
+
+    The first value of every rule only sets its state, so rules that already
+    hold at startup do not fire.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        """Initialize the engine."""
+        self.rules = list(rules)
+        # (rule name, pack index) -> whether the rule holds
+        self._active: dict[tuple[str, int | None], bool] = {}
+        # (field, pack index) -> (device timestamp, value) for the rates
+        self._previous: dict[tuple[str, int | None], tuple[float, float]] = {}
+
+    def evaluate(
+        self, snapshot: dict[str, Any], timestamp: float
+    ) -> list[dict[str, Any]]:
+        """Return an event for every rule that started or stopped holding."""
+        events = []
+        values = self._values(snapshot)
+        rates = self._rates(values, timestamp)
+        for rule in self.rules:
+            measured = rates if rule.kind in (RULE_RISING, RULE_FALLING) else values
+            for (field, pack), value in measured.items():
+                if field != rule.field:
+                    continue
+                event = self._update(rule, pack, value)
+                if event is not None:
+                    if pack is not None:
+                        event["pack"] = snapshot["packs"][pack].get("sn")
+                    events.append(event)
+        return events
+
+    def _values(self, snapshot: dict[str, Any]) -> dict[tuple[str, int | None], float]:
+        """Return the numeric values of the fields used by the rules."""
+        fields = {rule.field for rule in self.rules}
+        values: dict[tuple[str, int | None], float] = {}
+        for field in fields:
+            if field.startswith(PACK_FIELD_PREFIX):
+                pack_field = field[len(PACK_FIELD_PREFIX) :]
+                for index, pack in enumerate(snapshot.get("packs", [])):
+                    value = pack.get(pack_field)
+                    if _is_number(value):
+                        values[(field, index)] = float(value)
+            else:
+                value = snapshot.get("hub", {}).get(field)
+                if _is_number(value):
+                    values[(field, None)] = float(value)
+        return values
+
+    def _rates(
+        self, values: dict[tuple[str, int | None], float], timestamp: float
+    ) -> dict[tuple[str, int | None], float]:
+        """Return the change per minute of every value since the last report."""
+        rates = {}
+        for key, value in values.items():
+            previous = self._previous.get(key)
+            if previous is not None and timestamp > previous[0]:
+                rates[key] = (value - previous[1]) * 60 / (timestamp - previous[0])
+            if previous is None or timestamp > previous[0]:
+                self._previous[key] = (timestamp, value)
+        return rates
+
+    def _update(
+        self, rule: Rule, pack: int | None, value: float
+    ) -> dict[str, Any] | None:
+        """Update the state of a rule, return an event when it changed."""
+        # Turn every kind into "measure above threshold"
+        measure = -value if rule.kind in (RULE_BELOW, RULE_FALLING) else value
+        threshold = -rule.threshold if rule.kind == RULE_BELOW else rule.threshold
+        key = (rule.name, pack)
+        active = self._active.get(key)
+        if measure > threshold:
+            holds = True
+        elif measure < threshold - rule.hysteresis:
+            holds = False
+        else:
+            # Within the hysteresis band the state does not change
+            holds = bool(active)
+        self._active[key] = holds
+        if active is None or holds == active:
+            return None
+        return {
+            "rule": rule.name,
+            "field": rule.field,
+            "kind": rule.kind,
+            "value": round(value, 3),
+            "active": holds,
+        }
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ZendureRuleMonitor:
+    """Fire zendure_local_event when a rule of a hub starts or stops holding."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: ZendureCoordinator,
+        entry_id: str,
+        rules: Iterable[Rule],
+    ) -> None:
+        """Initialize the monitor."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entry_id = entry_id
+        self.engine = RuleEngine(rules)
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Evaluate the rules on every new report, return the stop callback."""
+        return self.coordinator.async_add_listener(self._async_evaluate)
+
+    @callback
+    def _async_evaluate(self) -> None:
+        data = self.coordinator.data
+        if not data or data.get("timestamp") is None:
+            return
+        snapshot = decode_snapshot(self.coordinator)
+        for event in self.engine.evaluate(snapshot, float(data["timestamp"])):
+            event["entry_id"] = self.entry_id
+            event["sn"] = data.get("sn")
+            self.hass.bus.async_fire(EVENT_ZENDURE_LOCAL, event)
@@ -0,0 +1,443 @@
+"""Charge and discharge scheduler for Zendure Local."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import heapq
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    AC_MODE_CHARGE,
+    AC_MODE_DISCHARGE,
+    CONF_CHARGE_HOURS,
+    CONF_CHARGE_POWER,
+    CONF_CONTIGUOUS,
+    CONF_DISCHARGE_HOURS,
+    CONF_DISCHARGE_POWER,
+    CONF_FEED_IN_FACTOR,
+    CONF_FORECAST_ATTRIBUTE,
+    CONF_FORECAST_ENTITY,
+    CONF_FORECAST_TIME_KEY,
+    CONF_FORECAST_VALUE_KEY,
+    CONF_SOLAR_ATTRIBUTE,
+    CONF_SOLAR_ENTITY,
+    CONF_SOLAR_TIME_KEY,
+    CONF_SOLAR_VALUE_KEY,
+    CONF_STRATEGY,
+    DEFAULT_CHARGE_HOURS,
+    DEFAULT_CHARGE_POWER,
+    DEFAULT_CONTIGUOUS,
+    DEFAULT_DISCHARGE_HOURS,
+    DEFAULT_DISCHARGE_POWER,
+    DEFAULT_FEED_IN_FACTOR,
+    DEFAULT_FORECAST_ATTRIBUTE,
+    DEFAULT_FORECAST_TIME_KEY,
+    DEFAULT_FORECAST_VALUE_KEY,
+    DEFAULT_SOLAR_ATTRIBUTE,
+    DEFAULT_SOLAR_TIME_KEY,
+    DEFAULT_SOLAR_VALUE_KEY,
+    DEFAULT_STRATEGY,
+    SOLAR_VALUE_SCALE,
+    STRATEGY_OPTIMAL,
+)
+from .coordinator import ZendureCoordinator
+from .forecast import PriceSlot, parse_forecast, resample
+from .planner import PlannedSlot, SocPlanner
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CHARGE = "charge"
+STATE_DISCHARGE = "discharge"
+
+# The plan is also refreshed periodically so past windows drop off
+REPLAN_INTERVAL = timedelta(minutes=30)
+
+
+@dataclass
+class SchedulePlan:
+    """Charge and discharge windows as (start, end) intervals."""
+
+    charge: list[tuple[datetime, datetime]] = field(default_factory=list)
+    discharge: list[tuple[datetime, datetime]] = field(default_factory=list)
+    # Per slot setpoints of the SOC planner, empty for cheapest hours plans
+    slots: list[PlannedSlot] = field(default_factory=list)
+
+    def state_at(self, moment: datetime) -> str | None:
+        """Return the desired battery state at a moment."""
+        for start, end in self.charge:
+            if start <= moment < end:
+                return STATE_CHARGE
+        for start, end in self.discharge:
+            if start <= moment < end:
+                return STATE_DISCHARGE
+        return None
+
+    def power_at(self, moment: datetime) -> int | None:
+        """Return the planned grid power at a moment, None without slots."""
+        for slot in self.slots:
+            if slot.start <= moment < slot.end:
+                return slot.power
+        return None
+
+    def boundaries_after(self, moment: datetime) -> list[datetime]:
+        """Return the sorted window boundaries after a moment."""
+        return sorted(
+            {
+                point
+                for start, end in (
+                    *self.charge,
+                    *self.discharge,
+                    *((slot.start, slot.end) for slot in self.slots),
+                )
+                for point in (start, end)
+                if point > moment
+            }
+        )
+
+    @staticmethod
+    def next_start(
+        windows: list[tuple[datetime, datetime]], moment: datetime
+    ) -> datetime | None:
+        """Return the start of the current or next window."""
+        for start, end in windows:
+            if end > moment:
+                return start
+        return None
+
+
+def best_contiguous_window(
+    prices: Sequence[float],
+    length: int,
+    lowest: bool = True,
+    allowed: Sequence[bool] | None = None,
+) -> int | None:
+    """Return the start index of the cheapest (or dearest) run of slots.
+
+    A sliding window keeps the running sum and the number of disallowed
+    slots in the window, so the search is O(n).
+    """
+    if length <= 0 or length > len(prices):
+        return None
+    sign = 1.0 if lowest else -1.0
+    window_sum = 0.0
+    blocked = 0
+    best_index: int | None = None
+    best_sum = 0.0
+    for index, price in enumerate(prices):
+        window_sum += sign * price
+        if allowed is not None and not allowed[index]:
+            blocked += 1
+        if index >= length:
+            window_sum -= sign * prices[index - length]
+            if allowed is not None and not allowed[index - length]:
+                blocked -= 1
+        if (
+            index >= length - 1
+            and not blocked
+            and (best_index is None or window_sum < best_sum)
+        ):
+            best_index = index - length + 1
+            best_sum = window_sum
+    return best_index
+
+
+def best_slots(
+    prices: Sequence[float],
+    count: int,
+    lowest: bool = True,
+    allowed: Sequence[bool] | None = None,
+) -> list[int]:
+    """Return the indices of the cheapest (or dearest) slots in time order."""
+    candidates = [
+        index for index in range(len(prices)) if allowed is None or allowed[index]
+    ]
+    if lowest:
+        chosen = heapq.nsmallest(count, candidates, key=prices.__getitem__)
+    else:
+        chosen = heapq.nlargest(count, candidates, key=prices.__getitem__)
+    return sorted(chosen)
+
+
+def merge_slots(
+    slots: Sequence[PriceSlot], indices: Sequence[int]
+) -> list[tuple[datetime, datetime]]:
+    """Merge the selected slots into (start, end) intervals."""
+    intervals: list[tuple[datetime, datetime]] = []
+    for index in sorted(indices):
+        slot = slots[index]
+        if intervals and intervals[-1][1] == slot.start:
+            intervals[-1] = (intervals[-1][0], slot.end)
+        else:
+            intervals.append((slot.start, slot.end))
+    return intervals
+
+
+def plan_windows(
+    slots: Sequence[PriceSlot],
+    now: datetime,
+    charge_hours: float,
+    discharge_hours: float,
+    contiguous: bool = True,
+) -> SchedulePlan:
+    """Plan charging in the cheapest and discharging in the dearest hours.
+
+    Only slots that have not ended yet are considered. Charge slots are
+    chosen first and excluded from discharging.
+    """
+    future = [slot for slot in slots if slot.end > now]
+    if not future:
+        return SchedulePlan()
+    slot_hours = (future[0].end - future[0].start).total_seconds() / 3600
+    if slot_hours <= 0:
+        return SchedulePlan()
+    prices = [slot.price for slot in future]
+
+    def select(hours: float, lowest: bool, allowed: list[bool] | None) -> list[int]:
+        count = min(len(future), round(hours / slot_hours))
+        if count <= 0:
+            return []
+        if not contiguous:
+            return best_slots(prices, count, lowest, allowed)
+        start = best_contiguous_window(prices, count, lowest, allowed)
+        return [] if start is None else list(range(start, start + count))
+
+    charge = select(charge_hours, True, None)
+    allowed = [True] * len(future)
+    for index in charge:
+        allowed[index] = False
+    discharge = select(discharge_hours, False, allowed)
+    return SchedulePlan(merge_slots(future, charge), merge_slots(future, discharge))
+
+
+def schedule_from_slots(slots: Sequence[PlannedSlot]) -> SchedulePlan:
+    """Turn planner setpoints into a plan with merged windows."""
+
+    def windows(charging: bool) -> list[tuple[datetime, datetime]]:
+        intervals: list[tuple[datetime, datetime]] = []
+        for slot in slots:
+            if slot.power == 0 or (slot.power > 0) != charging:
+                continue
+            if intervals and intervals[-1][1] == slot.start:
+                intervals[-1] = (intervals[-1][0], slot.end)
+            else:
+                intervals.append((slot.start, slot.end))
+        return intervals
+
+    return SchedulePlan(windows(True), windows(False), list(slots))
+
+
+class ZendureScheduler:
+    """Apply a cheapest hours plan to a hub at the window boundaries."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: ZendureCoordinator,
+        options: dict[str, Any],
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.forecast_entity: str = options[CONF_FORECAST_ENTITY]
+        self.attribute = options.get(
+            CONF_FORECAST_ATTRIBUTE, DEFAULT_FORECAST_ATTRIBUTE
+        )
+        self.time_key = options.get(CONF_FORECAST_TIME_KEY, DEFAULT_FORECAST_TIME_KEY)
+        self.value_key = options.get(
+            CONF_FORECAST_VALUE_KEY, DEFAULT_FORECAST_VALUE_KEY
+        )
+        self.charge_hours = float(options.get(CONF_CHARGE_HOURS, DEFAULT_CHARGE_HOURS))
+        self.discharge_hours = float(
+            options.get(CONF_DISCHARGE_HOURS, DEFAULT_DISCHARGE_HOURS)
+        )
+        self.charge_power = int(options.get(CONF_CHARGE_POWER, DEFAULT_CHARGE_POWER))
+        self.discharge_power = int(
+            options.get(CONF_DISCHARGE_POWER, DEFAULT_DISCHARGE_POWER)
+        )
+        self.contiguous = bool(options.get(CONF_CONTIGUOUS, DEFAULT_CONTIGUOUS))
+        self.strategy = options.get(CONF_STRATEGY, DEFAULT_STRATEGY)
+        self.solar_entity: str | None = options.get(CONF_SOLAR_ENTITY)
+        self.solar_attribute = options.get(
+            CONF_SOLAR_ATTRIBUTE, DEFAULT_SOLAR_ATTRIBUTE
+        )
+        self.solar_time_key = options.get(CONF_SOLAR_TIME_KEY, DEFAULT_SOLAR_TIME_KEY)
+        self.solar_value_key = options.get(
+            CONF_SOLAR_VALUE_KEY, DEFAULT_SOLAR_VALUE_KEY
+        )
+        self.planner = SocPlanner(
+            float(options.get(CONF_FEED_IN_FACTOR, DEFAULT_FEED_IN_FACTOR))
+        )
+        self.plan = SchedulePlan()
+        # State and limit this scheduler put the hub in, None if it did not
+        # take control
+        self._state: str | None = None
+        self._limit: int | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_boundary: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start following the forecast entity."""
+        entities = [self.forecast_entity]
+        if self.solar_entity:
+            entities.append(self.solar_entity)
+        self._unsubs.append(
+            async_track_state_change_event(
+                self.hass, entities, self._async_forecast_changed
+            )
+        )
+        self._unsubs.append(
+            async_track_time_interval(
+                self.hass, self._async_replan_interval, REPLAN_INTERVAL
+            )
+        )
+        self.async_replan()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the scheduler."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        if self._unsub_boundary:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+    @callback
+    def _async_forecast_changed(self, event: Event) -> None:
+        self.async_replan()
+
+    @callback
+    def _async_replan_interval(self, now: datetime) -> None:
+        self.async_replan()
+
+    @callback
+    def async_replan(self) -> None:
+        """Rebuild the plan from the forecast entity and reschedule."""
+        state = self.hass.states.get(self.forecast_entity)
+        forecast = state.attributes.get(self.attribute) if state else None
+        if not forecast:
+            _LOGGER.debug(
+                "No %s attribute on %s, keeping the current plan",
+                self.attribute,
+                self.forecast_entity,
+            )
+            return
+        slots = parse_forecast(forecast, self.time_key, self.value_key)
+        now = dt_util.utcnow()
+        if self.strategy == STRATEGY_OPTIMAL:
+            plan = self._optimal_plan(slots, now)
+            if plan is None:
+                return
+            self.plan = plan
+        else:
+            self.plan = plan_windows(
+                slots,
+                now,
+                self.charge_hours,
+                self.discharge_hours,
+                self.contiguous,
+            )
+        _LOGGER.debug("New Zendure schedule: %s", self.plan)
+        self._async_schedule_next()
+        # Let the schedule sensors pick up the new plan
+        self.coordinator.async_update_listeners()
+
+    def _optimal_plan(
+        self, slots: list[PriceSlot], now: datetime
+    ) -> SchedulePlan | None:
+        """Return the SOC planner plan, None while the hub state is unknown."""
+        limits = self.coordinator.battery_limits()
+        data = self.coordinator.data or {}
+        soc = data.get("properties", {}).get("electricLevel")
+        if limits is None or soc is None:
+            _LOGGER.debug("Battery limits not known yet, keeping the current plan")
+            return None
+        solar_power = None
+        if self.solar_entity:
+            state = self.hass.states.get(self.solar_entity)
+            solar = state.attributes.get(self.solar_attribute) if state else None
+            if solar:
+                solar_slots = parse_forecast(
+                    solar, self.solar_time_key, self.solar_value_key
+                )
+                solar_power = [
+                    power * SOLAR_VALUE_SCALE for power in resample(slots, solar_slots)
+                ]
+        planned = self.planner.plan(slots, solar_power, limits, float(soc), now)
+        _LOGGER.debug(
+            "SOC plan recomputed %s of %s slots",
+            self.planner.solved_slots,
+            len(planned),
+        )
+        return schedule_from_slots(planned)
+
+    @callback
+    def _async_schedule_next(self) -> None:
+        """Apply the state for now and schedule the next boundary."""
+        if self._unsub_boundary:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+        now = dt_util.utcnow()
+        self.hass.async_create_task(
+            self._async_apply(self.plan.state_at(now), self.plan.power_at(now))
+        )
+        boundaries = self.plan.boundaries_after(now)
+        if boundaries:
+            self._unsub_boundary = async_track_point_in_utc_time(
+                self.hass, self._async_boundary, boundaries[0]
+            )
+
+    @callback
+    def _async_boundary(self, now: datetime) -> None:
+        self._unsub_boundary = None
+        self._async_schedule_next()
+
+    def transition(
+        self, desired: str | None, power: int | None = None
+    ) -> tuple[dict[str, int], int | None]:
+        """Return the properties to write to go to a state, and its limit.
+
+        The limit is the planned power if given, the configured charge or
+        discharge power otherwise.
+        """
+        limit: int | None = None
+        if desired == STATE_CHARGE:
+            limit = self.charge_power if power is None else abs(power)
+        elif desired == STATE_DISCHARGE:
+            limit = self.discharge_power if power is None else abs(power)
+
+        properties: dict[str, int] = {}
+        if self._state == STATE_CHARGE and desired != STATE_CHARGE:
+            properties["inputLimit"] = 0
+        if self._state == STATE_DISCHARGE and desired != STATE_DISCHARGE:
+            properties["outputLimit"] = 0
+        if limit is not None and (desired != self._state or limit != self._limit):
+            if desired == STATE_CHARGE:
+                properties.update(acMode=AC_MODE_CHARGE, inputLimit=limit)
+            else:
+                properties.update(acMode=AC_MODE_DISCHARGE, outputLimit=limit)
+        return properties, limit
+
+    async def _async_apply(self, desired: str | None, power: int | None) -> None:
+        """Write the transition to the desired state, if any."""
+        properties, limit = self.transition(desired, power)
+        if not properties:
+            return
+        _LOGGER.debug("Zendure schedule moves from %s to %s", self._state, desired)
+        # A queued write is replaced by the next transition, so the state is
+        # the desired one either way and a window that ends offline is undone
+        await self.coordinator.async_write_properties(properties)
+        self._state = desired
+        self._limit = limit
@@ -1,27 +1,59 @@
 """Zendure Local sensor platform for Home Assistant."""
 
+from __future__ import annotations
+
 import logging
 import re
+from typing import TYPE_CHECKING, Any
 
-import aiohttp
-import requests
-
-from homeassistant.components.button import ButtonEntity
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import CONF_NAME, CONF_RESOURCE, UnitOfPower, UnitOfTemperature
+from homeassistant.const import (
+    CONF_NAME,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .analytics import pack_key
+from .battery import decode_batcur, decode_temperature
+from .const import (
+    CONF_APPLIED_PROFILE,
+    CONF_APPLIED_SENSORS,
+    CONF_COMPACT,
+    CONF_RECORDER_PROFILE,
+    DEFAULT_RECORDER_PROFILE,
+    DOMAIN,
+    GROUP_AGGREGATES,
+    GROUP_ESTIMATES,
+    GROUP_PACK_INDICATORS,
+    GROUP_PACKS,
+    GROUP_STATUS,
+    PACK_FIELD_PREFIX,
+    RECORDER_TIERS,
+    TIER_CORE,
+    TIER_DIAGNOSTIC,
+    TIER_EXTENDED,
 )
+from .coordinator import ZendureCoordinator
+from .decode_log import DECODE_ERRORS
+from .estimators import decode_remain_out_time, format_remain_out_time
+from .polling import sensor_groups, within_deadband
+from .site import ZendureSiteSampler, is_site_entry
 
-from .const import DEFAULT_RESOURCE, DOMAIN, SCAN_INTERVAL
+if TYPE_CHECKING:
+    # The scheduler and its planner are only loaded for hubs with a forecast
+    from .scheduler import ZendureScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,12 +76,14 @@ TRANSLATION_KEY_MAP = {
     "messageId": "message_id",
     "smartMode": "smart_mode",
     "remainOutTime": "remain_out_time",
+    "remainOutTimeMinutes": "remain_out_time_minutes",
     "hyperTmp": "hyper_tmp",
     "maxTemp": "max_temp",
     "electricLevel": "electric_level",
     "minSoc": "min_soc",
     "socSet": "soc_set",
     "acMode": "ac_mode",
+    "acModeNumber": "ac_mode_number",
     "socStatus": "soc_status",
     "outputLimit": "output_limit",
     "inputLimit": "input_limit",
@@ -77,63 +111,50 @@ TRANSLATION_KEY_MAP = {
     "pass": "pass",
     "reverseState": "reverse_state",
     "FMVolt": "fm_volt",
+    "packSocMin": "pack_soc_min",
+    "packSocMax": "pack_soc_max",
+    "packSocMean": "pack_soc_mean",
+    "packPowerTotal": "pack_power_total",
+    "packTempMax": "pack_temp_max",
+    "packCellSpreadMax": "pack_cell_spread_max",
+    "dataAge": "data_age",
+    "snapshot": "snapshot",
+    "estimatedDischargeTime": "estimated_discharge_time",
+    "estimatedChargeTime": "estimated_charge_time",
+    "chargeStartTime": "charge_start_time",
+    "dischargeStartTime": "discharge_start_time",
+    "plannedPower": "planned_power",
+    "houseLoad": "house_load",
+    "selfConsumption": "self_consumption",
+    "export": "export",
+    "hubOutput": "hub_output",
+    "siteSolarPower": "site_solar_power",
+    "sampleSkew": "sample_skew",
 }
 
 
-class ZendureCoordinator(DataUpdateCoordinator):
-    """Data coordinator for Zendure Local sensors."""
-
-    def __init__(self, hass: HomeAssistant, resource: str) -> None:
-        """Initialize the coordinator."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
-        )
-        self.resource = resource
-
-    async def _async_update_data(self) -> dict:
-        """Fetch data from Zendure device."""
-        try:
-            _LOGGER.debug("Fetching data from %s", self.resource)
-            response = await self.hass.async_add_executor_job(
-                lambda: requests.get(self.resource, timeout=10)
-            )
-            # Example response:
-            # {"timestamp":1750179973,"messageId":142,"sn":"REDACTED","version":2,"product":"solarFlow800","properties":{"heatState":0,"packInputPower":676,"outputPackPower":0,"outputHomePower":799,"remainOutTime":324,"packState":2,"electricLevel":97,"gridInputPower":0,"solarInputPower":123,"solarPower1":64,"solarPower2":59,"pass":0,"reverseState":0,"socStatus":0,"hyperTmp":3211,"dcStatus":2,"pvStatus":1,"acStatus":1,"dataReady":1,"gridState":1,"BatVolt":4923,"socLimit":0,"writeRsp":0,"acMode":2,"inputLimit":400,"outputLimit":800,"socSet":1000,"minSoc":50,"gridStandard":4,"gridReverse":1,"inverseMaxPower":800,"lampSwitch":1,"IOTState":2,"factoryModeState":0,"OTAState":0,"LCNState":0,"oldMode":0,"VoltWakeup":0,"ts":1750179970,"bindstate":0,"tsZone":14,"chargeMaxLimit":800,"smartMode":1,"packNum":2,"rssi":-82,"is_error":0},"packData":[{"sn":"REDACTED","packType":70,"socLevel":97,"state":2,"power":742,"maxTemp":3091,"totalVol":4980,"batcur":65387,"maxVol":332,"minVol":331,"softVersion":4113,"heatState":0},{"sn":"REDACTED","packType":70,"socLevel":97,"state":2,"power":139,"maxTemp":3051,"totalVol":4970,"batcur":65508,"maxVol":332,"minVol":331,"softVersion":4113,"heatState":0}]}a
-
-            if response.status_code == 200:
-                data = response.json()
-                _LOGGER.debug("Successfully fetched data: %s", data)
-                return data
-
-            _LOGGER.warning("HTTP error %s when fetching data", response.status_code)
-            return {}
-
-        except requests.exceptions.RequestException as ex:
-            _LOGGER.error("Error fetching Zendure data: %s", ex)
-            return {}
-        except (ValueError, KeyError) as ex:
-            _LOGGER.error("Error parsing Zendure data: %s", ex)
-            return {}
-
-
 SENSOR_TYPES = {
     "messageId": {
         "native_unit_of_measurement": None,
         "icon": "mdi:api",
-        "state_class": SensorStateClass.MEASUREMENT,
+        "entity_category": EntityCategory.DIAGNOSTIC,
         "value_func": lambda data: data["messageId"],
     },
     "remainOutTime": {
         "native_unit_of_measurement": None,
         "icon": "mdi:clock-time-eight-outline",
-        "value_func": lambda data: (
-            "Unknown"
-            if int(data["properties"]["remainOutTime"] // 60) == 999
-            and int(data["properties"]["remainOutTime"] % 60) == 0
-            else f"{int(data['properties']['remainOutTime'] // 60)} h {int(data['properties']['remainOutTime'] % 60)} m"
+        "value_func": lambda data: format_remain_out_time(
+            data["properties"]["remainOutTime"]
+        ),
+    },
+    "remainOutTimeMinutes": {
+        "tier": TIER_CORE,
+        "native_unit_of_measurement": UnitOfTime.MINUTES,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:timer-sand",
+        "value_func": lambda data: decode_remain_out_time(
+            data["properties"]["remainOutTime"]
         ),
     },
     "hyperTmp": {
@@ -141,16 +162,17 @@ SENSOR_TYPES = {
         "device_class": SensorDeviceClass.TEMPERATURE,
         "state_class": SensorStateClass.MEASUREMENT,
         "icon": "mdi:thermometer",
-        "value_func": lambda data: (int(data["properties"]["hyperTmp"]) - 2731) / 10.0,
+        "value_func": lambda data: decode_temperature(data["properties"]["hyperTmp"]),
     },
     "maxTemp": {
         "native_unit_of_measurement": UnitOfTemperature.CELSIUS,
         "device_class": SensorDeviceClass.TEMPERATURE,
         "state_class": SensorStateClass.MEASUREMENT,
         "icon": "mdi:thermometer",
-        "value_func": lambda data: (int(data["packData"][0]["maxTemp"]) - 2731) / 10.0,
+        "value_func": lambda data: decode_temperature(data["packData"][0]["maxTemp"]),
     },
     "electricLevel": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": "%",
         "device_class": SensorDeviceClass.BATTERY,
         "state_class": SensorStateClass.MEASUREMENT,
@@ -177,6 +199,13 @@ SENSOR_TYPES = {
             int(data["properties"]["acMode"]), "unknown"
         ),
     },
+    # Raw acMode for automations that compare numbers
+    "acModeNumber": {
+        "native_unit_of_measurement": None,
+        "icon": "mdi:battery-charging-wireless",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+        "value_func": lambda data: int(data["properties"]["acMode"]),
+    },
     "is_error": {
         "native_unit_of_measurement": None,
         "icon": "mdi:battery-alert",
@@ -204,12 +233,14 @@ SENSOR_TYPES = {
         "value_func": lambda data: data["properties"]["inputLimit"],
     },
     "packInputPower": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": UnitOfPower.WATT,
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
         "value_func": lambda data: -int(data["properties"]["packInputPower"]),
     },
     "outputPackPower": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": UnitOfPower.WATT,
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
@@ -227,6 +258,7 @@ SENSOR_TYPES = {
     },
     # Solar Power Sensors
     "solarInputPower": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": UnitOfPower.WATT,
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
@@ -249,6 +281,7 @@ SENSOR_TYPES = {
     },
     # Grid Power Sensors
     "gridInputPower": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": UnitOfPower.WATT,
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
@@ -256,6 +289,7 @@ SENSOR_TYPES = {
         "value_func": lambda data: data["properties"]["gridInputPower"],
     },
     "outputHomePower": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": UnitOfPower.WATT,
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
@@ -264,6 +298,7 @@ SENSOR_TYPES = {
     },
     # Status Sensors
     "packState": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": None,
         "icon": "mdi:battery-sync",
         "value_func": lambda data: {
@@ -416,12 +451,14 @@ SENSOR_TYPES = {
 
 PACK_SENSOR_TYPES = {
     "soc": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": "%",
         "device_class": SensorDeviceClass.BATTERY,
         "state_class": SensorStateClass.MEASUREMENT,
         "icon": "mdi:battery-outline",
     },
     "power": {
+        "tier": TIER_CORE,
         "native_unit_of_measurement": UnitOfPower.WATT,
         "device_class": SensorDeviceClass.POWER,
         "state_class": SensorStateClass.MEASUREMENT,
@@ -475,100 +512,517 @@ PACK_SENSOR_TYPES = {
     },
 }
 
-ZENDURE_ACTIONS = [
-    {
-        "key": "snel_laden",
-        "name": "Snel Laden",
-        "service": "rest_command.zendure_snel_laden",
-    },
-    {
-        "key": "stop_met_laden",
-        "name": "Stop met Laden",
-        "service": "rest_command.zendure_stop_met_laden",
-    },
-    {
-        "key": "snel_ontladen",
-        "name": "Snel Ontladen",
-        "service": "rest_command.zendure_snel_ontladen",
-    },
-    {
-        "key": "stop_met_ontladen",
-        "name": "Stop met Ontladen",
-        "service": "rest_command.zendure_stop_met_ontladen",
-    },
-    {
-        "key": "stop_met_alles",
-        "name": "Stop met Alles",
-        "service": "rest_command.zendure_stop_met_alles",
-    },
-]
-
-
-class ZendureActionButton(ButtonEntity):
-    """Button entity for Zendure action."""
-
-    def __init__(self, hass, action, device_info):
-        """Initialize ZendureActionButton."""
-        self._hass = hass
-        self._action = action
-        self._attr_name = f"Zendure {action['name']}"
-        self._attr_unique_id = f"zendure_{action['key']}_button"
-        self._attr_device_info = device_info
-
-    async def async_press(self) -> None:
-        """Handle button press by making the actual POST call to the Zendure device."""
-        serial = "!secret solarflow800_serial"  # Replace with actual serial retrieval if needed
-        url = "http://SolarFlow800.lan/properties/write"
-        payloads = {
-            "snel_laden": {
-                "sn": serial,
-                "properties": {"acMode": 1, "inputLimit": 2400},
-            },
-            "stop_met_laden": {
-                "sn": serial,
-                "properties": {"acMode": 1, "inputLimit": 0},
-            },
-            "snel_ontladen": {
-                "sn": serial,
-                "properties": {"acMode": 2, "outputLimit": 2400},
-            },
-            "stop_met_ontladen": {
-                "sn": serial,
-                "properties": {"acMode": 2, "outputLimit": 0},
-            },
-            "stop_met_alles": {
-                "sn": serial,
-                "properties": {"outputLimit": 0, "inputLimit": 0},
-            },
-        }
-        payload = payloads.get(self._action["key"])
-        if payload is None:
-            _LOGGER.error("No payload defined for action %s", self._action["key"])
-            return
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            resp = await session.post(url, json=payload)
-            if resp.status != 200:
-                _LOGGER.error(
-                    "Failed to POST to Zendure: %s %s", resp.status, await resp.text()
-                )
-            else:
-                _LOGGER.debug("POST to Zendure succeeded for %s", self._action["key"])
+# Hub level aggregates over all packs, computed once per poll by the coordinator
+AGGREGATE_SENSOR_TYPES = {
+    "packSocMin": {
+        "native_unit_of_measurement": "%",
+        "device_class": SensorDeviceClass.BATTERY,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-low",
+    },
+    "packSocMax": {
+        "native_unit_of_measurement": "%",
+        "device_class": SensorDeviceClass.BATTERY,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-high",
+    },
+    "packSocMean": {
+        "native_unit_of_measurement": "%",
+        "device_class": SensorDeviceClass.BATTERY,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-medium",
+    },
+    "packPowerTotal": {
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-charging",
+    },
+    "packTempMax": {
+        "native_unit_of_measurement": UnitOfTemperature.CELSIUS,
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:thermometer-high",
+    },
+    "packCellSpreadMax": {
+        "native_unit_of_measurement": "mV",
+        "device_class": SensorDeviceClass.VOLTAGE,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:scale-unbalanced",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+}
 
+# Hub level time estimates from smoothed pack power and pack energy
+ESTIMATE_SENSOR_TYPES = {
+    "estimatedDischargeTime": {
+        "native_unit_of_measurement": UnitOfTime.MINUTES,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-clock-outline",
+    },
+    "estimatedChargeTime": {
+        "native_unit_of_measurement": UnitOfTime.MINUTES,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-clock",
+    },
+}
 
-async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities) -> None:
-    """Set up Zendure Local sensors from a config entry."""
-    resource = entry.data.get(CONF_RESOURCE, DEFAULT_RESOURCE)
-    name = entry.data.get(CONF_NAME, "Solarflow 800")
+# Freshness of the report, updated on every poll
+STATUS_SENSOR_TYPES = {
+    "dataAge": {
+        "tier": TIER_EXTENDED,
+        "native_unit_of_measurement": UnitOfTime.SECONDS,
+        "device_class": SensorDeviceClass.DURATION,
+        "icon": "mdi:timer-sand",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+}
+
+# Time of the last report, with the decoded report as attributes (compact mode)
+SNAPSHOT_SENSOR_TYPE = {
+    "device_class": SensorDeviceClass.TIMESTAMP,
+    "icon": "mdi:clipboard-pulse-outline",
+    "tier": TIER_CORE,
+}
+
+# Next window starts of the cheapest hours scheduler
+SCHEDULE_SENSOR_TYPES = {
+    "chargeStartTime": {
+        "tier": TIER_CORE,
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "icon": "mdi:battery-clock",
+        "plan_field": "charge",
+    },
+    "dischargeStartTime": {
+        "tier": TIER_CORE,
+        "device_class": SensorDeviceClass.TIMESTAMP,
+        "icon": "mdi:battery-clock-outline",
+        "plan_field": "discharge",
+    },
+    "plannedPower": {
+        "tier": TIER_CORE,
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "icon": "mdi:transmission-tower-import",
+        "plan_field": "slots",
+    },
+}
+
+# Flows of a site derived from one aligned sample of its hubs and meter
+SITE_SENSOR_TYPES = {
+    "houseLoad": {
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:home-lightning-bolt",
+    },
+    "selfConsumption": {
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:home-battery",
+    },
+    "export": {
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:transmission-tower-export",
+    },
+    "hubOutput": {
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:home-import-outline",
+    },
+    "siteSolarPower": {
+        "native_unit_of_measurement": UnitOfPower.WATT,
+        "device_class": SensorDeviceClass.POWER,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:solar-power",
+    },
+    "sampleSkew": {
+        "native_unit_of_measurement": UnitOfTime.SECONDS,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:timer-sync-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+}
 
-    _LOGGER.debug(
-        "Setting up ZendureLocal integration with resource: %s and name: %s",
-        resource,
-        name,
+# Per pack health indicators from the running analytics in the coordinator
+PACK_HEALTH_SENSOR_TYPES = {
+    "cell_imbalance_mean": {
+        "native_unit_of_measurement": "mV",
+        "device_class": SensorDeviceClass.VOLTAGE,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:scale-unbalanced",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "cell_imbalance_stddev": {
+        "native_unit_of_measurement": "mV",
+        "device_class": SensorDeviceClass.VOLTAGE,
+        "icon": "mdi:sigma",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "cell_imbalance_trend": {
+        "native_unit_of_measurement": "mV/d",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:trending-up",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "temp_mean": {
+        "native_unit_of_measurement": UnitOfTemperature.CELSIUS,
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "icon": "mdi:thermometer",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "high_temp_time": {
+        "native_unit_of_measurement": UnitOfTime.HOURS,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:thermometer-alert",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+}
+
+# Per pack coulomb counting estimates from integrated batcur
+PACK_COULOMB_SENSOR_TYPES = {
+    "charge_throughput": {
+        "native_unit_of_measurement": "Ah",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:battery-sync-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "energy_charged": {
+        "tier": TIER_CORE,
+        "native_unit_of_measurement": UnitOfEnergy.WATT_HOUR,
+        "device_class": SensorDeviceClass.ENERGY,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:battery-arrow-up",
+    },
+    "energy_discharged": {
+        "tier": TIER_CORE,
+        "native_unit_of_measurement": UnitOfEnergy.WATT_HOUR,
+        "device_class": SensorDeviceClass.ENERGY,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:battery-arrow-down",
+    },
+    "estimated_capacity": {
+        "native_unit_of_measurement": "Ah",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-heart-outline",
+        "entity_category": EntityCategory.DIAGNOSTIC,
+    },
+    "estimated_soc": {
+        "native_unit_of_measurement": "%",
+        "device_class": SensorDeviceClass.BATTERY,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:battery-unknown",
+    },
+}
+
+
+def decode_pack_value(sensor_key: str, pack_info: dict) -> Any:
+    """Return the value of a pack sensor from the pack data of a report."""
+    if sensor_key.endswith("_soc"):
+        return pack_info.get("socLevel")
+    if sensor_key.endswith("_power"):
+        return pack_info.get("power")
+    if sensor_key.endswith("_temp"):
+        max_temp = pack_info.get("maxTemp")
+        return decode_temperature(max_temp) if max_temp is not None else None
+    # The cell voltages before the total voltage, their keys end in _voltage too
+    if sensor_key.endswith("_max_cell_voltage"):
+        max_vol = pack_info.get("maxVol")
+        # Convert from 0.01V units to V: maxVol / 100.0
+        return max_vol / 100.0 if max_vol is not None else None
+    if sensor_key.endswith("_min_cell_voltage"):
+        min_vol = pack_info.get("minVol")
+        # Convert from 0.01V units to V: minVol / 100.0
+        return min_vol / 100.0 if min_vol is not None else None
+    if sensor_key.endswith("_voltage"):
+        return pack_info.get("totalVol")
+    if sensor_key.endswith("_current"):
+        batcur = pack_info.get("batcur")
+        return decode_batcur(batcur) if batcur is not None else None
+    if sensor_key.endswith("_software_version"):
+        return pack_info.get("softVersion")
+    if sensor_key.endswith("_heat_state"):
+        heat_state = pack_info.get("heatState")
+        if heat_state is None:
+            return None
+        return {0: "normal", 1: "heating"}.get(int(heat_state), "unknown")
+    if sensor_key.endswith("_state"):
+        state_value = pack_info.get("state")
+        if state_value is None:
+            return None
+        state_map = {0: "standby", 1: "charging", 2: "discharging"}
+        return state_map.get(int(state_value), "unknown")
+    _LOGGER.warning("Unknown pack sensor type: %s", sensor_key)
+    return None
+
+
+def build_description(
+    key: str,
+    sensor_config: dict,
+    translation_key: str,
+    profile: str = DEFAULT_RECORDER_PROFILE,
+) -> SensorEntityDescription:
+    """Return the entity description of a sensor for a recorder profile.
+
+    Sensors of a tier above the profile are disabled by default and have no
+    state class, so no long-term statistics are kept when they are enabled.
+    Home Assistant reads the unrecorded attributes from the entity class, so
+    they cannot follow the profile: the sensors with large attributes, the
+    snapshot, schedule and plan sensors, never record them.
+    """
+    in_profile = RECORDER_TIERS.index(sensor_tier(sensor_config)) <= (
+        RECORDER_TIERS.index(profile)
+    )
+    return SensorEntityDescription(
+        key=key,
+        translation_key=translation_key,
+        name=None,  # Use translation system for entity name
+        native_unit_of_measurement=sensor_config.get("native_unit_of_measurement"),
+        device_class=sensor_config.get("device_class"),
+        state_class=sensor_config.get("state_class") if in_profile else None,
+        icon=sensor_config.get("icon"),
+        entity_category=sensor_config.get("entity_category"),
+        entity_registry_enabled_default=in_profile,
     )
 
-    coordinator = ZendureCoordinator(hass, resource)
-    await coordinator.async_config_entry_first_refresh()
+
+def sensor_tier(sensor_config: dict) -> str:
+    """Return the recorder tier of a sensor."""
+    if "tier" in sensor_config:
+        return sensor_config["tier"]
+    if sensor_config.get("entity_category") == EntityCategory.DIAGNOSTIC:
+        return TIER_DIAGNOSTIC
+    return TIER_EXTENDED
+
+
+# Sensor types of the hub and site devices, keyed like their entities
+HUB_SENSOR_SCHEMA = (
+    SENSOR_TYPES,
+    AGGREGATE_SENSOR_TYPES,
+    ESTIMATE_SENSOR_TYPES,
+    STATUS_SENSOR_TYPES,
+    {"snapshot": SNAPSHOT_SENSOR_TYPE},
+    SCHEDULE_SENSOR_TYPES,
+    SITE_SENSOR_TYPES,
+)
+# Sensor types of every pack device, their entity keys are prefixed with pack_
+PACK_SENSOR_SCHEMA = (
+    PACK_SENSOR_TYPES,
+    PACK_HEALTH_SENSOR_TYPES,
+    PACK_COULOMB_SENSOR_TYPES,
+)
+# The pack state is not named pack_state, that is the state of the hub
+PACK_TRANSLATION_KEY_MAP = {"state": "pack_battery_state"}
+
+
+def build_descriptions(profile: str) -> dict[str, SensorEntityDescription]:
+    """Return the entity descriptions of all sensors for a recorder profile."""
+    descriptions = {}
+    for sensor_types in HUB_SENSOR_SCHEMA:
+        for key, sensor_config in sensor_types.items():
+            descriptions[key] = build_description(
+                key, sensor_config, TRANSLATION_KEY_MAP.get(key, key), profile
+            )
+    for sensor_types in PACK_SENSOR_SCHEMA:
+        for key, sensor_config in sensor_types.items():
+            descriptions[f"pack_{key}"] = build_description(
+                f"pack_{key}",
+                sensor_config,
+                PACK_TRANSLATION_KEY_MAP.get(key, f"pack_{key}"),
+                profile,
+            )
+    return descriptions
+
+
+# Entity descriptions by recorder profile and key, built once at import as
+# they are frozen and shared by the sensors of every config entry
+DESCRIPTIONS = {profile: build_descriptions(profile) for profile in RECORDER_TIERS}
+
+
+def apply_profile_to_registry(
+    hass: HomeAssistant, entities: list[SensorEntity], previous: str, profile: str
+) -> None:
+    """Enable or disable registered sensors after the profile changed.
+
+    Only sensors disabled by the integration are enabled again, sensors
+    disabled by the user stay disabled. Only sensors that were in the
+    previous profile are disabled, sensors enabled by the user outside the
+    profile stay enabled.
+    """
+    registry = er.async_get(hass)
+    for entity in entities:
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, entity.unique_id)
+        registry_entry = registry.async_get(entity_id) if entity_id else None
+        if registry_entry is None:
+            continue
+        key = entity.entity_description.key
+        enabled = DESCRIPTIONS[profile][key].entity_registry_enabled_default
+        was_enabled = DESCRIPTIONS[previous][key].entity_registry_enabled_default
+        if (
+            enabled
+            and registry_entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+        ):
+            registry.async_update_entity(entity_id, disabled_by=None)
+        elif not enabled and was_enabled and registry_entry.disabled_by is None:
+            registry.async_update_entity(
+                entity_id, disabled_by=er.RegistryEntryDisabler.INTEGRATION
+            )
+
+
+def excluded_keys(compact: bool, groups: frozenset[str], scheduled: bool) -> set[str]:
+    """Return the keys of the sensors the sensor options leave out.
+
+    The keys follow from the options alone: pack and aggregate sensors are
+    only left out by compact mode or their group, whatever packs the hub
+    currently reports.
+    """
+    pack_keys = {f"pack_{key}" for key in PACK_SENSOR_TYPES}
+    pack_indicator_keys = {
+        f"pack_{key}" for key in PACK_HEALTH_SENSOR_TYPES | PACK_COULOMB_SENSOR_TYPES
+    }
+    excluded = set()
+    if compact:
+        excluded.update(
+            key
+            for key, sensor_config in (SENSOR_TYPES | ESTIMATE_SENSOR_TYPES).items()
+            if sensor_tier(sensor_config) != TIER_CORE
+        )
+        excluded.update(AGGREGATE_SENSOR_TYPES, pack_keys, pack_indicator_keys)
+    else:
+        excluded.add("snapshot")
+    for group, keys in (
+        (GROUP_ESTIMATES, set(ESTIMATE_SENSOR_TYPES)),
+        (GROUP_STATUS, set(STATUS_SENSOR_TYPES)),
+        (GROUP_AGGREGATES, set(AGGREGATE_SENSOR_TYPES)),
+        (GROUP_PACKS, pack_keys),
+        (GROUP_PACK_INDICATORS, pack_indicator_keys),
+    ):
+        if group not in groups:
+            excluded.update(keys)
+    if not scheduled:
+        excluded.update(SCHEDULE_SENSOR_TYPES)
+    return excluded
+
+
+def remove_stale_sensors(hass: HomeAssistant, entry, excluded: set[str]) -> None:
+    """Remove the registered sensors the sensor options now leave out.
+
+    Only called after the options changed, e.g. this drops the full set of
+    sensors after switching to compact mode and the snapshot sensor after
+    switching back. Sensors are removed by key, never because the current
+    report lacks them, as a hub may briefly report fewer packs.
+    """
+    registry = er.async_get(hass)
+    for registry_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if registry_entry.domain == "sensor" and any(
+            registry_entry.unique_id.endswith(f"_{key}") for key in excluded
+        ):
+            registry.async_remove(registry_entry.entity_id)
+
+
+def decode_snapshot(coordinator: ZendureCoordinator) -> dict[str, Any]:
+    """Return every decoded value of the last report, keyed like the sensors.
+
+    The snapshot is decoded once per report and shared, callers must not
+    modify it.
+    """
+    data = coordinator.data
+    if not data:
+        return {}
+    cached = coordinator.snapshot_cache
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    decode_errors = coordinator.decode_errors
+    hub: dict[str, Any] = {}
+    for sensor_key, sensor_config in SENSOR_TYPES.items():
+        try:
+            hub[sensor_key] = sensor_config["value_func"](data)
+        except DECODE_ERRORS as err:
+            decode_errors.failed(sensor_key, err)
+            hub[sensor_key] = None
+        else:
+            decode_errors.decoded(sensor_key, hub[sensor_key])
+    hub.update(coordinator.pack_aggregates)
+    hub.update(coordinator.hub_estimates)
+    packs = []
+    for index, pack_info in enumerate(data.get("packData") or []):
+        pack: dict[str, Any] = {"sn": pack_info.get("sn")}
+        for sensor_key in PACK_SENSOR_TYPES:
+            field = f"{PACK_FIELD_PREFIX}{sensor_key}"
+            try:
+                pack[sensor_key] = decode_pack_value(f"pack_{sensor_key}", pack_info)
+            except DECODE_ERRORS as err:
+                decode_errors.failed(field, err, index)
+                pack[sensor_key] = None
+            else:
+                decode_errors.decoded(field, pack[sensor_key], index)
+        pack.update(coordinator.pack_indicators.get(pack_key(pack_info, index), {}))
+        packs.append(pack)
+    snapshot = {"hub": hub, "packs": packs}
+    coordinator.snapshot_cache = (data, snapshot)
+    return snapshot
+
+
+def snapshot_fields() -> list[str]:
+    """Return the fields of a snapshot, pack fields prefixed with pack."""
+    hub_fields = SENSOR_TYPES | AGGREGATE_SENSOR_TYPES | ESTIMATE_SENSOR_TYPES
+    pack_fields = (
+        PACK_SENSOR_TYPES | PACK_HEALTH_SENSOR_TYPES | PACK_COULOMB_SENSOR_TYPES
+    )
+    return list(hub_fields) + [f"{PACK_FIELD_PREFIX}{field}" for field in pack_fields]
+
+
+def decoded_fields() -> list[str]:
+    """Return the fields decoded from the report, as named in the decode log."""
+    return list(SENSOR_TYPES) + [
+        f"{PACK_FIELD_PREFIX}{field}" for field in PACK_SENSOR_TYPES
+    ]
+
+
+def hub_name(entry) -> str:
+    """Return the name of the hub device of an entry."""
+    return entry.data.get(CONF_NAME, "Solarflow 800")
+
+
+def hub_unique_id(entry, key: str) -> str:
+    """Return the unique id of a hub sensor, keyed by entry as names repeat."""
+    return f"{entry.entry_id}_{key}"
+
+
+def pack_device_id(entry, pack_number: int) -> str:
+    """Return the device identifier of a pack of the hub of an entry."""
+    return f"{entry.entry_id}_battery{pack_number}"
+
+
+def pack_unique_id(entry, pack_number: int, key: str) -> str:
+    """Return the unique id of a pack sensor."""
+    return f"{pack_device_id(entry, pack_number)}_{key}"
+
+
+async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities) -> None:
+    """Set up Zendure Local sensors from a config entry."""
+    if is_site_entry(entry):
+        sampler: ZendureSiteSampler = entry.runtime_data.sampler
+        async_add_entities(
+            ZendureSiteSensor(
+                sampler, DESCRIPTIONS[DEFAULT_RECORDER_PROFILE][sensor_key], entry
+            )
+            for sensor_key in SITE_SENSOR_TYPES
+        )
+        return
+    coordinator: ZendureCoordinator = entry.runtime_data.coordinator
+    profile = entry.options.get(CONF_RECORDER_PROFILE, DEFAULT_RECORDER_PROFILE)
+    compact = entry.options.get(CONF_COMPACT, False)
+    groups = sensor_groups(entry.options)
+    descriptions = DESCRIPTIONS[profile]
 
     if coordinator.data is None:
         _LOGGER.warning(
@@ -579,23 +1033,14 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities) -> N
 
     entities = []
 
-    # Create main inverter device sensors
-    main_sensors = [key for key in SENSOR_TYPES if not key.startswith("pack")]
-    for sensor_key in main_sensors:
-        sensor_config = SENSOR_TYPES[sensor_key]
-        # Use translation key mapping to convert camelCase to snake_case
-        translation_key = TRANSLATION_KEY_MAP.get(sensor_key, sensor_key)
-        description = SensorEntityDescription(
-            key=sensor_key,
-            translation_key=translation_key,
-            name=None,  # Use translation system for entity name
-            native_unit_of_measurement=sensor_config.get("native_unit_of_measurement"),
-            device_class=sensor_config.get("device_class"),
-            state_class=sensor_config.get("state_class"),
-            icon=sensor_config.get("icon"),
-            entity_category=sensor_config.get("entity_category"),
+    # Create main inverter device sensors, including the hub level pack
+    # properties like packInputPower and packState
+    for sensor_key, sensor_config in SENSOR_TYPES.items():
+        if compact and sensor_tier(sensor_config) != TIER_CORE:
+            continue
+        entities.append(
+            ZendureLocalSensor(coordinator, descriptions[sensor_key], entry)
         )
-        entities.append(ZendureLocalSensor(coordinator, description, name))
 
     # Dynamically create battery pack device sensors based on available pack data
     pack_count = 0
@@ -607,46 +1052,92 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities) -> N
             "No pack data available initially, sensors will be created when data becomes available"
         )
 
-    for pack_index in range(pack_count):
-        pack_number = pack_index + 1  # Human-readable pack numbers start at 1
-        for sensor_key, sensor_config in PACK_SENSOR_TYPES.items():
-            # Handle special case for pack state to avoid duplicate with main pack_state
-            translation_key = f"pack_{sensor_key}"
-            if sensor_key == "state":
-                translation_key = "pack_battery_state"
-
-            description = SensorEntityDescription(
-                key=f"pack_{sensor_key}",
-                translation_key=translation_key,
-                name=None,  # Use translation system for entity name
-                native_unit_of_measurement=sensor_config.get(
-                    "native_unit_of_measurement"
-                ),
-                device_class=sensor_config.get("device_class"),
-                state_class=sensor_config.get("state_class"),
-                icon=sensor_config.get("icon"),
-                entity_category=sensor_config.get("entity_category"),
+    if compact:
+        # Everything else, including the packs, is in the snapshot attributes
+        entities.append(
+            ZendureLocalSnapshotSensor(coordinator, descriptions["snapshot"], entry)
+        )
+        pack_count = 0
+
+    for sensor_key, sensor_config in ESTIMATE_SENSOR_TYPES.items():
+        if GROUP_ESTIMATES not in groups:
+            break
+        if compact and sensor_tier(sensor_config) != TIER_CORE:
+            continue
+        entities.append(
+            ZendureLocalEstimateSensor(coordinator, descriptions[sensor_key], entry)
+        )
+
+    for sensor_key in STATUS_SENSOR_TYPES:
+        if GROUP_STATUS not in groups:
+            break
+        entities.append(
+            ZendureLocalDataAgeSensor(coordinator, descriptions[sensor_key], entry)
+        )
+
+    scheduler = entry.runtime_data.scheduler
+    if scheduler is not None:
+        for sensor_key, sensor_config in SCHEDULE_SENSOR_TYPES.items():
+            sensor_class = (
+                ZendureLocalPlanSensor
+                if sensor_config["plan_field"] == "slots"
+                else ZendureLocalScheduleSensor
+            )
+            entities.append(
+                sensor_class(coordinator, descriptions[sensor_key], entry, scheduler)
             )
+
+    # Cross-pack aggregates only add information with two or more packs
+    if pack_count >= 2 and GROUP_AGGREGATES in groups:
+        for sensor_key in AGGREGATE_SENSOR_TYPES:
+            entities.append(
+                ZendureLocalAggregateSensor(
+                    coordinator, descriptions[sensor_key], entry
+                )
+            )
+
+    for pack_index in range(pack_count):
+        for sensor_key in PACK_SENSOR_TYPES:
+            if GROUP_PACKS not in groups:
+                break
             entities.append(
                 ZendureLocalBatterySensor(
                     coordinator,
-                    description,
-                    f"{name} Battery {pack_number}",
+                    descriptions[f"pack_{sensor_key}"],
+                    entry,
+                    pack_index,
+                )
+            )
+        for sensor_key in PACK_HEALTH_SENSOR_TYPES | PACK_COULOMB_SENSOR_TYPES:
+            if GROUP_PACK_INDICATORS not in groups:
+                break
+            entities.append(
+                ZendureLocalPackIndicatorSensor(
+                    coordinator,
+                    descriptions[f"pack_{sensor_key}"],
+                    entry,
                     pack_index,
                 )
             )
 
-    # # Add Zendure action buttons
-    # device_info = DeviceInfo(
-    #     identifiers={(DOMAIN, "zendure_solarflow")},
-    #     name="Solarflow 800",
-    #     manufacturer="Zendure",
-    #     model="Solarflow Hub",
-    # )
-    # buttons = [
-    #     ZendureActionButton(hass, action, device_info) for action in ZENDURE_ACTIONS
-    # ]
-    # async_add_entities(buttons, update_before_add=False)
+    # Entries from before the profile was stored keep their enabled sensors
+    previous = entry.data.get(CONF_APPLIED_PROFILE, profile)
+    apply_profile_to_registry(hass, entities, previous, profile)
+    applied = {
+        "compact": compact,
+        "groups": sorted(groups),
+        "scheduled": scheduler is not None,
+    }
+    # Entries from before the options were stored were pruned on every setup
+    if entry.data.get(CONF_APPLIED_SENSORS) != applied:
+        remove_stale_sensors(
+            hass,
+            entry,
+            excluded_keys(compact, groups, scheduler is not None),
+        )
+    data = {**entry.data, CONF_APPLIED_PROFILE: profile, CONF_APPLIED_SENSORS: applied}
+    if data != entry.data:
+        hass.config_entries.async_update_entry(entry, data=data)
 
     async_add_entities(entities)
     _LOGGER.debug("Added %d ZendureLocalSensor entities", len(entities))
@@ -661,15 +1152,15 @@ class ZendureLocalSensor(CoordinatorEntity[ZendureCoordinator], SensorEntity):
         self,
         coordinator: ZendureCoordinator,
         description: SensorEntityDescription,
-        prefix: str,
+        entry,
     ) -> None:
         """Initialize a ZendureLocalSensor."""
         super().__init__(coordinator)
         self.entity_description = description
-        self._attr_unique_id = f"{prefix}_{description.key}"
+        self._attr_unique_id = hub_unique_id(entry, description.key)
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "zendure_solarflow")},
-            name=prefix,
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=hub_name(entry),
             manufacturer="Zendure",
             model="Solarflow Hub",
         )
@@ -678,7 +1169,16 @@ class ZendureLocalSensor(CoordinatorEntity[ZendureCoordinator], SensorEntity):
         _LOGGER.debug("Initialized sensor: %s", description.key)
 
     def _handle_coordinator_update(self) -> None:
+        previous = self._attr_native_value
         self._update_native_value()
+        deadband = self.coordinator.polling.deadband(
+            self.entity_description.device_class
+        )
+        if within_deadband(previous, self._attr_native_value, deadband):
+            # Keep the last written value, small changes add up until they
+            # exceed the deadband
+            self._attr_native_value = previous
+            return
         super()._handle_coordinator_update()
 
     def _update_native_value(self) -> None:
@@ -691,18 +1191,116 @@ class ZendureLocalSensor(CoordinatorEntity[ZendureCoordinator], SensorEntity):
         if value_func:
             try:
                 value = value_func(data)
-                _LOGGER.debug("Processed value for sensor %s: %s", sensor_key, value)
-                self._attr_native_value = value
-            except (KeyError, ValueError, TypeError) as e:
-                _LOGGER.warning(
-                    "Failed to process value for sensor %s: %s", sensor_key, e
-                )
+            except DECODE_ERRORS as e:
+                self.coordinator.decode_errors.failed(sensor_key, e)
                 self._attr_native_value = None
+            else:
+                self.coordinator.decode_errors.decoded(sensor_key, value)
+                self._attr_native_value = value
         else:
             _LOGGER.warning("No value function defined for sensor %s", sensor_key)
             self._attr_native_value = None
 
 
+class ZendureLocalAggregateSensor(ZendureLocalSensor):
+    """Representation of a hub level aggregate over all battery packs."""
+
+    def _update_native_value(self) -> None:
+        if not self.coordinator.data:
+            self._attr_native_value = None
+            return
+        self._attr_native_value = self.coordinator.pack_aggregates.get(
+            self.entity_description.key
+        )
+
+
+class ZendureLocalEstimateSensor(ZendureLocalSensor):
+    """Representation of a hub level runtime estimate."""
+
+    def _update_native_value(self) -> None:
+        if not self.coordinator.data:
+            self._attr_native_value = None
+            return
+        self._attr_native_value = self.coordinator.hub_estimates.get(
+            self.entity_description.key
+        )
+
+
+class ZendureLocalDataAgeSensor(ZendureLocalSensor):
+    """Representation of the age of the last report of the hub."""
+
+    async def async_added_to_hass(self) -> None:
+        """Also update when the coordinator skips an unchanged report."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_poll_listener(self._handle_coordinator_update)
+        )
+
+    def _update_native_value(self) -> None:
+        self._attr_native_value = self.coordinator.data_age
+
+
+class ZendureLocalSnapshotSensor(ZendureLocalSensor):
+    """Representation of the last report with all decoded values as attributes."""
+
+    # The snapshot changes on every poll, keep it out of the recorder
+    _unrecorded_attributes = frozenset({"hub", "packs"})
+
+    def _update_native_value(self) -> None:
+        data = self.coordinator.data
+        if not data or data.get("timestamp") is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+            return
+        self._attr_native_value = dt_util.utc_from_timestamp(data["timestamp"])
+        self._attr_extra_state_attributes = decode_snapshot(self.coordinator)
+
+
+class ZendureLocalScheduleSensor(ZendureLocalSensor):
+    """Representation of the next charge or discharge window of the scheduler."""
+
+    # The windows follow from the price forecast, keep them out of the recorder
+    _unrecorded_attributes = frozenset({"windows"})
+
+    def __init__(
+        self,
+        coordinator: ZendureCoordinator,
+        description: SensorEntityDescription,
+        entry,
+        scheduler: ZendureScheduler,
+    ) -> None:
+        """Initialize a ZendureLocalScheduleSensor."""
+        self._scheduler = scheduler
+        self._plan_field = SCHEDULE_SENSOR_TYPES[description.key]["plan_field"]
+        super().__init__(coordinator, description, entry)
+
+    def _update_native_value(self) -> None:
+        windows = getattr(self._scheduler.plan, self._plan_field)
+        self._attr_native_value = self._scheduler.plan.next_start(
+            windows, dt_util.utcnow()
+        )
+        self._attr_extra_state_attributes = {
+            "windows": [
+                {"start": start.isoformat(), "end": end.isoformat()}
+                for start, end in windows
+            ]
+        }
+
+
+class ZendureLocalPlanSensor(ZendureLocalScheduleSensor):
+    """Representation of the planned grid power of the SOC planner."""
+
+    # The full plan changes on every replan, keep it out of the recorder
+    _unrecorded_attributes = frozenset({"windows", "plan"})
+
+    def _update_native_value(self) -> None:
+        plan = self._scheduler.plan
+        self._attr_native_value = plan.power_at(dt_util.utcnow())
+        self._attr_extra_state_attributes = {
+            "plan": [slot.as_dict() for slot in plan.slots]
+        }
+
+
 class ZendureLocalBatterySensor(CoordinatorEntity[ZendureCoordinator], SensorEntity):
     """Representation of a Zendure Local Battery Pack Sensor."""
 
@@ -712,28 +1310,37 @@ class ZendureLocalBatterySensor(CoordinatorEntity[ZendureCoordinator], SensorEnt
         self,
         coordinator: ZendureCoordinator,
         description: SensorEntityDescription,
-        prefix: str,
+        entry,
         pack_index: int,
     ) -> None:
         """Initialize a ZendureLocalBatterySensor."""
         super().__init__(coordinator)
         self.entity_description = description
         self._pack_index = pack_index
-        self._attr_unique_id = f"{prefix}_{description.key}"
-        pack_number = pack_index + 1
+        pack_number = pack_index + 1  # Human-readable pack numbers start at 1
+        self._attr_unique_id = pack_unique_id(entry, pack_number, description.key)
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"zendure_pack{pack_number}")},
-            name=prefix,
+            identifiers={(DOMAIN, pack_device_id(entry, pack_number))},
+            name=f"{hub_name(entry)} Battery {pack_number}",
             manufacturer="Zendure",
             model="Battery Pack",
-            via_device=(DOMAIN, "zendure_solarflow"),
+            via_device=(DOMAIN, entry.entry_id),
         )
         self._attr_native_value = None
         self._update_native_value()
         _LOGGER.debug("Initialized battery sensor: %s", description.key)
 
     def _handle_coordinator_update(self) -> None:
+        previous = self._attr_native_value
         self._update_native_value()
+        deadband = self.coordinator.polling.deadband(
+            self.entity_description.device_class
+        )
+        if within_deadband(previous, self._attr_native_value, deadband):
+            # Keep the last written value, small changes add up until they
+            # exceed the deadband
+            self._attr_native_value = previous
+            return
         super()._handle_coordinator_update()
 
     def _update_native_value(self) -> None:
@@ -747,66 +1354,85 @@ class ZendureLocalBatterySensor(CoordinatorEntity[ZendureCoordinator], SensorEnt
             self._attr_native_value = None
             return
         pack_info = pack_data[self._pack_index]
+        # Logged like the pack fields of the snapshot
+        field = PACK_FIELD_PREFIX + sensor_key[len("pack_") :]
         try:
-            if sensor_key.endswith("_soc"):
-                self._attr_native_value = pack_info.get("socLevel")
-            elif sensor_key.endswith("_power"):
-                self._attr_native_value = pack_info.get("power")
-            elif sensor_key.endswith("_temp"):
-                max_temp = pack_info.get("maxTemp")
-                if max_temp is not None:
-                    # Convert from Kelvin * 10 to Celsius: (maxTemp - 2731) / 10.0
-                    self._attr_native_value = (int(max_temp) - 2731) / 10.0
-                else:
-                    self._attr_native_value = None
-            elif sensor_key.endswith("_voltage"):
-                self._attr_native_value = pack_info.get("totalVol")
-            elif sensor_key.endswith("_current"):
-                batcur = pack_info.get("batcur")
-                if batcur is not None:
-                    # Convert: batcur is 32-bit integer, upper 16 bits sign-extended
-                    # Formula: batcur_actual = ((int16_t)batcur) / 10.0
-                    # Convert to signed 16-bit and divide by 10
-                    signed_current = batcur & 0xFFFF
-                    if signed_current > 32767:
-                        signed_current -= 65536
-                    self._attr_native_value = signed_current / 10.0
-                else:
-                    self._attr_native_value = None
-            elif sensor_key.endswith("_max_cell_voltage"):
-                max_vol = pack_info.get("maxVol")
-                if max_vol is not None:
-                    # Convert from 0.01V units to V: maxVol / 100.0
-                    self._attr_native_value = max_vol / 100.0
-                else:
-                    self._attr_native_value = None
-            elif sensor_key.endswith("_min_cell_voltage"):
-                min_vol = pack_info.get("minVol")
-                if min_vol is not None:
-                    # Convert from 0.01V units to V: minVol / 100.0
-                    self._attr_native_value = min_vol / 100.0
-                else:
-                    self._attr_native_value = None
-            elif sensor_key.endswith("_software_version"):
-                self._attr_native_value = pack_info.get("softVersion")
-            elif sensor_key.endswith("_heat_state"):
-                heat_state = pack_info.get("heatState")
-                if heat_state is not None:
-                    self._attr_native_value = {0: "normal", 1: "heating"}.get(
-                        int(heat_state), "unknown"
-                    )
-                else:
-                    self._attr_native_value = None
-            elif sensor_key.endswith("_state"):
-                state_value = pack_info.get("state")
-                if state_value is not None:
-                    state_map = {0: "standby", 1: "charging", 2: "discharging"}
-                    self._attr_native_value = state_map.get(int(state_value), "unknown")
-                else:
-                    self._attr_native_value = None
-            else:
-                _LOGGER.warning("Unknown pack sensor type: %s", sensor_key)
-                self._attr_native_value = None
-        except (KeyError, ValueError, TypeError) as e:
-            _LOGGER.warning("Failed to process pack sensor %s: %s", sensor_key, e)
+            self._attr_native_value = decode_pack_value(sensor_key, pack_info)
+        except DECODE_ERRORS as e:
+            self.coordinator.decode_errors.failed(field, e, self._pack_index)
+            self._attr_native_value = None
+        else:
+            self.coordinator.decode_errors.decoded(
+                field, self._attr_native_value, self._pack_index
+            )
+
+
+class ZendureLocalPackIndicatorSensor(ZendureLocalBatterySensor):
+    """Representation of a derived battery pack indicator."""
+
+    def __init__(
+        self,
+        coordinator: ZendureCoordinator,
+        description: SensorEntityDescription,
+        entry,
+        pack_index: int,
+    ) -> None:
+        """Initialize a ZendureLocalPackIndicatorSensor."""
+        # Strip the "pack_" prefix to get the indicator name
+        self._indicator = description.key[len("pack_") :]
+        super().__init__(coordinator, description, entry, pack_index)
+
+    def _update_native_value(self) -> None:
+        data = self.coordinator.data
+        pack_data = data.get("packData", []) if data else []
+        if len(pack_data) <= self._pack_index:
             self._attr_native_value = None
+            return
+        indicators = self.coordinator.pack_indicators.get(
+            pack_key(pack_data[self._pack_index], self._pack_index), {}
+        )
+        self._attr_native_value = indicators.get(self._indicator)
+
+
+class ZendureSiteSensor(CoordinatorEntity[ZendureSiteSampler], SensorEntity):
+    """Representation of a flow of a site, derived from an aligned sample."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        sampler: ZendureSiteSampler,
+        description: SensorEntityDescription,
+        entry,
+    ) -> None:
+        """Initialize a ZendureSiteSensor."""
+        super().__init__(sampler)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"site_{entry.entry_id}")},
+            name=entry.title,
+            manufacturer="Zendure",
+            model="Site",
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the flow from the last sample."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data.as_dict()[self.entity_description.key]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return which hubs were missing from the sample."""
+        sample = self.coordinator.data
+        if sample is None or self.entity_description.key != "sampleSkew":
+            return None
+        return {
+            "hubs": {
+                reading.title: reading.fetched_at is not None
+                for reading in sample.hubs.values()
+            },
+            "missing": sample.missing,
+        }
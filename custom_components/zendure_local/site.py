@@ -0,0 +1,258 @@
+"""Phase-aligned sampling of the hubs and grid meter of a site."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_HUBS, CONF_METER_ENTITY, DOMAIN, SCAN_INTERVAL
+from .coordinator import ZendureCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Power of a meter reported in kW is converted to W
+METER_SCALE = {UnitOfPower.WATT: 1.0, UnitOfPower.KILO_WATT: 1000.0}
+
+
+def is_site_entry(entry: ConfigEntry) -> bool:
+    """Return whether an entry is a site of hubs instead of a hub."""
+    return CONF_HUBS in entry.data
+
+
+@dataclass
+class HubReading:
+    """What a hub reported in a site sample."""
+
+    title: str
+    # UTC timestamp of the response, None when the poll failed
+    fetched_at: float | None
+    home_power: int | None = None
+    grid_input_power: int | None = None
+    solar_power: int | None = None
+
+    @classmethod
+    def from_report(
+        cls, title: str, fetched_at: float | None, data: dict[str, Any] | None
+    ) -> HubReading:
+        """Read the power flows of a report."""
+        properties = (data or {}).get("properties") or {}
+
+        def power(key: str) -> int | None:
+            value = properties.get(key)
+            return int(value) if isinstance(value, (int, float)) else None
+
+        return cls(
+            title,
+            fetched_at if properties else None,
+            power("outputHomePower"),
+            power("gridInputPower"),
+            power("solarInputPower"),
+        )
+
+
+@dataclass
+class SiteSample:
+    """The hubs and the grid meter of a site sampled at the same moment.
+
+    The meter reports grid power, positive while importing and negative while
+    exporting. The hubs feed the house with outputHomePower and charge from
+    it with gridInputPower, so the house consumes
+    meter + outputHomePower - gridInputPower.
+    """
+
+    hubs: dict[str, HubReading] = field(default_factory=dict)
+    meter_power: float | None = None
+    # UTC timestamp of the meter state, None without a meter
+    meter_at: float | None = None
+    # Hub entries of the site that are not loaded
+    missing: list[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """Return whether every hub and the meter were read."""
+        return (
+            not self.missing
+            and self.meter_power is not None
+            and all(
+                hub.fetched_at is not None and hub.home_power is not None
+                for hub in self.hubs.values()
+            )
+        )
+
+    def _total(self, attribute: str) -> int | None:
+        values = [getattr(hub, attribute) for hub in self.hubs.values()]
+        if not values or None in values:
+            return None
+        return sum(values)
+
+    @property
+    def hub_output(self) -> int | None:
+        """Return the power all hubs feed into the house."""
+        return self._total("home_power")
+
+    @property
+    def solar_power(self) -> int | None:
+        """Return the solar input power of all hubs."""
+        return self._total("solar_power")
+
+    @property
+    def house_load(self) -> float | None:
+        """Return the power consumed in the house."""
+        if not self.complete:
+            return None
+        charging = self._total("grid_input_power") or 0
+        return max(self.meter_power + self.hub_output - charging, 0.0)
+
+    @property
+    def export(self) -> float | None:
+        """Return the power fed into the grid."""
+        if self.meter_power is None:
+            return None
+        return max(-self.meter_power, 0.0)
+
+    @property
+    def self_consumption(self) -> float | None:
+        """Return the part of the hub output that is consumed in the house."""
+        if not self.complete:
+            return None
+        return max(min(self.hub_output, self.house_load), 0.0)
+
+    @property
+    def skew(self) -> float | None:
+        """Return the seconds between the first and the last reading."""
+        moments = [
+            hub.fetched_at for hub in self.hubs.values() if hub.fetched_at is not None
+        ]
+        if self.meter_at is not None:
+            moments.append(self.meter_at)
+        if len(moments) < 2:
+            return None
+        return round(max(moments) - min(moments), 3)
+
+    def as_dict(self) -> dict[str, float | None]:
+        """Return the derived flows of the sample."""
+        return {
+            "houseLoad": self.house_load,
+            "selfConsumption": self.self_consumption,
+            "export": self.export,
+            "hubOutput": self.hub_output,
+            "siteSolarPower": self.solar_power,
+            "sampleSkew": self.skew,
+        }
+
+
+class ZendureSiteSampler(DataUpdateCoordinator[SiteSample]):
+    """Poll every hub of a site and read its meter at the same instant.
+
+    Hub coordinators poll on their own timers, which drift apart by up to an
+    interval. The sampler refreshes all hubs of the site concurrently and
+    asks the meter for a fresh reading at the same moment. While the site is
+    loaded its hubs are only polled by the sampler, their own timers are
+    suspended until async_release_hubs. The sampler polls at the shortest
+    interval the polling options of its hubs ask for, so an active hub keeps
+    the site at its minimum interval and quiet hubs back off together.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the sampler of a site entry."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} site {entry.title}",
+            update_interval=SCAN_INTERVAL,
+        )
+        self.hub_entry_ids: list[str] = list(entry.data[CONF_HUBS])
+        self.meter_entity: str | None = entry.data.get(CONF_METER_ENTITY)
+
+    def hub_coordinators(self) -> dict[str, ZendureCoordinator]:
+        """Return the coordinators of the loaded hubs of the site.
+
+        Looked up on every sample, a reloaded hub has a new coordinator.
+        """
+        coordinators = {}
+        for entry_id in self.hub_entry_ids:
+            entry = self.hass.config_entries.async_get_entry(entry_id)
+            if entry is not None and entry.state is ConfigEntryState.LOADED:
+                coordinators[entry_id] = entry.runtime_data.coordinator
+        return coordinators
+
+    @callback
+    def async_release_hubs(self) -> None:
+        """Let the hubs of the site poll on their own timers again."""
+        for coordinator in self.hub_coordinators().values():
+            coordinator.async_set_site_owned(False)
+
+    async def _async_update_data(self) -> SiteSample:
+        """Sample all hubs and the meter at the same instant."""
+        coordinators = self.hub_coordinators()
+        for coordinator in coordinators.values():
+            # A reloaded hub comes back with a timer of its own
+            coordinator.async_set_site_owned(True)
+        await asyncio.gather(
+            self._async_update_meter(),
+            *(coordinator.async_refresh() for coordinator in coordinators.values()),
+        )
+        self.update_interval = min(
+            (
+                coordinator.site_interval
+                for coordinator in coordinators.values()
+                if coordinator.site_interval is not None
+            ),
+            default=SCAN_INTERVAL,
+        )
+        sample = SiteSample(
+            missing=[
+                entry_id
+                for entry_id in self.hub_entry_ids
+                if entry_id not in coordinators
+            ]
+        )
+        for entry_id, coordinator in coordinators.items():
+            entry = self.hass.config_entries.async_get_entry(entry_id)
+            sample.hubs[entry_id] = HubReading.from_report(
+                entry.title if entry else entry_id,
+                coordinator.fetched_at,
+                coordinator.data,
+            )
+        sample.meter_power, sample.meter_at = self._meter_reading()
+        if sample.skew is not None:
+            _LOGGER.debug("Sampled %s with a skew of %s s", self.name, sample.skew)
+        return sample
+
+    async def _async_update_meter(self) -> None:
+        """Ask a polled meter for a fresh reading."""
+        if self.meter_entity is None:
+            return
+        try:
+            await self.hass.services.async_call(
+                "homeassistant",
+                "update_entity",
+                {"entity_id": self.meter_entity},
+                blocking=True,
+            )
+        except HomeAssistantError as err:
+            # Push based meters are fresh already
+            _LOGGER.debug("Cannot update %s: %s", self.meter_entity, err)
+
+    def _meter_reading(self) -> tuple[float | None, float | None]:
+        """Return the meter power in W and the moment it was reported."""
+        if self.meter_entity is None:
+            return None, None
+        state = self.hass.states.get(self.meter_entity)
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return None, None
+        scale = METER_SCALE.get(state.attributes.get("unit_of_measurement"), 1.0)
+        try:
+            power = float(state.state) * scale
+        except ValueError:
+            return None, None
+        return power, dt_util.as_timestamp(state.last_reported)
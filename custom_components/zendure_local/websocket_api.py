@@ -0,0 +1,212 @@
+"""Websocket API streaming decoded hub snapshots to the frontend."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
+
+from .const import DOMAIN
+from .coordinator import ZendureCoordinator
+from .sensor import decode_snapshot
+from .site import is_site_entry
+
+SUBSCRIBE = f"{DOMAIN}/subscribe"
+
+# A selection of fields, None selects all
+Fields = tuple[str, ...] | None
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+def select_fields(snapshot: dict[str, Any], fields: Fields) -> dict[str, Any]:
+    """Return the timestamp and the selected hub and pack fields of a snapshot."""
+    hub = snapshot.get("hub", {})
+    packs = snapshot.get("packs", [])
+    if fields is not None:
+        hub = {key: value for key, value in hub.items() if key in fields}
+        packs = [
+            {key: value for key, value in pack.items() if key in fields or key == "sn"}
+            for pack in packs
+        ]
+    return {"timestamp": snapshot.get("timestamp"), "hub": hub, "packs": packs}
+
+
+def changed_fields(new: dict[str, Any], old: dict[str, Any]) -> dict[str, Any]:
+    """Return the fields of a selected snapshot that differ from an older one.
+
+    Packs are compared by position, all pack fields are sent when the number
+    of packs changed.
+    """
+    missing = object()
+    hub = {
+        key: value
+        for key, value in new["hub"].items()
+        if old["hub"].get(key, missing) != value
+    }
+    packs = new["packs"]
+    if len(packs) == len(old["packs"]):
+        packs = [
+            {
+                key: value
+                for key, value in pack.items()
+                if key == "sn" or old_pack.get(key, missing) != value
+            }
+            for pack, old_pack in zip(packs, old["packs"])
+        ]
+    return {"timestamp": new["timestamp"], "hub": hub, "packs": packs}
+
+
+@dataclass(eq=False)
+class Subscriber:
+    """A websocket subscription to the snapshots of one hub."""
+
+    connection: websocket_api.ActiveConnection
+    msg_id: int
+    fields: Fields = None
+    # Minimum seconds between two messages
+    interval: float = 0.0
+    changed_only: bool = False
+    sent_at: float = field(default=float("-inf"))
+    # Selected snapshot of the last message, the base of the next diff
+    last: dict[str, Any] | None = None
+
+
+class SnapshotStream:
+    """Push the decoded snapshot of a hub to its websocket subscribers.
+
+    The snapshot is decoded once per poll. Messages are serialized once per
+    poll for every distinct field selection and diff base, so subscribers
+    asking for the same data share the same bytes.
+    """
+
+    def __init__(self, coordinator: ZendureCoordinator) -> None:
+        """Initialize the stream."""
+        self.coordinator = coordinator
+        self.serialized = 0
+        self._subscribers: list[Subscriber] = []
+        self._unsub_coordinator: CALLBACK_TYPE | None = None
+        self._snapshot: dict[str, Any] | None = None
+        self._selected: dict[Fields, dict[str, Any]] = {}
+        self._messages: dict[tuple[Fields, int | None], bytes] = {}
+
+    @callback
+    def async_add_subscriber(self, subscriber: Subscriber) -> CALLBACK_TYPE:
+        """Add a subscriber and send it the current snapshot."""
+        if self._unsub_coordinator is None:
+            self._unsub_coordinator = self.coordinator.async_add_listener(
+                self._async_handle_update
+            )
+        self._subscribers.append(subscriber)
+        self.async_send(subscriber, time.monotonic())
+
+        @callback
+        def remove_subscriber() -> None:
+            self._subscribers.remove(subscriber)
+            if not self._subscribers and self._unsub_coordinator is not None:
+                self._unsub_coordinator()
+                self._unsub_coordinator = None
+                self._reset()
+
+        return remove_subscriber
+
+    def _reset(self) -> None:
+        self._snapshot = None
+        self._selected.clear()
+        self._messages.clear()
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Send the new snapshot to every subscriber not being throttled."""
+        self._reset()
+        now = time.monotonic()
+        for subscriber in list(self._subscribers):
+            if now - subscriber.sent_at >= subscriber.interval:
+                self.async_send(subscriber, now)
+
+    def _selection(self, fields: Fields) -> dict[str, Any]:
+        if self._snapshot is None:
+            self._snapshot = dict(
+                decode_snapshot(self.coordinator),
+                timestamp=(self.coordinator.data or {}).get("timestamp"),
+            )
+        if fields not in self._selected:
+            self._selected[fields] = select_fields(self._snapshot, fields)
+        return self._selected[fields]
+
+    @callback
+    def async_send(self, subscriber: Subscriber, now: float) -> None:
+        """Send the current snapshot, or the changes since its last message."""
+        selected = self._selection(subscriber.fields)
+        base = subscriber.last if subscriber.changed_only else None
+        # Selections are kept alive by the subscribers, so their ids are unique
+        key = (subscriber.fields, None if base is None else id(base))
+        if key not in self._messages:
+            event = selected if base is None else changed_fields(selected, base)
+            # Leave out the closing brace, the id of the subscription follows
+            self._messages[key] = json_bytes({"type": "event", "event": event})[:-1]
+            self.serialized += 1
+        subscriber.connection.send_message(
+            b"".join(
+                (self._messages[key], b',"id":', str(subscriber.msg_id).encode(), b"}")
+            )
+        )
+        subscriber.last = selected
+        subscriber.sent_at = now
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): SUBSCRIBE,
+        vol.Required("entry_id"): str,
+        vol.Optional("fields"): [str],
+        vol.Optional("interval", default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional("changed_only", default=False): bool,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to the decoded snapshots of a hub."""
+    entry = hass.config_entries.async_get_entry(msg["entry_id"])
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.state is not ConfigEntryState.LOADED
+        or is_site_entry(entry)
+    ):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Zendure hub not found"
+        )
+        return
+    runtime_data = entry.runtime_data
+    if runtime_data.stream is None:
+        runtime_data.stream = SnapshotStream(runtime_data.coordinator)
+    fields = msg.get("fields")
+    subscriber = Subscriber(
+        connection,
+        msg["id"],
+        tuple(sorted(set(fields))) if fields is not None else None,
+        msg["interval"],
+        msg["changed_only"],
+    )
+    connection.send_result(msg["id"])
+    connection.subscriptions[msg["id"]] = runtime_data.stream.async_add_subscriber(
+        subscriber
+    )
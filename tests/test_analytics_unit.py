@@ -0,0 +1,93 @@
+"""Unit tests for the battery health analytics engine."""
+
+import json
+import statistics
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.analytics import (
+    HISTORY_DAYS,
+    SECONDS_PER_DAY,
+    PackHealthTracker,
+    RunningStats,
+)
+
+
+def test_running_stats_matches_statistics_module():
+    """Test Welford statistics against the standard library."""
+    values = [10.0, 12.0, 9.0, 30.0, 10.0, 11.5]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == len(values)
+    assert abs(stats.mean - statistics.mean(values)) < 1e-9
+    assert abs(stats.variance - statistics.variance(values)) < 1e-9
+
+
+def test_running_stats_single_sample_has_no_variance():
+    """Test that variance is undefined for a single sample."""
+    stats = RunningStats()
+    stats.add(5.0)
+    assert stats.variance is None
+    assert stats.stddev is None
+
+
+def test_tracker_imbalance_and_high_temperature():
+    """Test imbalance statistics and time at high temperature."""
+    tracker = PackHealthTracker()
+    # 46.0 C is above the high temperature threshold
+    hot_pack = {"sn": "A", "maxVol": 335, "minVol": 330, "maxTemp": 3191}
+    for step in range(4):
+        tracker.update([hot_pack], 1000.0 + step * 60)
+
+    indicators = tracker.indicators("A")
+    assert indicators["cell_imbalance_mean"] == 50.0
+    assert indicators["temp_mean"] == 46.0
+    # Three intervals of 60 seconds at high temperature
+    assert indicators["high_temp_time"] == round(180 / 3600, 2)
+
+
+def test_tracker_does_not_count_gaps():
+    """Test that long gaps between samples are not counted as high temperature."""
+    tracker = PackHealthTracker()
+    hot_pack = {"sn": "A", "maxTemp": 3191}
+    tracker.update([hot_pack], 0.0)
+    tracker.update([hot_pack], 3600.0)
+    assert tracker.indicators("A")["high_temp_time"] == 0.0
+
+
+def test_tracker_imbalance_trend_is_bounded():
+    """Test the daily imbalance trend and that history stays bounded."""
+    tracker = PackHealthTracker()
+    for day in range(HISTORY_DAYS + 10):
+        # Spread grows by 10 mV per day
+        pack = {"sn": "A", "maxVol": 330 + day, "minVol": 330}
+        tracker.update([pack], day * SECONDS_PER_DAY + 10)
+
+    assert tracker.indicators("A")["cell_imbalance_trend"] == 10.0
+    assert len(tracker.packs["A"].daily_spread) == HISTORY_DAYS
+
+
+def test_tracker_roundtrip_through_json():
+    """Test that persisted state restores the same indicators."""
+    tracker = PackHealthTracker()
+    for step in range(10):
+        pack = {"sn": "A", "maxVol": 335, "minVol": 330 + step % 3, "maxTemp": 3000}
+        tracker.update([pack], step * 3600.0)
+
+    restored = PackHealthTracker()
+    restored.load(json.loads(json.dumps(tracker.as_dict())))
+    assert restored.indicators("A") == tracker.indicators("A")
+
+
+def test_tracker_forgets_removed_packs():
+    """Test that packs unseen for longer than the history window are dropped."""
+    tracker = PackHealthTracker()
+    tracker.update([{"sn": "A", "maxTemp": 3000}], 0.0)
+    tracker.update([{"sn": "B", "maxTemp": 3000}], (HISTORY_DAYS + 1) * SECONDS_PER_DAY)
+    assert "A" not in tracker.packs
+    assert tracker.indicators("A") == {}
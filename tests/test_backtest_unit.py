@@ -0,0 +1,141 @@
+"""Unit tests for the offline strategy backtesting engine."""
+
+import gzip
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.backtest import (
+    Trace,
+    bounded_cumsum,
+    cheapest_hours,
+    idle,
+    load_trace,
+    price_series,
+    run_backtest,
+    zero_export,
+)
+from custom_components.zendure_local.battery import BatteryLimits
+from custom_components.zendure_local.forecast import PriceSlot
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+LIMITS = BatteryLimits(
+    capacity_wh=2000.0,
+    min_soc=10.0,
+    max_soc=90.0,
+    max_charge_power=800.0,
+    max_discharge_power=800.0,
+)
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_trace(solar, load, step=60.0, soc=50):
+    """Build a trace with a sample every step seconds."""
+    count = len(solar)
+    return Trace(
+        time=START.timestamp() + np.arange(count) * step,
+        solar=np.asarray(solar, dtype=float),
+        load=np.asarray(load, dtype=float),
+        first_report={"properties": {"electricLevel": soc}},
+    )
+
+
+def test_bounded_cumsum_matches_loop():
+    """Test the prefix scan against a step by step saturating sum."""
+    rng = np.random.default_rng(1)
+    deltas = rng.normal(0, 30, 1000)
+    expected = []
+    value = 50.0
+    for delta in deltas:
+        value = min(100.0, max(0.0, value + delta))
+        expected.append(value)
+    assert np.allclose(bounded_cumsum(deltas, 50.0, 0.0, 100.0), expected)
+
+
+def test_load_trace_gzip(tmp_path):
+    """Test loading a gzipped JSON lines trace with a meter report."""
+    report = load_fixture("sample_response.json")
+    path = tmp_path / "trace.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for index in range(3):
+            line = dict(report, timestamp=report["timestamp"] + 10 * index)
+            line["meter"] = {"total_power": 100}
+            file.write(json.dumps(line) + "\n")
+        file.write("\n")
+
+    trace = load_trace(path)
+    assert list(trace.time - trace.time[0]) == [0, 10, 20]
+    assert list(trace.solar) == [123] * 3
+    # Meter import plus hub output minus hub charging from the grid
+    assert list(trace.load) == [899] * 3
+    assert np.allclose(trace.hours, 10 / 3600)
+
+
+def test_zero_export_covers_load_until_empty():
+    """Test that zero export stores surplus and never exports while not full."""
+    hours = 6
+    trace = make_trace([0] * 60 * hours, [400] * 60 * hours)
+    slots = [PriceSlot(START, START + timedelta(hours=hours), 0.25)]
+
+    baseline = run_backtest(trace, idle, slots, LIMITS)
+    result = run_backtest(trace, zero_export, slots, LIMITS)
+
+    assert abs(baseline.grid_import_kwh - 2.4) < 1e-9
+    # 40 % of 2 kWh above minSoc, less discharge losses
+    assert abs(result.grid_import_kwh - (2.4 - 0.8 * 0.95)) < 0.01
+    assert result.grid_export_kwh < 1e-9
+    assert result.final_soc == LIMITS.min_soc
+    assert abs(result.cycles - 0.4) < 0.01
+    assert result.cost < baseline.cost
+
+
+def test_cheapest_hours_strategy_charges_in_cheap_window():
+    """Test that cheapest hours charges at low and discharges at high prices."""
+    prices = [0.10, 0.10, 0.40, 0.40]
+    slots = [
+        PriceSlot(START + timedelta(hours=i), START + timedelta(hours=i + 1), price)
+        for i, price in enumerate(prices)
+    ]
+    trace = make_trace([0] * 240, [0] * 240, soc=10)
+    strategy = cheapest_hours(charge_hours=1, discharge_hours=1)
+    request = strategy(trace, slots, LIMITS)
+    assert (request[:60] == 800).all()
+    assert (request[60:120] == 0).all()
+    assert (request[120:180] == -800).all()
+
+    result = run_backtest(trace, strategy, slots, LIMITS)
+    assert result.grid_import_kwh > 0
+    assert result.grid_export_kwh > 0
+    assert result.cost < 0
+
+
+def test_price_series_uses_nearest_slot():
+    """Test mapping sample times onto price slots."""
+    slots = [
+        PriceSlot(START, START + timedelta(hours=1), 1.0),
+        PriceSlot(START + timedelta(hours=1), START + timedelta(hours=2), 2.0),
+    ]
+    times = START.timestamp() + np.array([-60, 0, 3599, 3600, 9000])
+    assert list(price_series(times, slots)) == [1.0, 1.0, 1.0, 2.0, 2.0]
+    assert list(price_series(times, [])) == [0.0] * 5
+
+
+def test_limits_default_to_first_report():
+    """Test that the battery limits come from the first report of the trace."""
+    trace = make_trace([0] * 10, [100] * 10)
+    trace.first_report = load_fixture("sample_response.json")
+    result = run_backtest(trace, zero_export, [])
+    assert result.cost == 0
+    assert result.grid_import_kwh < 1e-9
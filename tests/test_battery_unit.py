@@ -0,0 +1,71 @@
+"""Unit tests for battery pack decoding and aggregation."""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.battery import (
+    compute_pack_aggregates,
+    decode_batcur,
+    decode_temperature,
+)
+
+
+def load_fixture(filename):
+    """Load fixture data."""
+    path = Path(__file__).parent / "fixtures" / filename
+    with path.open(encoding="utf-8") as file:
+        return json.loads(file.read())
+
+
+def test_decode_temperature():
+    """Test conversion from Kelvin * 10 to Celsius."""
+    assert decode_temperature(3091) == 36.0
+    assert decode_temperature(2731) == 0.0
+
+
+def test_decode_batcur():
+    """Test that batcur is decoded as a signed 16-bit value in 0.1 A."""
+    assert decode_batcur(65387) == -14.9
+    assert decode_batcur(99) == 9.9
+    # Upper 16 bits are sign extension and must be ignored
+    assert decode_batcur(0xFFFFFF6B) == -14.9
+
+
+def test_compute_pack_aggregates():
+    """Test aggregates over the packs in the sample response."""
+    sample_data = load_fixture("sample_response.json")
+    aggregates = compute_pack_aggregates(sample_data["packData"])
+
+    assert aggregates["packSocMin"] == 97
+    assert aggregates["packSocMax"] == 97
+    assert aggregates["packSocMean"] == 97.0
+    assert aggregates["packPowerTotal"] == 881
+    assert aggregates["packTempMax"] == 36.0
+    assert aggregates["packCellSpreadMax"] == 10
+
+
+def test_compute_pack_aggregates_mixed_packs():
+    """Test aggregates with differing and partially reported packs."""
+    packs = [
+        {"socLevel": 40, "power": 100, "maxTemp": 2981, "maxVol": 335, "minVol": 330},
+        {"socLevel": 61, "power": 50, "maxTemp": 3031, "maxVol": 332, "minVol": 331},
+        {"power": 25},
+    ]
+    aggregates = compute_pack_aggregates(packs)
+
+    assert aggregates["packSocMin"] == 40
+    assert aggregates["packSocMax"] == 61
+    assert aggregates["packSocMean"] == 50.5
+    assert aggregates["packPowerTotal"] == 175
+    assert aggregates["packTempMax"] == 30.0
+    assert aggregates["packCellSpreadMax"] == 50
+
+
+def test_compute_pack_aggregates_no_packs():
+    """Test that no packs yields empty aggregates instead of raising."""
+    aggregates = compute_pack_aggregates([])
+    assert all(value is None for value in aggregates.values())
@@ -0,0 +1,103 @@
+"""Unit tests for the queue of writes to an unreachable device."""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.commands import PendingCommands
+from custom_components.zendure_local.coordinator import ZendureCoordinator
+
+
+def test_commands_merge_to_the_final_state():
+    """Test that later commands replace earlier values of a property."""
+    pending = PendingCommands()
+    assert not pending
+    pending.add({"acMode": 1, "inputLimit": 800}, now=0)
+    pending.add({"inputLimit": 0}, now=10)
+    pending.add({"acMode": 2, "outputLimit": 600}, now=20)
+    assert len(pending) == 3
+    assert pending.properties() == {"acMode": 2, "inputLimit": 0, "outputLimit": 600}
+
+    restored = PendingCommands()
+    restored.load(pending.as_dict())
+    assert restored.properties() == pending.properties()
+
+
+def test_commands_expire():
+    """Test dropping properties queued longer than the TTL ago."""
+    pending = PendingCommands(ttl=60)
+    pending.add({"acMode": 1, "inputLimit": 800}, now=0)
+    pending.add({"inputLimit": 400}, now=30)
+    assert pending.expire(now=70) == ["acMode"]
+    assert pending.properties() == {"inputLimit": 400}
+    assert pending.expire(now=90) == ["inputLimit"]
+    assert not pending
+
+
+def test_discard_keeps_newer_values():
+    """Test that a value queued during the write stays queued."""
+    pending = PendingCommands()
+    pending.add({"acMode": 1, "inputLimit": 800}, now=0)
+    written = pending.properties()
+    pending.add({"inputLimit": 600}, now=1)
+    pending.discard(written)
+    assert pending.properties() == {"inputLimit": 600}
+
+
+def test_unreachable_device_gets_one_write_when_back():
+    """Test queueing writes while offline and replaying them in one request."""
+    coordinator = ZendureCoordinator(MagicMock(), "http://10.0.0.5/properties/report")
+    coordinator.data = {"sn": "HUB"}
+    post = AsyncMock(return_value=False)
+
+    async def run():
+        with patch.object(coordinator, "_async_post", post):
+            assert not await coordinator.async_write_properties(
+                {"acMode": 1, "inputLimit": 800}
+            )
+            # Queued behind the first write, no request is made
+            assert not await coordinator.async_write_properties({"inputLimit": 0})
+            assert post.await_count == 1
+            assert not await coordinator.async_write_properties(
+                {"acMode": 2, "outputLimit": 600}
+            )
+            assert post.await_count == 1
+
+            post.return_value = True
+            with patch.object(
+                coordinator,
+                "_async_fetch_data",
+                AsyncMock(return_value={"sn": "HUB", "timestamp": 1}),
+            ):
+                await coordinator._async_update_data()
+            assert post.await_count == 2
+            assert post.await_args.args == (
+                "HUB",
+                {"acMode": 2, "inputLimit": 0, "outputLimit": 600},
+            )
+            assert not coordinator.pending_commands
+
+            # Back online, writes go out directly again
+            assert await coordinator.async_write_properties({"outputLimit": 0})
+            assert post.await_count == 3
+
+    asyncio.run(run())
+
+
+def test_write_before_the_first_report_is_queued():
+    """Test that a write without a known serial waits for the first report."""
+    coordinator = ZendureCoordinator(MagicMock(), "http://10.0.0.5/properties/report")
+    post = AsyncMock(return_value=True)
+
+    async def run():
+        with patch.object(coordinator, "_async_post", post):
+            assert not await coordinator.async_write_properties({"acMode": 1})
+            assert not post.called
+            await coordinator._async_write_pending({"sn": "HUB"})
+            post.assert_awaited_once_with("HUB", {"acMode": 1})
+
+    asyncio.run(run())
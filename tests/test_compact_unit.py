@@ -0,0 +1,133 @@
+"""Unit tests for the compact sensor mode."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.const import (
+    CONF_APPLIED_SENSORS,
+    CONF_COMPACT,
+    CONF_SENSOR_GROUPS,
+    SENSOR_GROUPS,
+)
+from custom_components.zendure_local.sensor import (
+    ZendureLocalSnapshotSensor,
+    async_setup_entry,
+    decode_snapshot,
+)
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_coordinator(packs=2):
+    """Return a coordinator mock holding the sample report with some packs."""
+    data = load_fixture("sample_response.json")
+    data["packData"] = [dict(data["packData"][0], sn=f"P{i}") for i in range(packs)]
+    coordinator = MagicMock()
+    coordinator.data = data
+    coordinator.pack_aggregates = {"packSocMin": 97}
+    coordinator.hub_estimates = {"estimatedDischargeTime": 120}
+    coordinator.pack_indicators = {"P0": {"estimated_soc": 96.5}}
+    return coordinator
+
+
+def setup_sensors(compact, packs=2):
+    """Return the sensors created for a hub."""
+    entry = MagicMock(entry_id="hub")
+    entry.data = {"name": "Hub"}
+    entry.options = {CONF_COMPACT: compact}
+    entry.runtime_data.coordinator = make_coordinator(packs)
+    entry.runtime_data.scheduler = None
+    add_entities = MagicMock()
+    with patch("custom_components.zendure_local.sensor.er"):
+        asyncio.run(async_setup_entry(MagicMock(), entry, add_entities))
+    return add_entities.call_args[0][0]
+
+
+def test_compact_entity_count_does_not_grow_with_packs():
+    """Test that compact mode creates a few sensors regardless of the packs."""
+    full = len(setup_sensors(False, packs=4))
+    compact = [setup_sensors(True, packs=packs) for packs in (1, 4)]
+    assert len(compact[0]) == len(compact[1]) < 12
+    assert full > 5 * len(compact[1])
+    snapshots = [s for s in compact[1] if isinstance(s, ZendureLocalSnapshotSensor)]
+    assert len(snapshots) == 1
+    assert snapshots[0].unique_id == "hub_snapshot"
+
+
+def removed_sensors(compact, applied, packs, registered, groups=SENSOR_GROUPS):
+    """Return the unique ids removed from the registry by a setup."""
+    entry = MagicMock(entry_id="hub")
+    entry.data = {
+        "name": "Hub",
+        CONF_APPLIED_SENSORS: {
+            "compact": applied,
+            "groups": sorted(SENSOR_GROUPS),
+            "scheduled": False,
+        },
+    }
+    entry.options = {CONF_COMPACT: compact, CONF_SENSOR_GROUPS: list(groups)}
+    entry.runtime_data.coordinator = make_coordinator(packs)
+    entry.runtime_data.scheduler = None
+    hass = MagicMock()
+    with patch("custom_components.zendure_local.sensor.er") as er:
+        er.async_entries_for_config_entry.return_value = [
+            MagicMock(domain="sensor", unique_id=unique_id, entity_id=unique_id)
+            for unique_id in registered
+        ]
+        asyncio.run(async_setup_entry(hass, entry, MagicMock()))
+    removed = {call.args[0] for call in er.async_get().async_remove.call_args_list}
+    if removed:
+        stored = hass.config_entries.async_update_entry.call_args.kwargs["data"]
+        assert stored[CONF_APPLIED_SENSORS]["compact"] is compact
+    return removed
+
+
+def test_option_change_removes_the_sensors_left_out():
+    """Test pruning by key after the options changed, whatever the report holds."""
+    full = {sensor.unique_id for sensor in setup_sensors(False, packs=2)}
+    compact = {sensor.unique_id for sensor in setup_sensors(True, packs=2)}
+    # A restart while the hub reports no packs or one of two keeps them all
+    for packs in (0, 1):
+        assert removed_sensors(False, False, packs, full) == set()
+    assert removed_sensors(True, False, 0, full) == full - compact
+    assert removed_sensors(False, True, 0, full | compact) == {"hub_snapshot"}
+    assert removed_sensors(True, True, 0, full | compact) == set()
+    # Leaving out a group removes its sensors of every pack
+    removed = removed_sensors(False, False, 0, full, groups=["status", "packs"])
+    assert "hub_battery2_pack_soc" not in removed
+    assert "hub_battery2_pack_estimated_soc" in removed
+    assert "hub_packSocMin" in removed
+
+
+def test_decode_snapshot():
+    """Test that the snapshot holds the decoded hub and pack values."""
+    snapshot = decode_snapshot(make_coordinator())
+    hub = snapshot["hub"]
+    assert hub["electricLevel"] == 97
+    assert hub["hyperTmp"] == 48.0
+    assert hub["packSocMin"] == 97
+    assert hub["estimatedDischargeTime"] == 120
+    assert [pack["sn"] for pack in snapshot["packs"]] == ["P0", "P1"]
+    assert snapshot["packs"][0]["current"] == -14.9
+    assert snapshot["packs"][0]["state"] == "discharging"
+    assert snapshot["packs"][0]["estimated_soc"] == 96.5
+    assert "estimated_soc" not in snapshot["packs"][1]
+    json.dumps(snapshot)
+
+
+def test_decode_snapshot_without_data():
+    """Test that there is no snapshot before the first report."""
+    coordinator = make_coordinator()
+    coordinator.data = None
+    assert decode_snapshot(coordinator) == {}
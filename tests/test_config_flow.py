@@ -1,13 +1,16 @@
 """Test the Zendure Local config flow."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME, CONF_RESOURCE
 
 from custom_components.zendure_local.const import DEFAULT_NAME, DEFAULT_RESOURCE, DOMAIN
 
+REPORT = {"sn": "SAMPLE-SERIAL", "product": "solarFlow800", "properties": {}}
+
 
 async def test_config_flow_user_step(hass):
     """Test the user step of the config flow."""
@@ -29,6 +32,9 @@ async def test_config_flow_user_step_success(hass):
     with patch(
         "custom_components.zendure_local.async_setup_entry",
         return_value=True,
+    ), patch(
+        "custom_components.zendure_local.config_flow.async_read_report",
+        return_value=REPORT,
     ):
         result2 = await hass.config_entries.flow.async_configure(
             result["flow_id"],
@@ -66,27 +72,56 @@ async def test_config_flow_default_values(hass):
 
 
 async def test_config_flow_unique_id_already_configured(hass):
-    """Test that duplicate entries are handled correctly."""
-    # Create first entry
-    entry = MagicMock()
-    entry.data = {
-        CONF_NAME: "Existing Zendure",
-        CONF_RESOURCE: "http://solarflow800.lan/properties/report",
-    }
-    hass.config_entries.async_entries = MagicMock(return_value=[entry])
+    """Test that a hub configured under another address is not added twice."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=REPORT["sn"],
+        data={
+            CONF_NAME: "Existing Zendure",
+            CONF_RESOURCE: "http://solarflow800.lan/properties/report",
+        },
+    )
+    entry.add_to_hass(hass)
 
-    # Try to create second entry with same resource
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": config_entries.SOURCE_USER}
     )
 
-    result2 = await hass.config_entries.flow.async_configure(
-        result["flow_id"],
-        {
-            CONF_NAME: "Duplicate Zendure",
-            CONF_RESOURCE: "http://solarflow800.lan/properties/report",
-        },
+    with patch(
+        "custom_components.zendure_local.config_flow.async_read_report",
+        return_value=REPORT,
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_NAME: "Duplicate Zendure",
+                CONF_RESOURCE: "http://192.168.1.20/properties/report",
+            },
+        )
+
+    assert result2["type"] == "abort"
+    assert result2["reason"] == "already_configured"
+    # The entry follows the hub to the address it was added under
+    assert entry.data[CONF_RESOURCE] == "http://192.168.1.20/properties/report"
+
+
+async def test_config_flow_validates_resource(hass):
+    """Test that nothing is saved for an invalid or unreachable resource."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_NAME: "Hub", CONF_RESOURCE: "ftp://hub.lan/"}
     )
+    assert result["type"] == "form"
+    assert result["errors"] == {CONF_RESOURCE: "invalid_url"}
 
-    # Should complete successfully as we don't have unique_id validation implemented
-    assert result2["type"] == "create_entry"
+    with patch(
+        "custom_components.zendure_local.config_flow.async_read_report",
+        return_value=None,
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_NAME: "Hub", CONF_RESOURCE: "192.168.1.20"}
+        )
+    assert result["type"] == "form"
+    assert result["errors"] == {CONF_RESOURCE: "cannot_connect"}
@@ -0,0 +1,127 @@
+"""Unit tests for the Zendure Local data coordinator."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.coordinator import ZendureCoordinator, report_key
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_report_key():
+    """Test that reports are identified by timestamp and message id."""
+    assert report_key({"timestamp": 1, "messageId": 2}) == (1, 2)
+    assert report_key({"messageId": 2}) == (None, 2)
+    assert report_key({}) is None
+
+
+def test_duplicate_reports_are_skipped():
+    """Test that an unchanged report is neither decoded nor published again."""
+    report = load_fixture("sample_response.json")
+    coordinator = ZendureCoordinator(MagicMock(), "http://hub/properties/report")
+    poll_listener = MagicMock()
+    coordinator.async_add_poll_listener(poll_listener)
+
+    async def poll(data):
+        with (
+            patch.object(
+                coordinator, "_async_fetch_data", AsyncMock(return_value=data)
+            ),
+            patch.object(coordinator.pack_health, "update") as decode,
+        ):
+            coordinator.data = await coordinator._async_update_data()
+        return decode.called
+
+    assert asyncio.run(poll(dict(report))) is True
+    first = coordinator.data
+    assert asyncio.run(poll(dict(report))) is False
+    assert coordinator.data is first
+    assert coordinator.duplicate_reports == 1
+    poll_listener.assert_called_once()
+    assert coordinator.data_age is not None
+
+    advanced = dict(report, messageId=report["messageId"] + 1)
+    assert asyncio.run(poll(advanced)) is True
+    assert coordinator.data is advanced
+    assert coordinator.duplicate_reports == 1
+
+
+def test_data_age_from_device_timestamp():
+    """Test the data age as local time minus the device timestamp."""
+    coordinator = ZendureCoordinator(MagicMock(), "http://hub/properties/report")
+    with (
+        patch.object(
+            coordinator,
+            "_async_fetch_data",
+            AsyncMock(return_value={"timestamp": 1000, "messageId": 1}),
+        ),
+        patch(
+            "custom_components.zendure_local.coordinator.dt_util.utcnow",
+            return_value=MagicMock(timestamp=MagicMock(return_value=1012.4)),
+        ),
+    ):
+        asyncio.run(coordinator._async_update_data())
+    assert coordinator.data_age == 12
+
+    with patch.object(coordinator, "_async_fetch_data", AsyncMock(return_value={})):
+        asyncio.run(coordinator._async_update_data())
+    assert coordinator.data_age is None
+
+
+def test_fetch_uses_the_pinned_address():
+    """Test polling the pinned address and resolving again after a failure."""
+    import requests
+
+    hass = MagicMock()
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = run_in_executor
+    stored = []
+    coordinator = ZendureCoordinator(
+        hass,
+        "http://SolarFlow800.lan/properties/report",
+        last_address={"host": "solarflow800.lan", "address": "10.0.0.5"},
+        address_listener=stored.append,
+    )
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"sn": "HUB"}
+
+    async def fetch(get):
+        with (
+            patch("requests.get", get),
+            patch.object(coordinator.host, "async_resolve", AsyncMock()) as resolve,
+        ):
+            resolve.side_effect = (
+                lambda: setattr(coordinator.host, "address", "10.0.0.9") or True
+            )
+            data = await coordinator._async_fetch_data()
+        return data, resolve
+
+    get = MagicMock(return_value=response)
+    data, resolve = asyncio.run(fetch(get))
+    assert data == {"sn": "HUB"}
+    assert not resolve.called
+    assert get.call_args.args == ("http://10.0.0.5/properties/report",)
+    assert get.call_args.kwargs["headers"] == {"Host": "SolarFlow800.lan"}
+
+    data, _ = asyncio.run(fetch(MagicMock(side_effect=requests.ConnectionError())))
+    assert data == {}
+    assert coordinator.host.needs_resolve()
+
+    data, resolve = asyncio.run(fetch(get))
+    assert resolve.called
+    assert get.call_args.args == ("http://10.0.0.9/properties/report",)
+    assert stored == [{"host": "solarflow800.lan", "address": "10.0.0.9"}]
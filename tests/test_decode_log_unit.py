@@ -0,0 +1,130 @@
+"""Unit tests for the deduplicated decode error log."""
+
+import json
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.decode_log import DecodeErrorLog
+from custom_components.zendure_local.sensor import (
+    SENSOR_TYPES,
+    ZendureLocalSensor,
+    build_description,
+    decode_snapshot,
+)
+
+LOGGER = "custom_components.zendure_local.decode_log"
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def warnings(caplog):
+    """Return the warning messages of the decode log."""
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == LOGGER and record.levelno == logging.WARNING
+    ]
+
+
+def test_failure_episode_is_logged_once(caplog):
+    """Test that a failing field is logged once and counted once per report."""
+    log = DecodeErrorLog()
+    error = IndexError("list index out of range")
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        for _ in range(3):
+            log.new_report()
+            # Two entities and the snapshot read the same field
+            for _ in range(3):
+                log.failed("maxTemp", error)
+        assert len(warnings(caplog)) == 1
+        assert log.errors == {"maxTemp": 3}
+        assert log.failing == ["maxTemp"]
+
+        log.new_report()
+        log.decoded("maxTemp", 36.0)
+        assert log.failing == []
+        assert "maxTemp decodes again" in caplog.text
+
+        log.new_report()
+        log.failed("maxTemp", error)
+    assert len(warnings(caplog)) == 2
+    assert log.errors == {"maxTemp": 4}
+
+
+def test_pack_fields_are_tracked_per_pack(caplog):
+    """Test that every pack has its own failure episode."""
+    log = DecodeErrorLog()
+    log.new_report()
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        log.failed("pack.temp", KeyError("maxTemp"), 0)
+        log.failed("pack.temp", KeyError("maxTemp"), 1)
+    assert log.errors == {"pack.temp": 2}
+    assert log.failing == ["pack.temp of pack 1", "pack.temp of pack 2"]
+    assert len(warnings(caplog)) == 2
+
+
+def test_warnings_are_rate_limited(caplog):
+    """Test that new failure episodes beyond the limit are only counted."""
+    log = DecodeErrorLog(max_warnings=2, window=600)
+    log.new_report()
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        for field in ("hyperTmp", "minSoc", "socSet"):
+            log.failed(field, ValueError("bad"))
+    assert len(warnings(caplog)) == 2
+    assert log.suppressed == 1
+    assert sum(log.errors.values()) == 3
+
+
+def test_values_are_traced_only_for_selected_fields(caplog):
+    """Test the opt-in per field debug tracing."""
+    log = DecodeErrorLog(trace_fields=["electricLevel"])
+    with caplog.at_level(logging.DEBUG, logger=LOGGER):
+        log.decoded("electricLevel", 97)
+        log.decoded("solarInputPower", 123)
+    assert [record.getMessage() for record in caplog.records] == [
+        "Decoded electricLevel: 97"
+    ]
+
+
+def test_empty_pack_data_does_not_flood_the_log(caplog):
+    """Test sensors and the snapshot decoding a report without packData."""
+    data = load_fixture("sample_response.json")
+    data["packData"] = []
+    coordinator = MagicMock()
+    coordinator.data = data
+    coordinator.snapshot_cache = None
+    coordinator.pack_aggregates = {}
+    coordinator.hub_estimates = {}
+    coordinator.pack_indicators = {}
+    coordinator.decode_errors = DecodeErrorLog()
+    coordinator.decode_errors.new_report()
+    with caplog.at_level(logging.DEBUG):
+        sensors = [
+            ZendureLocalSensor(
+                coordinator,
+                build_description(key, SENSOR_TYPES[key], key, "extended"),
+                MagicMock(entry_id="hub", data={"name": "Hub"}),
+            )
+            for key in SENSOR_TYPES
+        ]
+        decode_snapshot(coordinator)
+        for _ in range(5):
+            coordinator.decode_errors.new_report()
+            coordinator.snapshot_cache = None
+            for sensor in sensors:
+                sensor._update_native_value()
+            decode_snapshot(coordinator)
+
+    assert coordinator.decode_errors.errors == {"maxTemp": 6}
+    assert len([r for r in caplog.records if r.levelno >= logging.WARNING]) == 1
+    assert not any("Processed value" in r.getMessage() for r in caplog.records)
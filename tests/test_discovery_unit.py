@@ -0,0 +1,95 @@
+"""Unit tests for discovering hubs on the local network."""
+
+import asyncio
+from ipaddress import IPv4Network
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from custom_components.zendure_local.api import (
+    InvalidResource,
+    is_report,
+    normalize_resource,
+)
+from custom_components.zendure_local.discovery import (
+    DiscoveredHub,
+    async_sweep,
+    sweep_networks,
+)
+
+REPORT = {"sn": "HUB1", "product": "solarFlow800", "properties": {}}
+
+
+@pytest.mark.parametrize(
+    ("resource", "expected"),
+    [
+        ("http://hub.lan/properties/report", "http://hub.lan/properties/report"),
+        ("192.168.1.20", "http://192.168.1.20/properties/report"),
+        (" http://hub.lan:8080/ ", "http://hub.lan:8080/properties/report"),
+        (
+            "file:///config/trace.jsonl.gz?speed=10",
+            "file:///config/trace.jsonl.gz?speed=10",
+        ),
+    ],
+)
+def test_normalize_resource(resource, expected):
+    """Test completing host names and IP addresses to report URLs."""
+    assert normalize_resource(resource) == expected
+
+
+@pytest.mark.parametrize(
+    "resource", ["ftp://hub.lan/", "http://", "http://hub.lan:99999/", "file://"]
+)
+def test_normalize_invalid_resource(resource):
+    """Test rejecting URLs that cannot serve a report."""
+    with pytest.raises(InvalidResource):
+        normalize_resource(resource)
+
+
+def test_is_report():
+    """Test recognizing the report of a hub."""
+    assert is_report(REPORT)
+    assert not is_report({"properties": {}})
+    assert not is_report(["not", "a", "report"])
+
+
+def test_sweep_networks():
+    """Test limiting the sweep to the /24 around the local addresses."""
+    networks = sweep_networks(
+        [
+            ("192.168.1.10", 16),
+            ("192.168.1.11", 24),
+            ("10.0.0.5", 28),
+            ("127.0.0.1", 8),
+            ("169.254.3.4", 16),
+            ("fe80::1", 64),
+        ]
+    )
+    assert networks == [IPv4Network("192.168.1.0/24"), IPv4Network("10.0.0.0/28")]
+
+
+def test_sweep_probes_hosts_concurrently():
+    """Test that the sweep takes about one timeout, not one per host."""
+
+    async def read_report(session, url, timeout):
+        await asyncio.sleep(0.05)
+        return REPORT if url.startswith("http://192.168.1.20/") else None
+
+    with patch(
+        "custom_components.zendure_local.discovery.async_read_report", read_report
+    ):
+        started = time.monotonic()
+        hubs = asyncio.run(
+            async_sweep(None, [IPv4Network("192.168.1.0/24")], concurrency=254)
+        )
+        elapsed = time.monotonic() - started
+
+    assert hubs == [DiscoveredHub("192.168.1.20", "solarFlow800", "HUB1")]
+    assert hubs[0].resource == "http://192.168.1.20/properties/report"
+    assert elapsed < 1.0
@@ -0,0 +1,157 @@
+"""Unit tests for the site power dispatcher."""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.dispatcher import (
+    HubCapacity,
+    ZendureDispatcher,
+    allocate,
+    dispatch_properties,
+    needs_write,
+)
+
+
+def report(soc, max_discharge=800, max_charge=800, min_soc=100, soc_set=1000):
+    """Return a report of a hub."""
+    return {
+        "properties": {
+            "electricLevel": soc,
+            "minSoc": min_soc,
+            "socSet": soc_set,
+            "inverseMaxPower": max_discharge,
+            "chargeMaxLimit": max_charge,
+            "packNum": 1,
+        }
+    }
+
+
+def test_capacity_from_report():
+    """Test the SOC headroom and the temperature derating."""
+    hub = HubCapacity.from_report(report(60))
+    assert hub.discharge_weight == 50
+    assert hub.charge_weight == 40
+    assert hub.max_discharge == 800
+
+    hot = HubCapacity.from_report(report(60), temperature=45.0)
+    assert hot.max_discharge == 400
+    assert HubCapacity.from_report(report(60), temperature=55.0).max_charge == 0
+
+    cold = HubCapacity.from_report(report(60), temperature=-2.0)
+    assert cold.charge_weight == 0
+    assert cold.discharge_weight == 50
+
+    assert HubCapacity.from_report({}) is None
+    assert HubCapacity.from_report({"properties": {"electricLevel": 50}}) is None
+
+
+def test_allocate_by_soc_headroom():
+    """Test that fuller hubs discharge more and emptier hubs charge more."""
+    hubs = {
+        "full": HubCapacity.from_report(report(90)),
+        "half": HubCapacity.from_report(report(50)),
+    }
+    # Headroom above 10 %: 80 and 40
+    assert allocate(600, hubs) == {"full": 400, "half": 200}
+    # Headroom below 100 %: 10 and 50
+    assert allocate(-600, hubs) == {"full": -100, "half": -500}
+    assert allocate(0, hubs) == {"full": 0, "half": 0}
+
+
+def test_allocate_redistributes_above_the_ceiling():
+    """Test that a capped hub leaves the rest of the setpoint to the others."""
+    hubs = {
+        "small": HubCapacity.from_report(report(90, max_discharge=300)),
+        "large": HubCapacity.from_report(report(50)),
+        "empty": HubCapacity.from_report(report(10)),
+    }
+    shares = allocate(900, hubs)
+    assert shares == {"small": 300, "large": 600, "empty": 0}
+    # More than all hubs can deliver is capped
+    assert allocate(5000, hubs) == {"small": 300, "large": 800, "empty": 0}
+
+
+def test_writes():
+    """Test the properties written and the change threshold."""
+    assert dispatch_properties(None, 300) == {
+        "acMode": 2,
+        "outputLimit": 300,
+        "inputLimit": 0,
+    }
+    assert dispatch_properties(200, 300) == {"acMode": 2, "outputLimit": 300}
+    assert dispatch_properties(300, -200) == {
+        "acMode": 1,
+        "inputLimit": 200,
+        "outputLimit": 0,
+    }
+    assert dispatch_properties(-200, 0) == {"inputLimit": 0}
+
+    assert needs_write(None, 0, 25)
+    assert not needs_write(300, 300, 25)
+    assert not needs_write(300, 320, 25)
+    assert needs_write(300, 325, 25)
+    assert needs_write(10, 0, 25)
+    assert needs_write(10, -10, 25)
+
+
+def test_dispatch_writes_changed_hubs_concurrently():
+    """Test dispatching to the hubs whose share changed."""
+    coordinators = {}
+    for entry_id, soc in (("a", 90), ("b", 50)):
+        coordinator = MagicMock(data=report(soc), pack_aggregates={})
+        coordinator.async_write_properties = AsyncMock(return_value=True)
+        coordinators[entry_id] = coordinator
+    sampler = MagicMock()
+    sampler.hub_coordinators.return_value = coordinators
+    dispatcher = ZendureDispatcher(MagicMock(), sampler)
+
+    asyncio.run(dispatcher.async_set_setpoint(600))
+    assert dispatcher.allocations == {"a": 400, "b": 200}
+    coordinators["a"].async_write_properties.assert_awaited_once_with(
+        {"acMode": 2, "outputLimit": 400, "inputLimit": 0}
+    )
+
+    # A small SOC change is not worth a write
+    coordinators["b"].data = report(52)
+    asyncio.run(dispatcher.async_dispatch())
+    assert coordinators["a"].async_write_properties.await_count == 1
+    assert coordinators["b"].async_write_properties.await_count == 1
+
+    # A rejected write is retried in full
+    coordinators["b"].async_write_properties.return_value = False
+    asyncio.run(dispatcher.async_set_setpoint(900))
+    assert "b" not in dispatcher.allocations
+    # Headroom 80 and 42
+    assert dispatcher.allocations["a"] == 590
+
+
+def test_dispatch_stops_hubs_without_a_report():
+    """Test that a hub dropping out is stopped instead of keeping its share."""
+    coordinators = {}
+    for entry_id in ("a", "b"):
+        coordinator = MagicMock(data=report(90), pack_aggregates={})
+        coordinator.async_write_properties = AsyncMock(return_value=True)
+        coordinators[entry_id] = coordinator
+    sampler = MagicMock()
+    sampler.hub_coordinators.return_value = coordinators
+    dispatcher = ZendureDispatcher(MagicMock(), sampler)
+    asyncio.run(dispatcher.async_set_setpoint(600))
+    assert dispatcher.allocations == {"a": 300, "b": 300}
+
+    coordinators["b"].data = {}
+    asyncio.run(dispatcher.async_dispatch())
+    assert dispatcher.allocations == {"a": 600, "b": 0}
+    coordinators["b"].async_write_properties.assert_awaited_with({"outputLimit": 0})
+    # Stopped once, not again on every sample
+    asyncio.run(dispatcher.async_dispatch())
+    assert coordinators["b"].async_write_properties.await_count == 2
+
+    # A hub that is no longer loaded cannot be written, its share is forgotten
+    del coordinators["b"]
+    asyncio.run(dispatcher.async_dispatch())
+    assert dispatcher.allocations == {"a": 600}
@@ -0,0 +1,156 @@
+"""Unit tests for the per-pack coulomb counting estimator."""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.estimators import (
+    DEFAULT_PACK_CAPACITY_AH,
+    NOMINAL_PACK_VOLTAGE,
+    CoulombEstimator,
+    RuntimeEstimator,
+    decode_remain_out_time,
+)
+
+
+def pack(current_deciamps, soc, total_vol=5000):
+    """Build a pack sample with batcur encoded like the firmware does."""
+    return {
+        "sn": "A",
+        "batcur": current_deciamps & 0xFFFFFFFF,
+        "totalVol": total_vol,
+        "socLevel": soc,
+    }
+
+
+def test_integrates_charge_and_energy():
+    """Test trapezoidal integration of charge and energy throughput."""
+    estimator = CoulombEstimator()
+    # 10 A at 50 V for one hour in 60 second steps
+    for step in range(61):
+        estimator.update([pack(100, 50)], step * 60.0)
+
+    indicators = estimator.indicators("A")
+    assert abs(indicators["charge_throughput"] - 10.0) < 1e-6
+    assert abs(indicators["energy_charged"] - 500.0) < 1e-6
+    assert indicators["energy_discharged"] == 0.0
+
+
+def test_discharge_is_counted_separately():
+    """Test that negative batcur counts as discharge."""
+    estimator = CoulombEstimator()
+    for step in range(61):
+        estimator.update([pack(-50, 50)], step * 60.0)
+
+    indicators = estimator.indicators("A")
+    assert abs(indicators["energy_discharged"] - 250.0) < 1e-6
+    assert indicators["energy_charged"] == 0.0
+
+
+def test_gaps_are_not_integrated():
+    """Test that long gaps between samples are skipped."""
+    estimator = CoulombEstimator()
+    estimator.update([pack(100, 50)], 0.0)
+    estimator.update([pack(100, 50)], 7200.0)
+    assert estimator.indicators("A")["charge_throughput"] == 0.0
+
+
+def test_capacity_between_full_and_empty():
+    """Test capacity estimation from a full to empty discharge."""
+    estimator = CoulombEstimator()
+    now = 0.0
+    estimator.update([pack(-200, 100)], now, empty_soc=5)
+    # Discharge at 20 A for 1.8 hours, 36 Ah from 100 % down to 10 %
+    for _ in range(108):
+        now += 60.0
+        estimator.update([pack(-200, 50)], now, empty_soc=5)
+    assert estimator.indicators("A")["estimated_capacity"] is None
+    estimator.update([pack(-200, 10)], now + 0.001, empty_soc=10)
+
+    indicators = estimator.indicators("A")
+    assert abs(indicators["estimated_capacity"] - 40.0) < 0.01
+    assert indicators["estimated_soc"] == 10.0
+    # At the nominal voltage, not the voltage of the last sample
+    capacity = estimator.capacity_wh([pack(0, 10, total_vol=4800)])
+    assert abs(capacity - 40.0 * NOMINAL_PACK_VOLTAGE) < 0.5
+
+
+def test_estimated_soc_tracks_charge_not_soc_level():
+    """Test that the estimated SOC follows integrated charge between events."""
+    estimator = CoulombEstimator()
+    estimator.update([pack(0, 40)], 0.0)
+    # Charge 3.75 Ah, 10 % of the default capacity, while socLevel is stale
+    for step in range(1, 46):
+        estimator.update([pack(50, 40)], step * 60.0)
+
+    expected = 40 + 3.75 / DEFAULT_PACK_CAPACITY_AH * 100
+    assert abs(estimator.indicators("A")["estimated_soc"] - expected) < 0.2
+
+
+def test_roundtrip_through_json():
+    """Test that persisted state restores the same estimates."""
+    estimator = CoulombEstimator()
+    for step in range(10):
+        estimator.update([pack(75, 60)], step * 60.0)
+
+    restored = CoulombEstimator()
+    restored.load(json.loads(json.dumps(estimator.as_dict())))
+    assert restored.indicators("A") == estimator.indicators("A")
+
+
+def test_decode_remain_out_time():
+    """Test that the 999 h 0 m sentinel decodes to None."""
+    assert decode_remain_out_time(324) == 324
+    assert decode_remain_out_time(999 * 60) is None
+    assert decode_remain_out_time(999 * 60 + 1) == 999 * 60 + 1
+
+
+def test_energy_window():
+    """Test the energy above the floor and below the ceiling over packs."""
+    estimator = CoulombEstimator()
+    estimator.update([pack(0, 50)], 0.0)
+
+    above, below = estimator.energy_window([pack(0, 50)], floor_soc=10, ceil_soc=100)
+    full_energy = DEFAULT_PACK_CAPACITY_AH * 50.0
+    assert abs(above - full_energy * 0.4) < 1e-6
+    assert abs(below - full_energy * 0.5) < 1e-6
+
+
+def test_energy_window_unknown_pack():
+    """Test that an untracked pack gives no energy window."""
+    estimator = CoulombEstimator()
+    assert estimator.energy_window([pack(0, 50)], 10, 100) is None
+
+
+def test_runtime_estimator_smooths_power():
+    """Test time to empty and time to full from smoothed power."""
+    runtime = RuntimeEstimator(time_constant=300.0)
+    runtime.update(600.0, 0.0)
+    assert runtime.estimate(1200.0, 800.0) == {
+        "estimatedDischargeTime": 120,
+        "estimatedChargeTime": None,
+    }
+
+    # A short spike is damped by the time constant
+    runtime.update(-600.0, 1.0)
+    assert runtime.power > 590
+
+    for step in range(2, 200):
+        runtime.update(-400.0, step * 60.0)
+    assert runtime.estimate(1200.0, 800.0) == {
+        "estimatedDischargeTime": None,
+        "estimatedChargeTime": 120,
+    }
+
+
+def test_runtime_estimator_idle():
+    """Test that no estimate is given while the battery is idle."""
+    runtime = RuntimeEstimator()
+    runtime.update(0.0, 0.0)
+    assert runtime.estimate(1000.0, 1000.0) == {
+        "estimatedDischargeTime": None,
+        "estimatedChargeTime": None,
+    }
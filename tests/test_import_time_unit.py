@@ -0,0 +1,77 @@
+"""Import time of the integration on top of what Home Assistant has loaded."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+PACKAGE = "custom_components.zendure_local"
+# Modules Home Assistant has loaded before it sets up the integration
+PRELOADED = (
+    "requests",
+    "homeassistant.config_entries",
+    "homeassistant.components.http",
+    "homeassistant.components.sensor",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.entity_registry",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+# Platform and config flow, both loaded when Home Assistant sets up the entry
+MEASURED = ("sensor", "config_flow")
+# Modules only loaded for the features that need them
+LAZY_MODULES = (
+    "numpy",
+    "homeassistant.components.button",
+    f"{PACKAGE}.button",
+    f"{PACKAGE}.dispatcher",
+    f"{PACKAGE}.planner",
+    f"{PACKAGE}.rules",
+    f"{PACKAGE}.scheduler",
+)
+# About 45 ms here, the import took 135 ms while it loaded numpy
+MAX_IMPORT_MS = 100
+RUNS = 3
+
+
+def import_times() -> dict[str, int]:
+    """Return the cumulative import time in us of every module newly imported."""
+    code = "; ".join(
+        [
+            *(f"import {module}" for module in PRELOADED),
+            *(f"import {PACKAGE}.{module}" for module in MEASURED),
+        ]
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    preloaded = True
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name == "custom_components":
+            preloaded = False
+        if not preloaded and cumulative.strip().isdigit():
+            times[name] = int(cumulative)
+    return times
+
+
+def test_import_time():
+    """Test that importing the sensor platform and config flow stays lean."""
+    runs = [import_times() for _ in range(RUNS)]
+    for module in LAZY_MODULES:
+        assert module not in runs[0], module
+    fastest = min(times[PACKAGE] for times in runs) / 1000
+    assert fastest < MAX_IMPORT_MS, f"{PACKAGE} took {fastest:.1f} ms to import"
+
+
+if __name__ == "__main__":
+    for name, us in sorted(import_times().items(), key=lambda item: -item[1]):
+        print(f"{us / 1000:8.1f} ms  {name}")
@@ -2,7 +2,7 @@
 
 import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Add the parent directory to sys.path to enable imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -10,6 +10,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pytest
 
 from custom_components.zendure_local import (
+    async_backfill_unique_id,
+    async_migrate_entry,
     async_setup,
     async_setup_entry,
     async_unload_entry,
@@ -58,10 +60,19 @@ async def test_async_setup_entry_basic_structure():
 
     mock_entry = MagicMock()
     mock_entry.data = {"resource": "http://test.example.com", "name": "Test Device"}
+    mock_entry.options = {}
 
     # Test that the function can be called
     try:
-        result = await async_setup_entry(mock_hass, mock_entry)
+        with patch(
+            "custom_components.zendure_local.ZendureCoordinator"
+        ) as mock_coordinator, patch(
+            "custom_components.zendure_local.async_check_rest_resources",
+            MagicMock(),
+        ):
+            mock_coordinator.return_value.async_load_state = AsyncMock()
+            mock_coordinator.return_value.async_config_entry_first_refresh = AsyncMock()
+            result = await async_setup_entry(mock_hass, mock_entry)
         # If it doesn't raise an exception, that's a good sign
         assert isinstance(result, bool)
     except Exception as e:
@@ -105,5 +116,67 @@ def test_integration_structure():
     assert callable(integration.async_unload_entry)
 
 
+def test_backfill_unique_id():
+    """Test that an entry without unique id gets the serial of its hub."""
+    hass = MagicMock()
+    hass.config_entries.async_entry_for_domain_unique_id.return_value = None
+    entry = MagicMock(unique_id=None)
+    async_backfill_unique_id(hass, entry, {"sn": "SAMPLE-SERIAL"})
+    hass.config_entries.async_update_entry.assert_called_once_with(
+        entry, unique_id="SAMPLE-SERIAL"
+    )
+
+    # Not without a report, once set or when another entry has the serial
+    hass.config_entries.async_update_entry.reset_mock()
+    async_backfill_unique_id(hass, entry, None)
+    async_backfill_unique_id(hass, MagicMock(unique_id="OTHER"), {"sn": "SN"})
+    hass.config_entries.async_entry_for_domain_unique_id.return_value = MagicMock()
+    async_backfill_unique_id(hass, entry, {"sn": "SAMPLE-SERIAL"})
+    hass.config_entries.async_update_entry.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_migrate_entry_keys_hubs_by_entry():
+    """Test that unique ids and devices named after the hub move to the entry."""
+    hass = MagicMock()
+    entry = MagicMock(
+        entry_id="e1", version=1, minor_version=1, data={"name": "Solarflow"}
+    )
+    hub_device = MagicMock(
+        id="d1",
+        identifiers={(DOMAIN, "zendure_solarflow")},
+        config_entries={"e1"},
+    )
+    shared_pack = MagicMock(
+        id="d2",
+        identifiers={(DOMAIN, "zendure_pack1")},
+        config_entries={"e1", "e2"},
+    )
+    with patch("custom_components.zendure_local.er") as er, patch(
+        "custom_components.zendure_local.dr"
+    ) as dr:
+        er.async_migrate_entries = AsyncMock()
+        dr.async_entries_for_config_entry.return_value = [hub_device, shared_pack]
+        assert await async_migrate_entry(hass, entry) is True
+    migrate = er.async_migrate_entries.call_args.args[2]
+    assert migrate(MagicMock(unique_id="Solarflow_electricLevel")) == {
+        "new_unique_id": "e1_electricLevel"
+    }
+    assert migrate(MagicMock(unique_id="Solarflow Battery 2_pack_soc")) == {
+        "new_unique_id": "e1_battery2_pack_soc"
+    }
+    assert migrate(MagicMock(unique_id="e1_electricLevel")) is None
+    device_registry = dr.async_get.return_value
+    device_registry.async_update_device.assert_any_call(
+        "d1", new_identifiers={(DOMAIN, "e1")}
+    )
+    device_registry.async_update_device.assert_any_call(
+        "d2", remove_config_entry_id="e1"
+    )
+    hass.config_entries.async_update_entry.assert_called_once_with(
+        entry, minor_version=2
+    )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
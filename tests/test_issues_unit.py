@@ -0,0 +1,79 @@
+"""Unit tests for detecting hubs polled by the rest integration."""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.issues import (
+    async_check_rest_resources,
+    rest_resources,
+    same_hub,
+)
+
+HUB = "http://SolarFlow800.lan/properties/report"
+
+
+def test_rest_resources_of_integration_and_platforms():
+    """Test collecting resources of the rest integration and rest platforms."""
+    config = {
+        "rest": [
+            {"resource": HUB, "sensor": [{"name": "Level"}]},
+            {"resource_template": "{{ url }}"},
+        ],
+        "sensor": [
+            {"platform": "template"},
+            {"platform": "rest", "resource": "http://192.168.1.20/properties/report"},
+        ],
+        "binary_sensor": {"platform": "rest", "resource": "http://other.lan/"},
+    }
+    assert rest_resources(config) == [
+        HUB,
+        "http://192.168.1.20/properties/report",
+        "http://other.lan/",
+    ]
+    assert rest_resources({}) == []
+
+
+def test_same_hub():
+    """Test matching resources by host and port."""
+    assert same_hub("http://solarflow800.lan/properties/report", HUB)
+    assert same_hub("http://SolarFlow800.lan/properties/write", HUB)
+    assert not same_hub("http://SolarFlow800.lan:8080/properties/report", HUB)
+    assert not same_hub("http://192.168.1.20/properties/report", HUB)
+    assert not same_hub("file:///config/trace.jsonl.gz", "file:///config/other")
+
+
+def test_configuration_is_read_once_for_all_entries():
+    """Test that the setup of every hub shares one read of the configuration."""
+    hass = MagicMock()
+    hass.data = {}
+    entries = [
+        MagicMock(entry_id=str(index), title=f"Hub {index}", data={"resource": url})
+        for index, url in enumerate([HUB, "http://192.168.1.20/properties/report", HUB])
+    ]
+
+    async def run():
+        hass.async_create_task = lambda coro, name: asyncio.create_task(coro)
+        await asyncio.gather(
+            *(async_check_rest_resources(hass, entry) for entry in entries)
+        )
+        await async_check_rest_resources(hass, entries[0])
+
+    with patch(
+        "custom_components.zendure_local.issues.async_hass_config_yaml",
+        AsyncMock(return_value={"rest": [{"resource": HUB}]}),
+    ) as read, patch("custom_components.zendure_local.issues.ir") as ir:
+        asyncio.run(run())
+    read.assert_awaited_once()
+    assert [call.args[2] for call in ir.async_create_issue.call_args_list] == [
+        "duplicate_rest_resource_0",
+        "duplicate_rest_resource_2",
+        "duplicate_rest_resource_0",
+    ]
+    ir.async_delete_issue.assert_called_once_with(
+        hass, "zendure_local", "duplicate_rest_resource_1"
+    )
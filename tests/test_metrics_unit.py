@@ -0,0 +1,139 @@
+"""Unit tests for the OpenMetrics exporter."""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.commands import PendingCommands
+from custom_components.zendure_local.decode_log import DecodeErrorLog
+from custom_components.zendure_local.metrics import (
+    ZendureMetricsView,
+    async_register_metrics_view,
+    escape_label,
+    format_value,
+    hub_samples,
+    render,
+)
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_entry(entry_id="e1", title="Hub"):
+    """Return a loaded config entry mock with a polled coordinator."""
+    coordinator = MagicMock()
+    coordinator.data = load_fixture("sample_response.json")
+    coordinator.pack_aggregates = {}
+    coordinator.hub_estimates = {}
+    coordinator.pack_indicators = {}
+    coordinator.last_update_success = True
+    coordinator.polls = 10
+    coordinator.poll_failures = 2
+    coordinator.duplicate_reports = 3
+    coordinator.fetch_latency = 0.25
+    coordinator.decode_duration = None
+    coordinator.data_age = 4
+    coordinator.decode_errors = DecodeErrorLog()
+    coordinator.decode_errors.errors = {"maxTemp": 2}
+    coordinator.pending_commands = PendingCommands()
+    coordinator.pending_commands.add({"acMode": 1, "inputLimit": 800}, now=0)
+    entry = MagicMock()
+    entry.entry_id = entry_id
+    entry.title = title
+    entry.runtime_data.coordinator = coordinator
+    return entry
+
+
+def test_render_hub_metrics():
+    """Test the decoded values, counters and timing of a hub."""
+    text = render([hub_samples("Hub", make_entry().runtime_data.coordinator)])
+    lines = text.splitlines()
+    labels = 'hub="Hub",sn="SAMPLE-SERIAL"'
+    assert f'zendure_hub{{{labels},field="electricLevel"}} 97' in lines
+    assert f'zendure_hub{{{labels},field="hyperTmp"}} 48.0' in lines
+    assert (
+        f'zendure_hub_state{{{labels},field="acMode",value="discharging"}} 1' in lines
+    )
+    assert (
+        f'zendure_pack{{{labels},pack="PACK1-SERIAL",field="current"}} -14.9' in lines
+    )
+    assert f"zendure_polls_total{{{labels}}} 10" in lines
+    assert f"zendure_poll_failures_total{{{labels}}} 2" in lines
+    assert f"zendure_fetch_latency_seconds{{{labels}}} 0.25" in lines
+    assert f'zendure_decode_errors_total{{{labels},field="maxTemp"}} 2' in lines
+    assert f"zendure_up{{{labels}}} 1" in lines
+    assert f"zendure_pending_writes{{{labels}}} 2" in lines
+    assert "# TYPE zendure_polls counter" in lines
+    # No sample for a timing that was not measured yet
+    assert not any(
+        line.startswith("zendure_decode_duration_seconds{") for line in lines
+    )
+    assert lines[-1] == "# EOF"
+
+
+def test_families_are_not_interleaved():
+    """Test that the samples of all hubs are grouped per family."""
+    entries = [make_entry("e1", "A"), make_entry("e2", "B")]
+    text = render(hub_samples(e.title, e.runtime_data.coordinator) for e in entries)
+    families = [
+        line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")
+    ]
+    assert len(families) == len(set(families))
+    polls = [line for line in text.splitlines() if line.startswith("zendure_polls")]
+    assert [line.split('"')[1] for line in polls] == ["A", "B"]
+
+
+def test_metrics_cached_per_poll():
+    """Test that scrapes between polls do not render again."""
+    view = ZendureMetricsView()
+    entries = [make_entry("e1", "A"), make_entry("e2", "B")]
+    with patch(
+        "custom_components.zendure_local.metrics.hub_samples",
+        side_effect=hub_samples,
+    ) as rendered:
+        first = view.metrics(entries)
+        assert view.metrics(entries) is first
+        assert rendered.call_count == 2
+
+        entries[1].runtime_data.coordinator.polls += 1
+        assert view.metrics(entries) is not first
+        # Only the hub that polled is rendered again
+        assert rendered.call_count == 3
+
+        entries[0].runtime_data.coordinator = make_entry().runtime_data.coordinator
+        view.metrics(entries)
+        assert rendered.call_count == 4
+
+
+def test_format_value():
+    """Test sample values, with the OpenMetrics spelling of special floats."""
+    assert format_value(True) == "1"
+    assert format_value(97) == "97"
+    assert format_value(48.0) == "48.0"
+    assert format_value(float("nan")) == "NaN"
+    assert format_value(float("inf")) == "+Inf"
+    assert format_value(float("-inf")) == "-Inf"
+    assert format_value("discharging") is None
+
+
+def test_view_registered_once_when_enabled():
+    """Test that the view is only registered by hubs that export metrics."""
+    hass = MagicMock()
+    hass.data = {}
+    async_register_metrics_view(hass)
+    async_register_metrics_view(hass)
+    hass.http.register_view.assert_called_once()
+    assert isinstance(hass.http.register_view.call_args.args[0], ZendureMetricsView)
+
+
+def test_escape_label():
+    """Test escaping of label values."""
+    assert escape_label('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
@@ -0,0 +1,137 @@
+"""Unit tests for the SOC constrained charge planner."""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.battery import BatteryLimits
+from custom_components.zendure_local.coordinator import ZendureCoordinator
+from custom_components.zendure_local.forecast import PriceSlot
+from custom_components.zendure_local.planner import SocPlanner
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+LIMITS = BatteryLimits(
+    capacity_wh=2000.0,
+    min_soc=10.0,
+    max_soc=90.0,
+    max_charge_power=800.0,
+    max_discharge_power=600.0,
+)
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def hourly_slots(prices):
+    """Build hourly price slots starting at START."""
+    return [
+        PriceSlot(START + hour * HOUR, START + (hour + 1) * HOUR, price)
+        for hour, price in enumerate(prices)
+    ]
+
+
+def test_limits_from_report():
+    """Test reading the battery limits from a report."""
+    limits = BatteryLimits.from_report(load_fixture("sample_response.json"))
+    assert limits == BatteryLimits(3840.0, 5.0, 100.0, 800.0, 800.0)
+    assert BatteryLimits.from_report({"properties": {}}) is None
+    assert BatteryLimits.from_report(
+        load_fixture("sample_response.json"), 3000.0
+    ) == BatteryLimits(3000.0, 5.0, 100.0, 800.0, 800.0)
+
+
+def test_plan_arbitrage_within_limits():
+    """Test charging in cheap and discharging in expensive hours."""
+    prices = [0.10, 0.10, 0.10, 0.40, 0.40, 0.40]
+    plan = SocPlanner().plan(hourly_slots(prices), None, LIMITS, 10.0, START)
+
+    assert len(plan) == len(prices)
+    assert all(slot.power > 0 for slot in plan[:2])
+    assert all(slot.power <= 0 for slot in plan[3:])
+    assert max(slot.soc for slot in plan) == LIMITS.max_soc
+    assert plan[-1].soc == LIMITS.min_soc
+    for slot in plan:
+        assert LIMITS.min_soc <= slot.soc <= LIMITS.max_soc
+        assert -LIMITS.max_discharge_power <= slot.power
+        assert slot.power <= LIMITS.max_charge_power
+
+
+def test_plan_flat_prices_idles():
+    """Test that flat prices give no reason to cycle the battery."""
+    plan = SocPlanner().plan(hourly_slots([0.25] * 8), None, LIMITS, 50.0, START)
+    assert [slot.power for slot in plan] == [0] * 8
+
+
+def test_plan_stores_solar_without_feed_in():
+    """Test that solar is stored rather than exported without feed-in tariff."""
+    planner = SocPlanner(feed_in_factor=0.0)
+    plan = planner.plan(
+        hourly_slots([0.25] * 4), [1000.0, 0, 0, 0], LIMITS, 50.0, START
+    )
+    # Solar charges the battery, only the part above the charge rate is output
+    assert plan[0].soc > 50.0
+    assert plan[0].power > -1000
+
+
+def test_plan_skips_ended_slots():
+    """Test that slots that already ended are not planned."""
+    slots = hourly_slots([0.10, 0.40, 0.10, 0.40])
+    plan = SocPlanner().plan(slots, None, LIMITS, 50.0, START + 1.5 * HOUR)
+    assert [slot.start for slot in plan] == [START + HOUR * i for i in (1, 2, 3)]
+
+
+def test_incremental_replan():
+    """Test that only slots up to the last change are recomputed."""
+    prices = [0.30, 0.10, 0.35, 0.20, 0.15, 0.40, 0.25, 0.30]
+    planner = SocPlanner()
+    planner.plan(hourly_slots(prices), None, LIMITS, 50.0, START)
+    assert planner.solved_slots == len(prices)
+
+    # Swapping two prices keeps the mean, so a fresh solve is comparable
+    changed = list(prices)
+    changed[3], changed[4] = changed[4], changed[3]
+    incremental = planner.plan(hourly_slots(changed), None, LIMITS, 50.0, START)
+    assert planner.solved_slots == 5
+    fresh = SocPlanner().plan(hourly_slots(changed), None, LIMITS, 50.0, START)
+    assert incremental == fresh
+
+    # Time passing only drops slots
+    later = planner.plan(hourly_slots(changed), None, LIMITS, 50.0, START + HOUR)
+    assert planner.solved_slots == 0
+    assert len(later) == len(prices) - 1
+
+    # New limits need a full solve
+    planner.plan(
+        hourly_slots(changed),
+        None,
+        BatteryLimits(2000.0, 20.0, 90.0, 800.0, 600.0),
+        50.0,
+        START,
+    )
+    assert planner.solved_slots == len(prices)
+
+
+def test_voltage_changes_keep_the_plan():
+    """Test that polls differing only in pack voltage reuse the plan."""
+    prices = [0.30, 0.10, 0.35, 0.20, 0.15, 0.40, 0.25, 0.30]
+    coordinator = ZendureCoordinator(MagicMock(), "http://10.0.0.5/properties/report")
+    planner = SocPlanner()
+    for poll, total_vol in enumerate((4980, 4979, 4981)):
+        data = load_fixture("sample_response.json")
+        for pack in data["packData"]:
+            pack["totalVol"] = total_vol
+        coordinator.data = data
+        coordinator.pack_coulomb.update(data["packData"], poll * 60.0)
+        limits = coordinator.battery_limits()
+        planner.plan(hourly_slots(prices), None, limits, 50.0, START)
+        assert planner.solved_slots == (len(prices) if poll == 0 else 0)
@@ -0,0 +1,99 @@
+"""Unit tests for the polling options."""
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from custom_components.zendure_local.const import (
+    CONF_COMPACT,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_SENSOR_GROUPS,
+    SENSOR_GROUPS,
+)
+from custom_components.zendure_local.polling import (
+    PollingOptions,
+    is_active,
+    only_live_options_changed,
+    sensor_groups,
+    within_deadband,
+)
+
+
+def report(**properties):
+    """Return a report with the given properties."""
+    return {"properties": {"electricLevel": 50, **properties}}
+
+
+def test_defaults_keep_a_fixed_interval():
+    """Test that the default options poll every 60 seconds."""
+    polling = PollingOptions.from_options({})
+    interval = timedelta(seconds=60)
+    assert polling.next_interval(interval, active=False) == interval
+    assert polling.next_interval(interval, active=True) == interval
+    assert sensor_groups({}) == frozenset(SENSOR_GROUPS)
+
+
+def test_interval_backs_off_while_quiet():
+    """Test doubling the interval up to the maximum and resetting it."""
+    polling = PollingOptions.from_options(
+        {CONF_MIN_INTERVAL: 10, CONF_MAX_INTERVAL: 60}
+    )
+    interval = polling.next_interval(None, active=False)
+    intervals = []
+    for _ in range(4):
+        interval = polling.next_interval(interval, active=False)
+        intervals.append(interval.total_seconds())
+    assert intervals == [20, 40, 60, 60]
+    assert polling.next_interval(interval, active=True) == timedelta(seconds=10)
+
+
+def test_activity_uses_the_power_deadband():
+    """Test that only power flow changes of at least the deadband count."""
+    old = report(solarInputPower=100, outputHomePower=200)
+    assert not is_active(old, report(solarInputPower=100, outputHomePower=200), 0)
+    # Other properties do not count
+    assert not is_active(
+        old, report(solarInputPower=100, outputHomePower=200, electricLevel=51), 0
+    )
+    assert is_active(old, report(solarInputPower=101, outputHomePower=200), 0)
+    assert not is_active(old, report(solarInputPower=119, outputHomePower=200), 20)
+    assert is_active(old, report(solarInputPower=120, outputHomePower=200), 20)
+    # A failed poll or the first report
+    assert is_active(old, {}, 20)
+    assert is_active(None, old, 20)
+
+
+def test_within_deadband():
+    """Test which sensor values are not worth a state write."""
+    polling = PollingOptions.from_options({CONF_POWER_DEADBAND: 10})
+    assert polling.deadband(SensorDeviceClass.POWER) == 10
+    assert polling.deadband(SensorDeviceClass.BATTERY) == 0
+    assert within_deadband(100, 109, 10)
+    assert not within_deadband(100, 110, 10)
+    assert not within_deadband(100, 101, 0)
+    assert not within_deadband(None, 100, 10)
+    assert not within_deadband(100, None, 10)
+    assert not within_deadband("charging", "standby", 10)
+
+
+def test_only_live_options_changed():
+    """Test which option changes are applied without a reload."""
+    options = {CONF_COMPACT: False, CONF_MIN_INTERVAL: 60}
+    assert only_live_options_changed(
+        options, options | {CONF_MIN_INTERVAL: 10, CONF_POWER_DEADBAND: 5}
+    )
+    assert not only_live_options_changed(options, options | {CONF_COMPACT: True})
+    assert not only_live_options_changed(
+        options, options | {CONF_SENSOR_GROUPS: ["packs"]}
+    )
+    # Selecting the default groups changes nothing
+    assert only_live_options_changed(
+        options, options | {CONF_SENSOR_GROUPS: list(reversed(SENSOR_GROUPS))}
+    )
@@ -0,0 +1,154 @@
+"""Unit tests for the recorder budget profiles of the sensor platform."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from homeassistant.helpers import entity_registry as er
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.const import (
+    CONF_APPLIED_PROFILE,
+    CONF_RECORDER_PROFILE,
+    RECORDER_TIERS,
+    SCAN_INTERVAL,
+)
+from custom_components.zendure_local.sensor import (
+    apply_profile_to_registry,
+    async_setup_entry,
+)
+
+# Short term statistics every 5 minutes plus the hourly long term statistics
+STATISTICS_ROWS_PER_HOUR = 12 + 1
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def setup_sensors(profile):
+    """Return the sensors of a hub with two packs for a recorder profile."""
+    entry = MagicMock(entry_id="hub")
+    entry.data = {"name": "Hub"}
+    entry.options = {CONF_RECORDER_PROFILE: profile}
+    entry.runtime_data.coordinator.data = load_fixture("sample_response.json")
+    entry.runtime_data.coordinator.pack_aggregates = {}
+    entry.runtime_data.coordinator.hub_estimates = {}
+    entry.runtime_data.coordinator.pack_indicators = {}
+    entry.runtime_data.scheduler = None
+    add_entities = MagicMock()
+    with patch("custom_components.zendure_local.sensor.er.async_get"):
+        asyncio.run(async_setup_entry(MagicMock(), entry, add_entities))
+    return add_entities.call_args[0][0]
+
+
+def max_rows_per_hour(sensors):
+    """Return an upper bound of the recorder rows per hour of one hub.
+
+    Every enabled sensor is counted as changing on every poll. Unchanged
+    values, deadbands and skipped duplicate reports write fewer rows, this is
+    not a count of the rows in a recorder database.
+    """
+    state_rows = 3600 / SCAN_INTERVAL.total_seconds()
+    rows = 0.0
+    for sensor in sensors:
+        description = sensor.entity_description
+        if not description.entity_registry_enabled_default:
+            continue
+        rows += state_rows
+        if description.state_class is not None:
+            rows += STATISTICS_ROWS_PER_HOUR
+    return rows
+
+
+def test_max_rows_per_hour_per_profile():
+    """Test that the upper bound of every profile is below the next one."""
+    rows = {
+        profile: max_rows_per_hour(setup_sensors(profile)) for profile in RECORDER_TIERS
+    }
+    assert rows["core"] < rows["extended"] < rows["diagnostic"]
+    # A hub with two packs on the core profile: at most 20 busy sensors
+    assert rows["core"] <= 20 * (60 + STATISTICS_ROWS_PER_HOUR)
+
+
+def test_profile_keeps_all_sensors_available():
+    """Test that a profile only changes defaults, every sensor is still created."""
+    keys = {
+        profile: [sensor.unique_id for sensor in setup_sensors(profile)]
+        for profile in RECORDER_TIERS
+    }
+    assert keys["core"] == keys["extended"] == keys["diagnostic"]
+
+
+def test_message_id_has_no_statistics():
+    """Test that the message counter never gets long term statistics."""
+    for profile in RECORDER_TIERS:
+        sensors = {sensor.unique_id: sensor for sensor in setup_sensors(profile)}
+        assert sensors["hub_messageId"].entity_description.state_class is None
+
+
+def test_diagnostic_sensors_only_in_diagnostic_profile():
+    """Test that diagnostic sensors are disabled unless the profile includes them."""
+    for profile, enabled in (("extended", False), ("diagnostic", True)):
+        sensors = {sensor.unique_id: sensor for sensor in setup_sensors(profile)}
+        description = sensors["hub_rssi"].entity_description
+        assert description.entity_registry_enabled_default is enabled
+        assert (description.state_class is not None) is enabled
+
+
+def test_profile_change_keeps_the_choices_of_the_user():
+    """Test that only sensors leaving the profile are disabled."""
+    sensors = {sensor.unique_id: sensor for sensor in setup_sensors("core")}
+    integration = er.RegistryEntryDisabler.INTEGRATION
+    registered = {
+        # Enabled by the user outside the profile
+        "hub_rssi": MagicMock(disabled_by=None),
+        # Disabled by the user inside the profile
+        "hub_solarInputPower": MagicMock(disabled_by=er.RegistryEntryDisabler.USER),
+        # Disabled when the profile was smaller
+        "hub_electricLevel": MagicMock(disabled_by=integration),
+        # In the previous profile only
+        "hub_hyperTmp": MagicMock(disabled_by=None),
+    }
+    entities = [sensors[unique_id] for unique_id in registered]
+
+    def apply(previous, profile):
+        with patch("custom_components.zendure_local.sensor.er.async_get") as get:
+            registry = get.return_value
+            registry.async_get_entity_id.side_effect = (
+                lambda domain, platform, unique_id: unique_id
+            )
+            registry.async_get.side_effect = registered.get
+            apply_profile_to_registry(MagicMock(), entities, previous, profile)
+        return {
+            call.args[0]: call.kwargs["disabled_by"]
+            for call in registry.async_update_entity.call_args_list
+        }
+
+    # A restart on the same profile changes nothing the user chose
+    assert apply("core", "core") == {"hub_electricLevel": None}
+    assert apply("extended", "core") == {
+        "hub_electricLevel": None,
+        "hub_hyperTmp": integration,
+    }
+
+
+def test_applied_profile_is_stored():
+    """Test that setup remembers the profile it applied."""
+    entry = MagicMock(entry_id="hub")
+    entry.data = {"name": "Hub", CONF_APPLIED_PROFILE: "extended"}
+    entry.options = {CONF_RECORDER_PROFILE: "core"}
+    entry.runtime_data.coordinator.data = None
+    entry.runtime_data.scheduler = None
+    hass = MagicMock()
+    with patch("custom_components.zendure_local.sensor.er"):
+        asyncio.run(async_setup_entry(hass, entry, MagicMock()))
+    data = hass.config_entries.async_update_entry.call_args_list[-1].kwargs["data"]
+    assert data[CONF_APPLIED_PROFILE] == "core"
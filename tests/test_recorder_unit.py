@@ -0,0 +1,80 @@
+"""Unit tests for the raw report trace recorder."""
+
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.recorder import TraceRecorder, iter_reports
+
+RECEIVED = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_records_reports_with_receive_time_and_latency(tmp_path):
+    """Test that reports are written with their receive time and latency."""
+    report = load_fixture("sample_response.json")
+    recorder = TraceRecorder(tmp_path)
+    recorder.start()
+    for index in range(5):
+        recorder.record(
+            dict(report, messageId=index), RECEIVED + timedelta(seconds=index), 0.25
+        )
+    recorder.stop()
+
+    files = list(tmp_path.glob("*.jsonl.gz"))
+    assert [path.name for path in files] == ["20250101-120000.jsonl.gz"]
+    lines = list(iter_reports(files[0]))
+    assert [line["messageId"] for line in lines] == list(range(5))
+    assert lines[0]["received"] == "2025-01-01T12:00:00+00:00"
+    assert lines[0]["latency"] == 0.25
+    assert lines[0]["properties"] == report["properties"]
+    assert recorder.recorded == 5
+    assert recorder.dropped == 0
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait for the writer thread to reach a condition."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the writer"
+        time.sleep(0.01)
+
+
+def test_flushed_trace_is_readable_while_recording(tmp_path):
+    """Test that a trace without gzip trailer can be read up to the last flush."""
+    recorder = TraceRecorder(tmp_path)
+    recorder.start()
+    recorder.record({"timestamp": 1}, RECEIVED, 0.1)
+
+    def readable():
+        files = list(tmp_path.glob("*.jsonl.gz"))
+        return bool(files) and bool(list(iter_reports(files[0])))
+
+    wait_for(readable)
+    path = next(tmp_path.glob("*.jsonl.gz"))
+    assert [line["timestamp"] for line in iter_reports(path)] == [1]
+    recorder.stop()
+
+
+def test_rotates_and_prunes_files(tmp_path):
+    """Test rotation by size and removal of the oldest files."""
+    recorder = TraceRecorder(tmp_path, max_bytes=1, keep=2)
+    # Drive the writer directly, every flush exceeds the size limit
+    for index in range(4):
+        received = RECEIVED + timedelta(hours=index)
+        recorder._write({"received": received.isoformat(), "timestamp": index})
+        recorder._flush()
+
+    files = sorted(path.name for path in tmp_path.glob("*.jsonl.gz"))
+    assert files == ["20250101-140000.jsonl.gz", "20250101-150000.jsonl.gz"]
@@ -0,0 +1,104 @@
+"""Unit tests for replaying recorded reports."""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.replay import ReplaySource, is_replay_resource
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    """Write a recorded trace of five reports, 60 seconds apart."""
+    report = load_fixture("sample_response.json")
+    path = tmp_path / "trace.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for index in range(5):
+            line = dict(
+                report,
+                timestamp=report["timestamp"] + 60 * index,
+                messageId=index,
+                received="2025-01-01T12:00:00+00:00",
+                latency=0.1,
+            )
+            file.write(json.dumps(line) + "\n")
+    return path
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self):
+        """Initialize the clock."""
+        self.now = 1000.0
+
+    def __call__(self):
+        """Return the current time."""
+        return self.now
+
+
+def test_is_replay_resource():
+    """Test recognizing trace resources."""
+    assert is_replay_resource("file:///config/trace.jsonl.gz")
+    assert not is_replay_resource("http://SolarFlow800.lan/properties/report")
+
+
+def test_from_resource(trace_file):
+    """Test parsing the path, speed and loop from a file URL."""
+    source = ReplaySource.from_resource(f"file://{trace_file}?speed=30&loop=1")
+    assert source.path == trace_file
+    assert source.speed == 30
+    assert source.loop is True
+    assert ReplaySource.from_resource(f"file://{trace_file}").speed == 1
+
+
+def test_replay_follows_virtual_clock(trace_file):
+    """Test that reads return the report at the virtual time."""
+    clock = FakeClock()
+    source = ReplaySource(trace_file, speed=60, clock=clock)
+
+    first = source.read()
+    assert first["messageId"] == 0
+    # Recorder fields are stripped, the payload is as the hub sent it
+    assert "received" not in first
+    assert "latency" not in first
+
+    # One real second is one recorded minute at 60x
+    clock.now += 1
+    assert source.read()["messageId"] == 1
+    clock.now += 2.5
+    assert source.read()["messageId"] == 3
+    # The end of the trace keeps returning the last report
+    clock.now += 100
+    assert source.read()["messageId"] == 4
+    assert source.read()["messageId"] == 4
+    assert source.replayed == 5
+
+
+def test_replay_loops(trace_file):
+    """Test starting over at the end of the trace."""
+    clock = FakeClock()
+    source = ReplaySource(trace_file, speed=60, loop=True, clock=clock)
+    source.read()
+    clock.now += 10
+    assert source.read()["messageId"] == 4
+    assert source.read()["messageId"] == 0
+
+
+def test_replay_rejects_bad_speed(trace_file):
+    """Test that the speed must be positive."""
+    with pytest.raises(ValueError):
+        ReplaySource(trace_file, speed=0)
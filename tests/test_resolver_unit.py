@@ -0,0 +1,114 @@
+"""Unit tests for the pinned host name resolution."""
+
+import asyncio
+import socket
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.resolver import PinnedHost
+
+RESOURCE = "http://SolarFlow800.lan/properties/report"
+
+
+class FakeClock:
+    """Monotonic clock advanced by the test."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def addrinfo(address):
+    """Return a getaddrinfo result for an IPv4 address."""
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 80))]
+
+
+def resolve(host, result):
+    """Resolve with getaddrinfo returning a result or raising an error."""
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        mock = (
+            AsyncMock(side_effect=result)
+            if isinstance(result, Exception)
+            else (AsyncMock(return_value=result))
+        )
+        with patch.object(loop, "getaddrinfo", mock):
+            changed = await host.async_resolve()
+        return changed, mock
+
+    return asyncio.run(run())
+
+
+def test_requests_go_to_the_pinned_address():
+    """Test rewriting device URLs to the address with the Host header."""
+    host = PinnedHost(RESOURCE, {"host": "solarflow800.lan", "address": "10.0.0.5"})
+    assert not host.needs_resolve()
+    assert host.request(RESOURCE) == (
+        "http://10.0.0.5/properties/report",
+        {"Host": "SolarFlow800.lan"},
+    )
+    assert host.request("http://SolarFlow800.lan:8080/properties/write") == (
+        "http://10.0.0.5:8080/properties/write",
+        {"Host": "SolarFlow800.lan:8080"},
+    )
+    # Another host is not rewritten
+    assert host.request("http://other.lan/") == ("http://other.lan/", {})
+
+
+def test_ip_addresses_https_and_other_hosts_are_not_pinned():
+    """Test resources that need no or cannot use a pinned address."""
+    for resource in (
+        "http://192.168.1.20/properties/report",
+        "https://SolarFlow800.lan/properties/report",
+        "file:///config/trace.jsonl.gz",
+    ):
+        host = PinnedHost(resource, {"host": "solarflow800.lan", "address": "10.0.0.5"})
+        assert not host.needs_resolve()
+        assert host.request(resource) == (resource, {})
+    # An address stored for a previous host name is ignored
+    host = PinnedHost(RESOURCE, {"host": "hub.lan", "address": "10.0.0.5"})
+    assert host.address is None
+    assert host.needs_resolve()
+
+
+def test_resolves_after_ttl_and_failures():
+    """Test resolving once, again after the TTL and after a failed request."""
+    clock = FakeClock()
+    host = PinnedHost(RESOURCE, ttl=3600, clock=clock)
+    assert host.needs_resolve()
+    changed, mock = resolve(host, addrinfo("10.0.0.5"))
+    assert changed
+    assert mock.call_args.args[:2] == ("solarflow800.lan", 80)
+    assert host.as_dict() == {"host": "solarflow800.lan", "address": "10.0.0.5"}
+
+    clock.now = 60
+    assert not host.needs_resolve()
+    host.failed()
+    assert host.needs_resolve()
+    changed, _ = resolve(host, addrinfo("10.0.0.5"))
+    assert not changed
+    assert not host.needs_resolve()
+
+    clock.now = 3700
+    assert host.needs_resolve()
+    changed, _ = resolve(host, addrinfo("10.0.0.9"))
+    assert changed
+    assert host.address == "10.0.0.9"
+    assert host.resolves == 3
+
+
+def test_failed_lookup_keeps_the_address():
+    """Test that a DNS failure does not drop the pinned address."""
+    host = PinnedHost(RESOURCE, {"host": "solarflow800.lan", "address": "10.0.0.5"})
+    host.failed()
+    changed, _ = resolve(host, socket.gaierror(-2, "Name or service not known"))
+    assert not changed
+    assert host.address == "10.0.0.5"
+    assert not host.needs_resolve()
@@ -0,0 +1,96 @@
+"""Unit tests for the threshold and rate of change rules."""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.rules import Rule, RuleEngine
+
+
+def hub(**values):
+    """Return a snapshot with hub values and two packs."""
+    return {
+        "hub": values,
+        "packs": [{"sn": "P1", "temp": 20.0}, {"sn": "P2", "temp": 20.0}],
+    }
+
+
+def run(engine, samples, step=60):
+    """Evaluate snapshots one step apart, return the events per step."""
+    return [
+        engine.evaluate(snapshot, 1000 + index * step)
+        for index, snapshot in enumerate(samples)
+    ]
+
+
+def test_threshold_with_hysteresis_fires_on_crossing_only():
+    """Test that a threshold fires once per crossing and respects hysteresis."""
+    engine = RuleEngine([Rule("solar", "solarInputPower", "above", 500, 50)])
+    power = [600, 400, 700, 800, 480, 460, 440, 600]
+    events = run(engine, [hub(solarInputPower=value) for value in power])
+    # The first sample only sets the state, 480 and 460 are within the band
+    assert [[event["active"] for event in step] for step in events] == [
+        [],
+        [False],
+        [True],
+        [],
+        [],
+        [],
+        [False],
+        [True],
+    ]
+    assert events[1][0] == {
+        "rule": "solar",
+        "field": "solarInputPower",
+        "kind": "above",
+        "value": 400.0,
+        "active": False,
+    }
+
+
+def test_below_rule():
+    """Test a rule on a value dropping below a threshold."""
+    engine = RuleEngine([Rule("low", "electricLevel", "below", 20, 5)])
+    events = run(engine, [hub(electricLevel=v) for v in (30, 19, 22, 26)])
+    assert [[e["active"] for e in step] for step in events] == [[], [True], [], [False]]
+
+
+def test_rate_rule_per_pack():
+    """Test a rate of change rule evaluated for every pack."""
+    engine = RuleEngine([Rule("hot", "pack.temp", "rising", 1.0)])
+    samples = [hub(), hub(), hub()]
+    samples[1]["packs"][1]["temp"] = 22.0
+    samples[2]["packs"][1]["temp"] = 22.5
+    events = run(engine, samples, step=60)
+    # No rate for the first report, 2 degrees per minute in the second
+    assert events[0] == []
+    assert events[1] == []
+    assert [(e["pack"], e["active"], e["value"]) for e in events[2]] == [
+        ("P2", False, 0.5)
+    ]
+
+
+def test_rate_uses_device_time():
+    """Test that the rate is per minute of device time and skips old reports."""
+    engine = RuleEngine([Rule("drop", "electricLevel", "falling", 1.0)])
+    assert engine.evaluate(hub(electricLevel=50), 0) == []
+    assert engine.evaluate(hub(electricLevel=49), 120) == []
+    # Same device timestamp again gives no rate
+    assert engine.evaluate(hub(electricLevel=40), 120) == []
+    events = engine.evaluate(hub(electricLevel=40), 180)
+    assert [(e["active"], e["value"]) for e in events] == [(True, -9.0)]
+
+
+def test_missing_and_text_values_are_ignored():
+    """Test that missing or textual values leave the rule state alone."""
+    engine = RuleEngine([Rule("state", "acMode", "above", 1)])
+    assert run(engine, [hub(acMode="charging"), hub()]) == [[], []]
+
+
+def test_rule_round_trip():
+    """Test storing rules in the options."""
+    rule = Rule("solar", "solarInputPower", "above", 500, 50)
+    assert Rule.from_dict(rule.as_dict()) == rule
+    assert Rule.from_dict({**rule.as_dict(), "threshold": "5"}).threshold == 5.0
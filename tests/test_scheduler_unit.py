@@ -0,0 +1,215 @@
+"""Unit tests for the cheapest hours scheduler."""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.api import base_url, write_url
+from custom_components.zendure_local.coordinator import ZendureCoordinator
+from custom_components.zendure_local.forecast import (
+    PriceSlot,
+    parse_forecast,
+    resample,
+)
+from custom_components.zendure_local.planner import PlannedSlot
+from custom_components.zendure_local.scheduler import (
+    STATE_CHARGE,
+    STATE_DISCHARGE,
+    SchedulePlan,
+    ZendureScheduler,
+    best_contiguous_window,
+    best_slots,
+    merge_slots,
+    plan_windows,
+    schedule_from_slots,
+)
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+PRICES = [0.30, 0.25, 0.10, 0.12, 0.11, 0.40, 0.35, 0.05]
+
+
+def hourly_slots(prices):
+    """Build hourly price slots starting at START."""
+    return [
+        PriceSlot(
+            START + timedelta(hours=hour), START + timedelta(hours=hour + 1), price
+        )
+        for hour, price in enumerate(prices)
+    ]
+
+
+def brute_force_window(prices, length, lowest):
+    """Return the best window start by checking every window."""
+    sums = [sum(prices[i : i + length]) for i in range(len(prices) - length + 1)]
+    best = min(sums) if lowest else max(sums)
+    return sums.index(best)
+
+
+def test_best_contiguous_window_matches_brute_force():
+    """Test the sliding window against summing every window."""
+    for length in range(1, len(PRICES) + 1):
+        assert best_contiguous_window(PRICES, length) == brute_force_window(
+            PRICES, length, True
+        )
+        assert best_contiguous_window(PRICES, length, lowest=False) == (
+            brute_force_window(PRICES, length, False)
+        )
+
+
+def test_best_contiguous_window_respects_allowed():
+    """Test that windows containing disallowed slots are skipped."""
+    allowed = [True] * len(PRICES)
+    allowed[3] = False
+    # The 3 hour window at 2..4 contains the blocked slot
+    assert best_contiguous_window(PRICES, 3) == 2
+    assert best_contiguous_window(PRICES, 3, allowed=allowed) == 0
+    assert best_contiguous_window(PRICES, 3, allowed=[False] * len(PRICES)) is None
+    assert best_contiguous_window(PRICES, 0) is None
+    assert best_contiguous_window(PRICES, len(PRICES) + 1) is None
+
+
+def test_best_slots_returns_time_ordered_indices():
+    """Test non contiguous selection of the cheapest and dearest slots."""
+    assert best_slots(PRICES, 3) == [2, 4, 7]
+    assert best_slots(PRICES, 2, lowest=False) == [5, 6]
+    assert best_slots(PRICES, 2, allowed=[i != 7 for i in range(8)]) == [2, 4]
+
+
+def test_merge_slots_joins_adjacent_slots():
+    """Test that adjacent slots are merged into one interval."""
+    slots = hourly_slots(PRICES)
+    intervals = merge_slots(slots, [4, 2, 3, 7])
+    assert intervals == [
+        (START + timedelta(hours=2), START + timedelta(hours=5)),
+        (START + timedelta(hours=7), START + timedelta(hours=8)),
+    ]
+
+
+def test_parse_forecast():
+    """Test parsing a Zonneplan style forecast attribute."""
+    items = [
+        {"datetime": "2025-01-01T01:00:00+00:00", "electricity_price": 2000},
+        {"datetime": "2025-01-01T00:00:00+00:00", "electricity_price": 1000},
+        {"datetime": "invalid", "electricity_price": 3000},
+        {"electricity_price": 4000},
+    ]
+    slots = parse_forecast(items, "datetime", "electricity_price")
+    assert slots == [
+        PriceSlot(START, START + timedelta(hours=1), 1000.0),
+        PriceSlot(START + timedelta(hours=1), START + timedelta(hours=2), 2000.0),
+    ]
+
+
+def test_plan_windows_contiguous_and_exclusive():
+    """Test that discharge windows never overlap the charge window."""
+    plan = plan_windows(hourly_slots(PRICES), START, 3, 2, contiguous=True)
+    assert plan.charge == [(START + timedelta(hours=2), START + timedelta(hours=5))]
+    assert plan.discharge == [(START + timedelta(hours=5), START + timedelta(hours=7))]
+    assert plan.state_at(START + timedelta(hours=2, minutes=30)) == STATE_CHARGE
+    assert plan.state_at(START + timedelta(hours=6)) == STATE_DISCHARGE
+    assert plan.state_at(START) is None
+
+
+def test_plan_windows_skips_past_slots():
+    """Test that slots that already ended are not planned."""
+    now = START + timedelta(hours=5, minutes=30)
+    plan = plan_windows(hourly_slots(PRICES), now, 1, 1, contiguous=False)
+    assert plan.charge == [(START + timedelta(hours=7), START + timedelta(hours=8))]
+    assert plan.discharge == [(START + timedelta(hours=5), START + timedelta(hours=6))]
+    assert SchedulePlan.next_start(plan.charge, now) == START + timedelta(hours=7)
+    assert plan.boundaries_after(now) == [
+        START + timedelta(hours=6),
+        START + timedelta(hours=7),
+        START + timedelta(hours=8),
+    ]
+
+
+def test_transition_writes_only_changes():
+    """Test the properties written when moving between states."""
+    scheduler = ZendureScheduler(
+        MagicMock(),
+        MagicMock(),
+        {"forecast_entity": "sensor.price", "charge_power": 600},
+    )
+    assert scheduler.transition(None) == ({}, None)
+    assert scheduler.transition(STATE_CHARGE) == (
+        {"acMode": 1, "inputLimit": 600},
+        600,
+    )
+
+    scheduler._state = STATE_CHARGE
+    scheduler._limit = 600
+    assert scheduler.transition(STATE_CHARGE) == ({}, 600)
+    assert scheduler.transition(None) == ({"inputLimit": 0}, None)
+    assert scheduler.transition(STATE_DISCHARGE) == (
+        {"inputLimit": 0, "acMode": 2, "outputLimit": 800},
+        800,
+    )
+    # A planned power overrides the configured power
+    assert scheduler.transition(STATE_CHARGE, 450) == (
+        {"acMode": 1, "inputLimit": 450},
+        450,
+    )
+
+
+def test_window_ending_offline_replaces_the_queued_write():
+    """Test that a transition while the hub is offline undoes a queued one."""
+    coordinator = ZendureCoordinator(MagicMock(), "http://10.0.0.5/properties/report")
+    scheduler = ZendureScheduler(
+        MagicMock(),
+        coordinator,
+        {"forecast_entity": "sensor.price", "charge_power": 600},
+    )
+
+    async def run():
+        # Without a report the hub is unreachable and writes are queued
+        await scheduler._async_apply(STATE_CHARGE, None)
+        assert coordinator.pending_commands.properties() == {
+            "acMode": 1,
+            "inputLimit": 600,
+        }
+        await scheduler._async_apply(None, None)
+
+    asyncio.run(run())
+    assert coordinator.pending_commands.properties() == {
+        "acMode": 1,
+        "inputLimit": 0,
+    }
+
+
+def test_schedule_from_slots():
+    """Test merging planner setpoints into charge and discharge windows."""
+    hour = timedelta(hours=1)
+    slots = [
+        PlannedSlot(START + i * hour, START + (i + 1) * hour, power, 50.0)
+        for i, power in enumerate([400, 400, 0, -300, -200])
+    ]
+    plan = schedule_from_slots(slots)
+    assert plan.charge == [(START, START + 2 * hour)]
+    assert plan.discharge == [(START + 3 * hour, START + 5 * hour)]
+    assert plan.power_at(START + 4 * hour) == -200
+    assert plan.state_at(START + 2 * hour) is None
+    assert plan.boundaries_after(START) == [START + i * hour for i in range(1, 6)]
+
+
+def test_resample_time_weighted():
+    """Test resampling half hourly values onto hourly slots."""
+    half = timedelta(minutes=30)
+    values = [
+        PriceSlot(START + i * half, START + (i + 1) * half, value)
+        for i, value in enumerate([1.0, 3.0, 2.0])
+    ]
+    slots = hourly_slots([0, 0, 0])
+    assert resample(slots, values) == [2.0, 1.0, 0.0]
+
+
+def test_write_url():
+    """Test deriving the write URL from the report resource."""
+    resource = "http://SolarFlow800.lan/properties/report"
+    assert base_url(resource) == "http://SolarFlow800.lan"
+    assert write_url(resource) == "http://SolarFlow800.lan/properties/write"
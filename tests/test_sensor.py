@@ -18,6 +18,8 @@ from custom_components.zendure_local.sensor import (
     async_setup_entry,
 )
 
+ENTRY = MagicMock(entry_id="test_entry", data={"name": "Test Zendure"})
+
 
 def load_fixture(filename):
     """Load fixture data."""
@@ -121,12 +123,12 @@ async def test_zendure_local_sensor_initialization(
         name="Battery Level",
     )
 
-    sensor = ZendureLocalSensor(mock_coordinator, description, "Test Zendure")
+    sensor = ZendureLocalSensor(mock_coordinator, description, ENTRY)
 
     assert sensor.entity_description.key == "electricLevel"
-    assert sensor.unique_id == "Test Zendure_electricLevel"
+    assert sensor.unique_id == "test_entry_electricLevel"
     assert sensor.device_info is not None
-    assert sensor.device_info["identifiers"] == {(DOMAIN, "zendure_solarflow")}
+    assert sensor.device_info["identifiers"] == {(DOMAIN, "test_entry")}
     assert sensor.device_info["manufacturer"] == "Zendure"
     assert sensor.device_info["model"] == "Solarflow Hub"
 
@@ -138,7 +140,7 @@ async def test_zendure_local_sensor_value(hass: HomeAssistant, mock_coordinator)
         name="Battery Level",
     )
 
-    sensor = ZendureLocalSensor(mock_coordinator, description, "Test Zendure")
+    sensor = ZendureLocalSensor(mock_coordinator, description, ENTRY)
 
     # Test that sensor gets value from coordinator data
     assert sensor.native_value == 97  # From fixture data
@@ -154,7 +156,7 @@ async def test_zendure_local_sensor_no_data(hass: HomeAssistant):
         name="Battery Level",
     )
 
-    sensor = ZendureLocalSensor(coordinator, description, "Test Zendure")
+    sensor = ZendureLocalSensor(coordinator, description, ENTRY)
     assert sensor.native_value is None
 
 
@@ -165,7 +167,7 @@ async def test_zendure_local_sensor_invalid_key(hass: HomeAssistant, mock_coordi
         name="Non-existent Sensor",
     )
 
-    sensor = ZendureLocalSensor(mock_coordinator, description, "Test Zendure")
+    sensor = ZendureLocalSensor(mock_coordinator, description, ENTRY)
     assert sensor.native_value is None
 
 
@@ -178,14 +180,14 @@ async def test_zendure_battery_sensor_initialization(
         name="Battery SOC",
     )
 
-    battery_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, description, "Test Battery 1", 0
-    )
+    battery_sensor = ZendureLocalBatterySensor(mock_coordinator, description, ENTRY, 0)
 
     assert battery_sensor.entity_description.key == "pack_soc"
-    assert battery_sensor.unique_id == "Test Battery 1_pack_soc"
+    assert battery_sensor.unique_id == "test_entry_battery1_pack_soc"
     assert battery_sensor.device_info is not None
-    assert battery_sensor.device_info["identifiers"] == {(DOMAIN, "zendure_pack1")}
+    assert battery_sensor.device_info["identifiers"] == {
+        (DOMAIN, "test_entry_battery1")
+    }
     assert battery_sensor.device_info["manufacturer"] == "Zendure"
     assert battery_sensor.device_info["model"] == "Battery Pack"
 
@@ -194,15 +196,13 @@ async def test_zendure_battery_sensor_values(hass: HomeAssistant, mock_coordinat
     """Test ZendureLocalBatterySensor value retrieval for different sensor types."""
     # Test SOC sensor
     soc_description = SensorEntityDescription(key="pack_soc", name="Battery SOC")
-    soc_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, soc_description, "Test Battery 1", 0
-    )
+    soc_sensor = ZendureLocalBatterySensor(mock_coordinator, soc_description, ENTRY, 0)
     assert soc_sensor.native_value == 97  # From fixture data
 
     # Test power sensor
     power_description = SensorEntityDescription(key="pack_power", name="Battery Power")
     power_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, power_description, "Test Battery 1", 0
+        mock_coordinator, power_description, ENTRY, 0
     )
     assert power_sensor.native_value == 742  # From fixture data
 
@@ -211,7 +211,7 @@ async def test_zendure_battery_sensor_values(hass: HomeAssistant, mock_coordinat
         key="pack_temp", name="Battery Temperature"
     )
     temp_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, temp_description, "Test Battery 1", 0
+        mock_coordinator, temp_description, ENTRY, 0
     )
     assert temp_sensor.native_value == 36.0  # (3091 - 2731) / 10.0
 
@@ -220,14 +220,14 @@ async def test_zendure_battery_sensor_values(hass: HomeAssistant, mock_coordinat
         key="pack_voltage", name="Battery Voltage"
     )
     voltage_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, voltage_description, "Test Battery 1", 0
+        mock_coordinator, voltage_description, ENTRY, 0
     )
     assert voltage_sensor.native_value == 4980  # From fixture data
 
     # Test state sensor
     state_description = SensorEntityDescription(key="pack_state", name="Battery State")
     state_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, state_description, "Test Battery 1", 0
+        mock_coordinator, state_description, ENTRY, 0
     )
     assert state_sensor.native_value == "discharging"  # state 2 maps to discharging
 
@@ -238,9 +238,7 @@ async def test_zendure_battery_sensor_no_pack_data(hass: HomeAssistant):
     coordinator.data = {"properties": {}}  # No packData
 
     description = SensorEntityDescription(key="pack_soc", name="Battery SOC")
-    battery_sensor = ZendureLocalBatterySensor(
-        coordinator, description, "Test Battery 1", 0
-    )
+    battery_sensor = ZendureLocalBatterySensor(coordinator, description, ENTRY, 0)
 
     assert battery_sensor.native_value is None
 
@@ -252,9 +250,7 @@ async def test_zendure_battery_sensor_invalid_pack_index(
     description = SensorEntityDescription(key="pack_soc", name="Battery SOC")
 
     # Use pack index 5 when only 2 packs exist in fixture
-    battery_sensor = ZendureLocalBatterySensor(
-        mock_coordinator, description, "Test Battery 6", 5
-    )
+    battery_sensor = ZendureLocalBatterySensor(mock_coordinator, description, ENTRY, 5)
     assert battery_sensor.native_value is None
 
 
@@ -263,7 +259,7 @@ async def test_sensor_coordinator_update(
 ):
     """Test sensor updates when coordinator data changes."""
     description = SensorEntityDescription(key="electricLevel", name="Battery Level")
-    sensor = ZendureLocalSensor(mock_coordinator, description, "Test Zendure")
+    sensor = ZendureLocalSensor(mock_coordinator, description, ENTRY)
 
     initial_value = sensor.native_value
     assert initial_value == 97
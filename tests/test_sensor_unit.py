@@ -7,7 +7,7 @@ from pathlib import Path
 # Add the parent directory to sys.path to enable imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from custom_components.zendure_local.sensor import SENSOR_TYPES
+from custom_components.zendure_local.sensor import SENSOR_TYPES, decode_pack_value
 
 
 def load_fixture(filename):
@@ -28,6 +28,7 @@ def test_sensor_types_structure():
         "entity_category",
         "native_unit_of_measurement",
         "entity_registry_enabled_default",
+        "tier",
     }
 
     for sensor_key, sensor_config in SENSOR_TYPES.items():
@@ -81,6 +82,27 @@ def test_solar_input_power_sensor():
     assert isinstance(result, int)
 
 
+def test_remain_out_time_minutes_sensor():
+    """Test the numeric remaining discharge time sensor value function."""
+    sample_data = load_fixture("sample_response.json")
+    value_func = SENSOR_TYPES["remainOutTimeMinutes"]["value_func"]
+
+    assert value_func(sample_data) == 324
+    sample_data["properties"]["remainOutTime"] = 59940  # 999 h 0 m
+    assert value_func(sample_data) is None
+
+
+def test_template_sensors_of_zendure_yaml():
+    """Test the values that zendure.yaml used to compute in templates."""
+    sample_data = load_fixture("sample_response.json")
+
+    assert SENSOR_TYPES["remainOutTime"]["value_func"](sample_data) == "5 h 24 m"
+    assert SENSOR_TYPES["minSoc"]["value_func"](sample_data) == 5
+    assert SENSOR_TYPES["acModeNumber"]["value_func"](sample_data) == 2
+    sample_data["properties"]["remainOutTime"] = 59940
+    assert SENSOR_TYPES["remainOutTime"]["value_func"](sample_data) == "Unknown"
+
+
 def test_sensor_value_functions_with_missing_data():
     """Test sensor value functions with missing data."""
     # Test with empty data
@@ -137,12 +159,22 @@ def test_new_sensors_from_zensdk():
     assert reverse_state_result == "no"  # 0 maps to "no"
 
 
+def test_pack_voltages():
+    """Test that the cell voltages are not decoded as the total voltage."""
+    pack_info = load_fixture("sample_response.json")["packData"][0]
+    assert decode_pack_value("pack_voltage", pack_info) == 4980
+    assert decode_pack_value("pack_max_cell_voltage", pack_info) == 3.32
+    assert decode_pack_value("pack_min_cell_voltage", pack_info) == 3.31
+
+
 if __name__ == "__main__":
     test_sensor_types_structure()
     test_electric_level_sensor()
     test_pack_input_power_sensor()
     test_solar_input_power_sensor()
+    test_remain_out_time_minutes_sensor()
     test_sensor_value_functions_with_missing_data()
     test_sensor_value_functions_with_partial_data()
     test_new_sensors_from_zensdk()
+    test_pack_voltages()
     print("All tests passed!")
@@ -0,0 +1,99 @@
+"""Setup time of the sensor platform for many config entries."""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.sensor import async_setup_entry
+
+ENTRY_COUNTS = (1, 10, 25, 50)
+# Generous bound for slow CI runners, a hub with two packs takes about 5 ms
+MAX_SECONDS_PER_ENTRY = 0.2
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class EmptyRegistry:
+    """Entity registry without entities, cheaper than a mock for many lookups."""
+
+    def async_get_entity_id(self, domain, platform, unique_id):
+        """Return that no entity is registered."""
+        return None
+
+
+def make_entry(index, data):
+    """Return a hub entry with two packs."""
+    entry = MagicMock(entry_id=f"hub{index}")
+    entry.data = {"name": f"Hub {index}"}
+    entry.options = {}
+    entry.runtime_data.coordinator.data = data
+    entry.runtime_data.coordinator.pack_aggregates = {}
+    entry.runtime_data.coordinator.hub_estimates = {}
+    entry.runtime_data.coordinator.pack_indicators = {}
+    entry.runtime_data.scheduler = None
+    return entry
+
+
+def setup_entries(count):
+    """Set up the sensors of a number of hubs, return them and the time taken."""
+    data = load_fixture("sample_response.json")
+    entries = [make_entry(index, data) for index in range(count)]
+    add_entities = MagicMock()
+    hass = MagicMock()
+
+    async def run():
+        for entry in entries:
+            await async_setup_entry(hass, entry, add_entities)
+
+    with patch("custom_components.zendure_local.sensor.er") as registry:
+        registry.async_get.return_value = EmptyRegistry()
+        registry.async_entries_for_config_entry.return_value = []
+        start = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+    return [call.args[0] for call in add_entities.call_args_list], elapsed
+
+
+def test_setup_time_per_entry():
+    """Test that setup stays fast and linear in the number of entries."""
+    for count in ENTRY_COUNTS:
+        sensors, elapsed = setup_entries(count)
+        assert len(sensors) == count
+        assert elapsed / count < MAX_SECONDS_PER_ENTRY, (count, elapsed)
+
+
+def test_entries_share_descriptions():
+    """Test that the sensors of all entries share the precomputed descriptions."""
+    (first, second), _ = setup_entries(2)
+    assert [sensor.unique_id for sensor in first] != [
+        sensor.unique_id for sensor in second
+    ]
+    for sensor, other in zip(first, second):
+        assert sensor.entity_description is other.entity_description
+
+
+def test_hub_pack_properties_are_on_the_hub():
+    """Test that hub properties named pack* get a sensor on the hub device."""
+    (sensors,), _ = setup_entries(1)
+    unique_ids = {sensor.unique_id for sensor in sensors}
+    assert {"hub0_packInputPower", "hub0_packState", "hub0_packNum"} <= (unique_ids)
+
+
+if __name__ == "__main__":
+    for entry_count in ENTRY_COUNTS:
+        _, seconds = setup_entries(entry_count)
+        print(
+            f"{entry_count:3d} entries: {seconds * 1000:8.1f} ms, "
+            f"{seconds * 1000 / entry_count:.2f} ms per entry"
+        )
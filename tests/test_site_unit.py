@@ -0,0 +1,201 @@
+"""Unit tests for the site sampling."""
+
+import asyncio
+from datetime import timedelta
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.zendure_local.const import CONF_HUBS
+from custom_components.zendure_local.coordinator import ZendureCoordinator
+from custom_components.zendure_local.polling import PollingOptions
+from custom_components.zendure_local.site import (
+    HubReading,
+    SiteSample,
+    ZendureSiteSampler,
+    is_site_entry,
+)
+
+
+def reading(home, grid_input=0, solar=0, fetched_at=1000.0):
+    """Return the reading of a hub."""
+    return HubReading.from_report(
+        "Hub",
+        fetched_at,
+        {
+            "properties": {
+                "outputHomePower": home,
+                "gridInputPower": grid_input,
+                "solarInputPower": solar,
+            }
+        },
+    )
+
+
+def test_is_site_entry():
+    """Test telling site entries from hub entries."""
+    assert is_site_entry(MagicMock(data={CONF_HUBS: ["a"]}))
+    assert not is_site_entry(MagicMock(data={"resource": "http://hub"}))
+
+
+def test_flows_while_importing():
+    """Test a house using more than the hubs deliver."""
+    sample = SiteSample(
+        hubs={"a": reading(400, solar=300), "b": reading(300, solar=200)},
+        meter_power=500.0,
+        meter_at=1000.5,
+    )
+    assert sample.complete
+    assert sample.hub_output == 700
+    assert sample.solar_power == 500
+    assert sample.house_load == 1200
+    assert sample.self_consumption == 700
+    assert sample.export == 0
+    assert sample.skew == 0.5
+
+
+def test_flows_while_exporting():
+    """Test hubs delivering more than the house uses."""
+    sample = SiteSample(hubs={"a": reading(800)}, meter_power=-300.0, meter_at=1000)
+    assert sample.house_load == 500
+    assert sample.self_consumption == 500
+    assert sample.export == 300
+
+
+def test_charging_from_the_house_circuit():
+    """Test that power drawn by the hubs is not counted as house load."""
+    sample = SiteSample(
+        hubs={"a": reading(0, grid_input=600)}, meter_power=900.0, meter_at=1000
+    )
+    assert sample.house_load == 300
+    assert sample.self_consumption == 0
+
+
+def test_incomplete_sample():
+    """Test that flows need every hub and the meter."""
+    failed = HubReading.from_report("Hub", None, {})
+    sample = SiteSample(
+        hubs={"a": reading(400), "b": failed}, meter_power=100.0, meter_at=1002.0
+    )
+    assert not sample.complete
+    assert sample.house_load is None
+    assert sample.self_consumption is None
+    assert sample.hub_output is None
+    # The failed hub has no fetch time
+    assert sample.skew == 2.0
+
+    without_meter = SiteSample(hubs={"a": reading(400)})
+    assert without_meter.house_load is None
+    assert without_meter.export is None
+    assert without_meter.skew is None
+
+    missing = SiteSample(
+        hubs={"a": reading(400)}, meter_power=0.0, meter_at=1000, missing=["b"]
+    )
+    assert missing.house_load is None
+    assert missing.as_dict()["hubOutput"] == 400
+
+
+def test_hub_is_polled_once_per_interval():
+    """Test that the timer of a hub does not poll it next to the site."""
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        hass = MagicMock()
+        hass.loop = loop
+        hass.is_stopping = False
+        hass.async_create_background_task.side_effect = (
+            lambda target, name, eager_start: loop.create_task(target)
+        )
+        hub = ZendureCoordinator(
+            hass,
+            "http://10.0.0.5/properties/report",
+            polling=PollingOptions(min_interval=1, max_interval=1),
+        )
+        fetches = []
+
+        async def fetch():
+            fetches.append(loop.time())
+            return {"sn": "HUB", "timestamp": len(fetches), "properties": {}}
+
+        hub._async_fetch_data = fetch
+        hass.config_entries.async_get_entry.return_value = MagicMock(
+            state=ConfigEntryState.LOADED, title="Hub", runtime_data=MagicMock()
+        )
+        hass.config_entries.async_get_entry.return_value.runtime_data.coordinator = hub
+        sampler = ZendureSiteSampler(
+            hass, MagicMock(title="Site", data={CONF_HUBS: ["hub"]})
+        )
+        sampler.update_interval = timedelta(seconds=1)
+        # The hub timer fires just before the site timer in every second
+        hub._microsecond = 0.1
+        sampler._microsecond = 0.6
+        unsub_hub = hub.async_add_listener(lambda: None)
+        await sampler.async_refresh()
+        samples = []
+        unsub_site = sampler.async_add_listener(lambda: samples.append(loop.time()))
+        polled = len(fetches)
+        await asyncio.sleep(3.2)
+        unsub_site()
+        # One fetch per site sample, none from the timer of the hub
+        assert len(samples) >= 2
+        assert len(fetches) - polled == len(samples)
+        assert hub.update_interval is None
+
+        sampler.async_release_hubs()
+        assert hub.update_interval == timedelta(seconds=1)
+        assert hub._unsub_refresh is not None
+        unsub_hub()
+
+    asyncio.run(run())
+
+
+def test_site_polls_at_the_interval_of_its_hubs():
+    """Test that the site follows the adaptive intervals of its hubs."""
+
+    async def run():
+        hass = MagicMock()
+        hass.loop = asyncio.get_running_loop()
+        powers = {"a": 100, "b": 100}
+        hubs = {}
+        for entry_id, polling in (
+            ("a", PollingOptions(min_interval=10, max_interval=80)),
+            ("b", PollingOptions(min_interval=20, max_interval=40)),
+        ):
+            hub = ZendureCoordinator(
+                hass, f"http://{entry_id}.lan/properties/report", polling=polling
+            )
+
+            async def fetch(entry_id=entry_id, hub=hub):
+                return {
+                    "sn": entry_id,
+                    "timestamp": hub.polls,
+                    "properties": {"outputHomePower": powers[entry_id]},
+                }
+
+            hub._async_fetch_data = fetch
+            hubs[entry_id] = hub
+        hass.config_entries.async_get_entry.side_effect = lambda entry_id: MagicMock(
+            state=ConfigEntryState.LOADED,
+            title=entry_id,
+            runtime_data=MagicMock(coordinator=hubs[entry_id]),
+        )
+        sampler = ZendureSiteSampler(
+            hass, MagicMock(title="Site", data={CONF_HUBS: ["a", "b"]})
+        )
+        intervals = []
+        for poll in range(5):
+            if poll == 4:
+                powers["a"] = 600
+            await sampler.async_refresh()
+            intervals.append(sampler.update_interval.total_seconds())
+        # Quiet hubs double up to their maximum, the shortest one counts
+        assert intervals == [10, 20, 40, 40, 10]
+        assert all(hub.update_interval is None for hub in hubs.values())
+
+    asyncio.run(run())
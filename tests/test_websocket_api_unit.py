@@ -0,0 +1,129 @@
+"""Unit tests for the websocket snapshot stream."""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.zendure_local.websocket_api import (
+    SnapshotStream,
+    Subscriber,
+    changed_fields,
+    select_fields,
+)
+
+
+def load_fixture(filename):
+    """Load a fixture file."""
+    fixture_path = Path(__file__).parent / "fixtures" / filename
+    with open(fixture_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_coordinator():
+    """Return a coordinator mock holding the sample report."""
+    coordinator = MagicMock()
+    coordinator.data = load_fixture("sample_response.json")
+    coordinator.pack_aggregates = {}
+    coordinator.hub_estimates = {}
+    coordinator.pack_indicators = {}
+    return coordinator
+
+
+def subscribe(stream, msg_id, **kwargs):
+    """Subscribe a fake connection and return it."""
+    connection = MagicMock()
+    stream.async_add_subscriber(Subscriber(connection, msg_id, **kwargs))
+    return connection
+
+
+def sent(connection):
+    """Return the decoded messages sent to a connection."""
+    return [json.loads(call.args[0]) for call in connection.send_message.call_args_list]
+
+
+def poll(stream, coordinator, **properties):
+    """Publish a new report with changed properties."""
+    data = dict(coordinator.data, timestamp=coordinator.data["timestamp"] + 60)
+    data["properties"] = dict(data["properties"], **properties)
+    coordinator.data = data
+    stream._async_handle_update()
+
+
+def test_snapshot_serialized_once_per_poll():
+    """Test that subscribers with the same selection share one serialization."""
+    coordinator = make_coordinator()
+    stream = SnapshotStream(coordinator)
+    connections = [subscribe(stream, msg_id) for msg_id in range(1, 4)]
+    assert stream.serialized == 1
+    coordinator.async_add_listener.assert_called_once()
+
+    poll(stream, coordinator, electricLevel=96)
+    assert stream.serialized == 2
+    for msg_id, connection in enumerate(connections, start=1):
+        messages = sent(connection)
+        assert [message["id"] for message in messages] == [msg_id, msg_id]
+        assert messages[-1]["type"] == "event"
+        assert messages[-1]["event"]["hub"]["electricLevel"] == 96
+        assert len(messages[-1]["event"]["packs"]) == 2
+
+
+def test_field_selection_and_changes_only():
+    """Test that only selected fields that changed are sent."""
+    coordinator = make_coordinator()
+    stream = SnapshotStream(coordinator)
+    connection = subscribe(
+        stream, 1, fields=("electricLevel", "soc", "solarInputPower"), changed_only=True
+    )
+    first = sent(connection)[0]["event"]
+    assert set(first["hub"]) == {"electricLevel", "solarInputPower"}
+    assert first["packs"][0] == {"sn": "PACK1-SERIAL", "soc": 97}
+
+    poll(stream, coordinator, solarInputPower=200)
+    event = sent(connection)[-1]["event"]
+    assert event["hub"] == {"solarInputPower": 200}
+    assert event["packs"] == [{"sn": "PACK1-SERIAL"}, {"sn": "PACK2-SERIAL"}]
+    assert event["timestamp"] == coordinator.data["timestamp"]
+
+
+def test_throttled_subscriber_skips_polls():
+    """Test that a subscriber gets at most one message per interval."""
+    coordinator = make_coordinator()
+    stream = SnapshotStream(coordinator)
+    with patch(
+        "custom_components.zendure_local.websocket_api.time.monotonic"
+    ) as monotonic:
+        monotonic.return_value = 0.0
+        slow = subscribe(stream, 1, interval=120, changed_only=True)
+        fast = subscribe(stream, 2)
+        for now, level in ((60.0, 96), (120.0, 95)):
+            monotonic.return_value = now
+            poll(stream, coordinator, electricLevel=level)
+    assert len(sent(fast)) == 3
+    messages = sent(slow)
+    assert len(messages) == 2
+    # The changes are relative to the last message, not the last poll
+    assert messages[-1]["event"]["hub"]["electricLevel"] == 95
+
+
+def test_last_unsubscribe_stops_listening():
+    """Test that the coordinator listener is removed with the last subscriber."""
+    coordinator = make_coordinator()
+    stream = SnapshotStream(coordinator)
+    remove = stream.async_add_subscriber(Subscriber(MagicMock(), 1))
+    remove()
+    coordinator.async_add_listener.return_value.assert_called_once()
+
+
+def test_changed_fields_with_new_pack():
+    """Test that all pack fields are sent when a pack was added."""
+    old = select_fields({"hub": {"a": 1}, "packs": [{"sn": "1", "soc": 50}]}, None)
+    new = select_fields(
+        {"hub": {"a": 1}, "packs": [{"sn": "1", "soc": 50}, {"sn": "2", "soc": 40}]},
+        None,
+    )
+    assert changed_fields(new, old)["packs"] == new["packs"]
+    assert changed_fields(new, old)["hub"] == {}